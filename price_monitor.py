@@ -14,7 +14,6 @@ Fecha: Diciembre 2024
 import os
 import json
 import time
-import random
 import re
 from datetime import datetime
 from typing import Optional, Dict, List, Any
@@ -100,6 +99,10 @@ HEADERS_NAVEGADOR = {
     "Cache-Control": "max-age=0",
 }
 
+# Perfil de price_monitor_v2 (FETCH_PROFILES) con los recursos que Playwright no
+# necesita descargar: solo leemos page.content()
+PERFIL_DESCARGA = "lite"
+
 # =============================================================================
 # ESTRUCTURA DE COMPETIDORES
 # =============================================================================
@@ -151,17 +154,14 @@ COMPETIDORES = [
 # FUNCIONES AUXILIARES
 # =============================================================================
 
-def pausa_aleatoria(minimo: float = 2.0, maximo: float = 5.0) -> None:
+def esperar_turno(url: str) -> None:
     """
-    Pausa aleatoria entre peticiones para evitar ser bloqueado.
-    
-    Args:
-        minimo: Segundos mínimos de espera
-        maximo: Segundos máximos de espera
+    Espera el turno del host de `url` en el limitador por host de
+    price_monitor_v2 (token bucket con ráfaga, jitter y peticiones por minuto).
+    Sitios distintos no se esperan entre sí.
     """
-    tiempo = random.uniform(minimo, maximo)
-    print(f"   ⏳ Esperando {tiempo:.1f} segundos...")
-    time.sleep(tiempo)
+    from price_monitor_v2.core.rate_limit import get_rate_limiter
+    get_rate_limiter().acquire(url)
 
 
 def limpiar_precio(texto_precio: str) -> Optional[float]:
@@ -208,6 +208,7 @@ def obtener_html_campero_playwright(url: str) -> str:
     """
     print("   [Campero] Iniciando navegación interactiva...")
     from playwright.sync_api import sync_playwright
+    from price_monitor_v2.core.waits import wait_for_content
     try:
         with sync_playwright() as p:
             # Launch in headless mode
@@ -238,15 +239,15 @@ def obtener_html_campero_playwright(url: str) -> str:
                 # Logic: Click each one to ensure products are rendered in DOM
                 for i, cat in enumerate(cats):
                     try:
-                        # Simple click
+                        # Simple click, then wait only until the DOM settles
                         if cat.is_visible():
                             cat.click()
-                            time.sleep(0.5) 
+                            wait_for_content(page, {"quiet_ms": 300, "max_ms": 3000, "min_prices": 0, "verbose": False})
                     except Exception as e:
                         pass
                         
-                # Wait a final moment for renders
-                time.sleep(2)
+                # Wait for the final render (price nodes stable)
+                wait_for_content(page)
                 
             except Exception as e:
                 print(f"   Aviso: No se pudieron expandir categorías ({e})")
@@ -267,6 +268,8 @@ def obtener_html(competidor: Dict[str, Any]) -> str:
     nombre = competidor["nombre"]
 
     print(f"   🌐 Conectando a {nombre}...")
+    # Pausa por host para evitar bloqueos (reemplaza la pausa fija entre competidores)
+    esperar_turno(url)
 
     # CASO ESPECIAL: API Campestre
     if "pollocampestre.com.sv" in url and "api" in url:
@@ -319,17 +322,24 @@ def obtener_html_playwright(url: str) -> Optional[str]:
         HTML como string o None si hay error
     """
     from playwright.sync_api import sync_playwright
+    from price_monitor_v2.core.waits import wait_for_content
+    from price_monitor_v2.core.fetch_profile import FetchProfile
     
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
             page = browser.new_page()
             page.set_extra_http_headers(HEADERS_NAVEGADOR)
+            perfil = FetchProfile.from_name(PERFIL_DESCARGA)
+            if perfil:
+                perfil.attach(page)
             page.goto(url, wait_until="networkidle", timeout=60000)
-            # Esperar a que cargue el contenido dinámico
-            page.wait_for_timeout(3000)
+            # Esperar a que el contenido dinámico deje de cambiar
+            wait_for_content(page)
             html = page.content()
             browser.close()
+            if perfil:
+                print(f"   🚫 Recursos bloqueados: {perfil.blocked_requests} (~{perfil.blocked_bytes / 1024:.0f} KB est.)")
             return html
     except Exception as e:
         print(f"   ⚠️  Error con Playwright: {str(e)}")
@@ -374,9 +384,14 @@ def extraer_precio(html: str, selector: str) -> Optional[float]:
         return None
 
 
+_clasificador = None
+
+
 def clasificar_producto(nombre_producto: str) -> Optional[str]:
     """
     Clasifica un producto en una categoría basándose en su nombre.
+    Usa el clasificador compilado de price_monitor_v2 con las categorías de
+    este script (mismas reglas: exclusiones primero, luego keywords, en orden).
     
     Args:
         nombre_producto: Nombre del producto
@@ -384,20 +399,31 @@ def clasificar_producto(nombre_producto: str) -> Optional[str]:
     Returns:
         ID de categoría o None si no aplica
     """
-    nombre_lower = nombre_producto.lower()
-    
-    for categoria_id, config in CATEGORIAS_PRODUCTOS.items():
-        # Verificar si tiene palabras a excluir
-        tiene_exclusion = any(excl in nombre_lower for excl in config["excluir"])
-        if tiene_exclusion:
-            continue
-        
-        # Verificar si tiene keywords de la categoría
-        tiene_keyword = any(kw in nombre_lower for kw in config["keywords"])
-        if tiene_keyword:
-            return categoria_id
+    global _clasificador
+    if _clasificador is None:
+        from price_monitor_v2.utils.classifier import ProductClassifier
+        _clasificador = ProductClassifier(CATEGORIAS_PRODUCTOS)
+    return _clasificador.classify(nombre_producto)
+
+
+def extraer_por_heuristica(html: str, nombre_max: int) -> List[Dict[str, Any]]:
+    """
+    Heurística común: cada precio ($) toma el nombre del ancestro más cercano
+    (hasta 6 niveles) cuyo texto se clasifica como producto; un producto por
+    (categoría, precio). Usa el recorrido de price_monitor_v2, que calcula y
+    clasifica el texto de cada ancestro una sola vez, con las categorías y
+    reglas de este script.
     
-    return None
+    Args:
+        html: Contenido HTML de la página
+        nombre_max: Caracteres máximos del nombre antes de recortarlo con "..."
+    """
+    from price_monitor_v2.utils.extraction import get_engine
+    from price_monitor_v2.utils.document import ParsedDocument
+    return get_engine("soup").extract_products(
+        ParsedDocument(html), CATEGORIAS_PRODUCTOS,
+        classify=clasificar_producto, clean=limpiar_precio, name_max=nombre_max
+    )
 
 
 def extraer_productos_kfc(html: str) -> List[Dict[str, Any]]:
@@ -405,69 +431,11 @@ def extraer_productos_kfc(html: str) -> List[Dict[str, Any]]:
     Extrae productos de KFC usando búsqueda heurística por precios ($) y keywords.
     Robusto contra clases CSS dinámicas/ofuscadas.
     """
-    productos = []
     try:
-        soup = BeautifulSoup(html, "lxml")
-        
-        # Estrategia: Buscar todos los elementos de texto que parecen precios
-        # Regex para $10.50, $ 10.50, 10.50
-        precio_pattern = re.compile(r"\$\s*\d+\.\d{2}")
-        precios_found = soup.find_all(string=precio_pattern)
-        
-        for precio_node in precios_found:
-            try:
-                # El nodo de texto es hijo de alguien. Subamos buscando contexto.
-                contenedor = precio_node.parent
-                
-                # Subir hasta 6 niveles buscando un contenedor que tenga texto de producto
-                nombre_encontrado = None
-                precio_float = limpiar_precio(precio_node)
-                
-                if not precio_float or precio_float <= 0:
-                    continue
-                    
-                # Buscar en los padres
-                temp_pointer = contenedor
-                for _ in range(6): 
-                    if not temp_pointer: break
-                    
-                    texto_completo = temp_pointer.get_text(" ", strip=True)
-                    
-                    # Intentar clasificar con el texto acumulado del contenedor
-                    categoria = clasificar_producto(texto_completo)
-                    
-                    if categoria:
-                        # Limpiar el nombre (tomar primeros 50 chars o algo razonable si es muy largo)
-                        nombre_limpio = texto_completo.split("$")[0].strip() # Cortar antes del precio si aparece
-                        if len(nombre_limpio) > 60:
-                            nombre_limpio = nombre_limpio[:60] + "..."
-                            
-                        productos.append({
-                            "nombre": nombre_limpio,
-                            "precio": precio_float,
-                            "categoria": categoria,
-                            "categoria_nombre": CATEGORIAS_PRODUCTOS[categoria]["nombre"]
-                        })
-                        break # Ya clasificamos este precio, siguiente.
-                    
-                    temp_pointer = temp_pointer.parent
-                    
-            except Exception:
-                continue
-                
-        # Eliminar duplicados exactos
-        productos_unicos = []
-        vistos = set()
-        for p in productos:
-            key = (p["categoria"], p["precio"])
-            if key not in vistos:
-                vistos.add(key)
-                productos_unicos.append(p)
-                
+        return extraer_por_heuristica(html, nombre_max=60)
     except Exception as e:
         print(f"   ⚠️  Error extrayendo productos KFC (Heurística): {str(e)}")
-    
-    return productos_unicos
+        return []
 
 
 def extraer_productos_campestre(content: str) -> List[Dict[str, Any]]:
@@ -479,41 +447,29 @@ def extraer_productos_campestre(content: str) -> List[Dict[str, Any]]:
     
     # MODO API (JSON)
     if content.strip().startswith("{"):
+        from price_monitor_v2.utils.json_stream import iter_items
         try:
-            data = json.loads(content)
-            sections = data.get("data", {}).get("sections", [])
-            for section in sections:
-                # El nombre de la sección (ej: "Empanizados") nos sirve para clasificar?
-                # O usamos la logica de clasificar_producto sobre el nombre del item
-                cat_section = section.get("name", "")
-                
-                # Iterar items
-                items = section.get("data", [])
-                for item in items: # A veces items es el producto directo, o tiene sub-dataproducts
-                    # La estructura del API dump muestra: sections -> data[] -> dataProducts[]
-                    # El nivel 'item' tiene 'name'="Empanizados" y dentro 'dataProducts'
-                    
-                    sub_products = item.get("dataProducts", [])
-                    if not sub_products:
-                        # A veces es directo? En el dump todos tenian sub productos
-                        pass
-                        
-                    for p in sub_products:
-                        nombre = p.get("name", "")
-                        try:
-                            precio = float(p.get("salePrice", 0))
-                        except:
-                            precio = 0.0
-                            
-                        # Clasificar
-                        categoria = clasificar_producto(nombre)
-                        if categoria and precio > 0:
-                            productos.append({
-                                "nombre": nombre,
-                                "precio": precio,
-                                "categoria": categoria,
-                                "categoria_nombre": CATEGORIAS_PRODUCTOS[categoria]["nombre"]
-                            })
+            # La estructura del API dump muestra: sections -> data[] -> dataProducts[]
+            # Se leen en streaming solo los productos (banners, imágenes y
+            # configuración se saltan sin construirse)
+            for p in iter_items(content, "data.sections.item.data.item.dataProducts.item"):
+                if not isinstance(p, dict):
+                    continue
+                nombre = p.get("name", "")
+                try:
+                    precio = float(p.get("salePrice", 0))
+                except:
+                    precio = 0.0
+
+                # Clasificar
+                categoria = clasificar_producto(nombre)
+                if categoria and precio > 0:
+                    productos.append({
+                        "nombre": nombre,
+                        "precio": precio,
+                        "categoria": categoria,
+                        "categoria_nombre": CATEGORIAS_PRODUCTOS[categoria]["nombre"]
+                    })
                             
             # Eliminar duplicados
             productos_unicos = []
@@ -534,117 +490,18 @@ def extraer_productos_campestre(content: str) -> List[Dict[str, Any]]:
 
     # MODO HTML (Legacy/Fallback)
     try:
-        soup = BeautifulSoup(content, "lxml")
-        
-        # Estrategia: Buscar precios ($)
-        precio_pattern = re.compile(r"\$\s*\d+\.\d{2}")
-        precios_found = soup.find_all(string=precio_pattern)
-        
-        for precio_node in precios_found:
-            try:
-                contenedor = precio_node.parent
-                precio_float = limpiar_precio(precio_node)
-                
-                if not precio_float or precio_float <= 0:
-                    continue
-                    
-                temp_pointer = contenedor
-                for _ in range(6): 
-                    if not temp_pointer: break
-                    
-                    texto_completo = temp_pointer.get_text(" ", strip=True)
-                    categoria = clasificar_producto(texto_completo)
-                    
-                    if categoria:
-                        nombre_limpio = texto_completo.split("$")[0].strip()
-                        if len(nombre_limpio) > 60:
-                            nombre_limpio = nombre_limpio[:60] + "..."
-                            
-                        productos.append({
-                            "nombre": nombre_limpio,
-                            "precio": precio_float,
-                            "categoria": categoria,
-                            "categoria_nombre": CATEGORIAS_PRODUCTOS[categoria]["nombre"]
-                        })
-                        break
-                    
-                    temp_pointer = temp_pointer.parent
-                    
-            except Exception:
-                continue
-                
-        # Eliminar duplicados
-        productos_unicos = []
-        vistos = set()
-        for p in productos:
-            key = (p["categoria"], p["precio"])
-            if key not in vistos:
-                vistos.add(key)
-                productos_unicos.append(p)
-                
+        return extraer_por_heuristica(content, nombre_max=60)
     except Exception as e:
         print(f"   ⚠️  Error extrayendo productos Campestre (Heurística): {str(e)}")
-    
-    return productos_unicos
+        return []
 
 
 def extraer_productos_campero(html: str) -> List[Dict[str, Any]]:
     """
     Extrae productos de Pollo Campero usando heurística de precios sobre HTML expandido.
     """
-    productos = []
     try:
-        soup = BeautifulSoup(html, "lxml")
-        
-        # Estrategia: Buscar precios ($)
-        # Campero usa <span class="price"> o similar tras renderizado
-        precio_pattern = re.compile(r"\$\s*\d+\.\d{2}")
-        precios_found = soup.find_all(string=precio_pattern)
-        
-        for precio_node in precios_found:
-            try:
-                contenedor = precio_node.parent
-                precio_float = limpiar_precio(precio_node)
-                
-                if not precio_float or precio_float <= 0:
-                    continue
-                    
-                # Subir buscando contexto de nombre
-                temp_pointer = contenedor
-                for _ in range(6): 
-                    if not temp_pointer: break
-                    
-                    texto_completo = temp_pointer.get_text(" ", strip=True)
-                    categoria = clasificar_producto(texto_completo)
-                    
-                    if categoria:
-                        nombre_limpio = texto_completo.split("$")[0].strip()
-                        if len(nombre_limpio) > 80:
-                            nombre_limpio = nombre_limpio[:80] + "..."
-                            
-                        productos.append({
-                            "nombre": nombre_limpio,
-                            "precio": precio_float,
-                            "categoria": categoria,
-                            "categoria_nombre": CATEGORIAS_PRODUCTOS[categoria]["nombre"]
-                        })
-                        break
-                    
-                    temp_pointer = temp_pointer.parent
-            except Exception:
-                continue
-        
-        # Eliminar duplicados
-        productos_unicos = []
-        vistos = set()
-        for p in productos:
-            key = (p["categoria"], p["precio"])
-            if key not in vistos:
-                vistos.add(key)
-                productos_unicos.append(p)
-                
-        return productos_unicos
-            
+        return extraer_por_heuristica(html, nombre_max=80)
     except Exception as e:
         print(f"   ⚠️  Error extrayendo productos Campero: {str(e)}")
         return []
@@ -1089,9 +946,6 @@ def revisar_todos_los_competidores() -> None:
             errores += 1
             # El script continúa con el siguiente competidor
             continue
-        
-        # Pausa entre peticiones para evitar bloqueos
-        pausa_aleatoria()
     
     # Guardar historial actualizado
     if guardar_historial(historial):
@@ -0,0 +1,92 @@
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from price_monitor_v2.config.settings import API_TEMPLATES_FILE
+
+# Headers the HTTP client sets itself, or that only make sense inside the browser
+SKIP_HEADERS = {
+    "host", "content-length", "connection", "accept-encoding", "keep-alive",
+    "transfer-encoding", "upgrade", "te", "priority",
+}
+# Session credentials: never written to API_TEMPLATES_FILE. An API that needs
+# them fails replay and goes back to a Playwright capture.
+CREDENTIAL_HEADERS = {"cookie", "authorization", "proxy-authorization"}
+
+def strip_credentials(headers: Dict[str, str]) -> Dict[str, str]:
+    return {k: v for k, v in headers.items() if k.lower() not in CREDENTIAL_HEADERS}
+
+def request_template(request, headers: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Builds a replayable template from a Playwright Request.
+    headers: request.all_headers() (awaited on the async API); cookies and
+    other credentials are left out.
+    """
+    headers = strip_credentials(headers)
+    return {
+        "method": request.method,
+        "url": request.url,
+        "headers": {k: v for k, v in headers.items() if not k.startswith(":") and k.lower() not in SKIP_HEADERS},
+        "post_data": request.post_data,
+    }
+
+class ApiTemplateStore:
+    """
+    Request templates discovered during Playwright capture runs, persisted per
+    competitor so later cycles can replay them over plain HTTP.
+    """
+
+    def __init__(self, path: str = API_TEMPLATES_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except:
+                pass
+        return {}
+
+    def _save(self, data: Dict[str, Any]):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def get(self, competitor: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._load().get(competitor)
+        if not entry:
+            return None
+        # Files written before credentials were stripped
+        return [{**t, "headers": strip_credentials(t.get("headers", {}))} for t in entry["templates"]]
+
+    def record(self, competitor: str, templates: List[Dict[str, Any]]):
+        with self._lock:
+            data = self._load()
+            data[competitor] = {
+                "recorded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "templates": [{**t, "headers": strip_credentials(t.get("headers", {}))} for t in templates],
+            }
+            self._save(data)
+        print(f"   [Replay] Recorded {len(templates)} API templates for {competitor}")
+
+    def invalidate(self, competitor: str):
+        with self._lock:
+            data = self._load()
+            if data.pop(competitor, None) is not None:
+                self._save(data)
+                print(f"   [Replay] Templates for {competitor} invalidated")
+
+_store = None
+
+def get_template_store() -> ApiTemplateStore:
+    global _store
+    if _store is None:
+        _store = ApiTemplateStore()
+    return _store
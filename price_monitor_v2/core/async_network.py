@@ -0,0 +1,400 @@
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from price_monitor_v2.config.settings import (
+    ASYNC_MAX_CONCURRENCY, HTTP_CACHE,
+    BROWSER_MAX_PAGES, BROWSER_MAX_MEMORY_MB, HTTP_POOL_SIZE, HTTP_MAX_RETRIES
+)
+from price_monitor_v2.core.browser_pool import LAUNCH_ARGS, _MemoryProbe
+from price_monitor_v2.core.browser_profiles import ProfileStore
+from price_monitor_v2.core.fetch_profile import FetchProfile
+from price_monitor_v2.core.waits import wait_for_content_async
+from price_monitor_v2.core.capture import JsonCapture
+from price_monitor_v2.core.cache import get_response_cache
+from price_monitor_v2.core.network_base import NetworkBase
+from price_monitor_v2.core.resilience import check_response
+from price_monitor_v2.core.proxy_pool import playwright_proxy
+
+async def _close_quietly(page):
+    try:
+        await page.close()
+    except Exception:
+        pass
+
+class AsyncBrowserPool:
+    """
+    asyncio counterpart of BrowserPool.
+    Many contexts can be open at once, so a browser due for recycling is retired
+    (no new contexts) and only closed once its last context is released.
+    """
+
+    def __init__(self, proxy_config=None, max_pages: int = BROWSER_MAX_PAGES, max_memory_mb: int = BROWSER_MAX_MEMORY_MB):
+        self.proxy_config = proxy_config
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self._memory = _MemoryProbe()
+        self._playwright = None
+        self._browser = None
+        self._active = {}
+        self._retired = set()
+        self._lock = asyncio.Lock()
+        self._persistent = {} # profile name -> (context, proxy)
+        self._persistent_users = {}
+        self._persistent_pages = {} # profile name -> pages served since launch
+        self.profiles = ProfileStore()
+        self.pages_served = 0
+        self.launches = 0
+
+    async def _start(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+    async def _launch(self):
+        await self._start()
+
+        launch_args = {
+            "headless": True,
+            "args": LAUNCH_ARGS,
+        }
+        if self.proxy_config:
+            launch_args["proxy"] = self.proxy_config
+
+        self._browser = await self._playwright.chromium.launch(**launch_args)
+        self._active[self._browser] = 0
+        self.pages_served = 0
+        self.launches += 1
+        print(f"   [BrowserPool] Chromium launched (#{self.launches}, async)")
+
+    def _needs_recycle(self, pages_served: int) -> bool:
+        if self.max_pages and pages_served >= self.max_pages:
+            return True
+        if self.max_memory_mb and self._memory.rss_mb() > self.max_memory_mb:
+            self._memory.invalidate()
+            return True
+        return False
+
+    async def _release(self, browser):
+        self._active[browser] -= 1
+        if browser in self._retired and self._active[browser] == 0:
+            self._retired.discard(browser)
+            del self._active[browser]
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    async def _acquire(self):
+        async with self._lock:
+            if self._browser is not None and (not self._browser.is_connected() or self._needs_recycle(self.pages_served)):
+                print(f"   [BrowserPool] Retiring browser after {self.pages_served} pages")
+                old = self._browser
+                self._browser = None
+                self._retired.add(old)
+                self._active[old] += 1
+                await self._release(old)
+            if self._browser is None:
+                await self._launch()
+            self._active[self._browser] += 1
+            self.pages_served += 1
+            return self._browser
+
+    @asynccontextmanager
+    async def new_context(self, **context_args):
+        browser = await self._acquire()
+        try:
+            context = await browser.new_context(**context_args)
+            try:
+                yield context
+            finally:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+        finally:
+            await self._release(browser)
+
+    async def _launch_persistent(self, name: str, proxy, context_args):
+        await self._start()
+        restore = self.profiles.needs_restore(name)
+        launch_args = {
+            "headless": True,
+            "args": LAUNCH_ARGS + self.profiles.launch_args(),
+            **context_args,
+        }
+        if proxy:
+            launch_args["proxy"] = proxy
+        context = await self._playwright.chromium.launch_persistent_context(self.profiles.user_data_dir(name), **launch_args)
+        if restore:
+            state = self.profiles.load_state(name)
+            if state and state.get("cookies"):
+                await context.add_cookies(state["cookies"])
+        self._persistent[name] = (context, proxy)
+        self._persistent_pages[name] = 0
+        print(f"   [BrowserPool] Persistent profile '{name}' opened (async)")
+        return context
+
+    async def _close_persistent(self, name: str):
+        context, _ = self._persistent.pop(name)
+        try:
+            await context.storage_state(path=self.profiles.state_path(name))
+        except Exception as e:
+            print(f"   [BrowserPool] Warning: could not save state for '{name}': {e}")
+        try:
+            await context.close()
+        except Exception:
+            pass
+        self.profiles.prune(name)
+
+    @asynccontextmanager
+    async def persistent_context(self, name: str, proxy=None, **context_args):
+        """
+        Async version of BrowserPool.persistent_context. Concurrent loads for
+        the same competitor share the context, each in its own page, which the
+        caller closes. A change of proxy or a due recycle only relaunches it
+        once nothing else is using it.
+        """
+        async with self._lock:
+            entry = self._persistent.get(name)
+            if entry is not None and not self._persistent_users.get(name) and (
+                    entry[1] != proxy or self._needs_recycle(self._persistent_pages[name])):
+                print(f"   [BrowserPool] Relaunching profile '{name}' after {self._persistent_pages[name]} pages")
+                await self._close_persistent(name)
+                entry = None
+            context = entry[0] if entry is not None else await self._launch_persistent(name, proxy, context_args)
+            self._persistent_users[name] = self._persistent_users.get(name, 0) + 1
+            self._persistent_pages[name] += 1
+        try:
+            yield context
+        finally:
+            self._persistent_users[name] -= 1
+
+    def context(self, persistent_profile=None, proxy=None, **context_args):
+        if persistent_profile:
+            return self.persistent_context(persistent_profile, proxy=proxy, **context_args)
+        return self.new_context(proxy=proxy, **context_args)
+
+    async def close(self):
+        for name in list(self._persistent):
+            await self._close_persistent(name)
+        browsers = list(self._active.keys())
+        self._browser = None
+        self._active.clear()
+        self._retired.clear()
+        for browser in browsers:
+            try:
+                await browser.close()
+            except Exception as e:
+                print(f"   [BrowserPool] Warning: error closing browser: {e}")
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                print(f"   [BrowserPool] Warning: error stopping Playwright: {e}")
+            self._playwright = None
+
+class AsyncNetworkManager(NetworkBase):
+    """
+    asyncio version of NetworkManager.
+    Every page load and API call goes through one semaphore, so a single event
+    loop can keep up to ASYNC_MAX_CONCURRENCY fetches in flight.
+    """
+
+    def __init__(self, max_concurrency: int = ASYNC_MAX_CONCURRENCY):
+        super().__init__()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self._clients = {}
+
+    @property
+    def browser_pool(self) -> AsyncBrowserPool:
+        if self._browser_pool is None:
+            self._browser_pool = AsyncBrowserPool(proxy_config=self._get_proxy_config())
+        return self._browser_pool
+
+    def client_for(self, proxy=None):
+        """
+        httpx fixes the proxy per transport, so each pool proxy gets its own
+        client (None = direct).
+        """
+        if proxy not in self._clients:
+            if httpx is None:
+                raise RuntimeError("httpx is required for AsyncNetworkManager (pip install httpx)")
+            self._clients[proxy] = httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=HTTP_POOL_SIZE, max_connections=HTTP_POOL_SIZE * 4),
+                transport=httpx.AsyncHTTPTransport(retries=HTTP_MAX_RETRIES, proxy=proxy),
+                timeout=30,
+            )
+        return self._clients[proxy]
+
+    async def close(self):
+        if self._browser_pool is not None:
+            await self._browser_pool.close()
+            self._browser_pool = None
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def fetch_with_requests(self, url: str, method="GET", json_payload=None, headers=None, data=None, use_cache=True, cache_ttl=None) -> str:
+        """Standard HTTP request (httpx), sharing the on-disk response cache."""
+        print(f"   [HTTPX] Connecting to {url}...")
+        try:
+            request_headers = self._get_headers(url)
+            if headers:
+                request_headers.update(headers)
+
+            cache = get_response_cache() if (use_cache and HTTP_CACHE) else None
+            if cache:
+                key, entry, conditional, fresh = cache.prepare(method, url, json_payload if data is None else data, cache_ttl)
+                if fresh is not None:
+                    print("   [Cache] Fresh copy, request skipped")
+                    return fresh
+                request_headers.update(conditional)
+
+            # Wait for the host's slot before taking a concurrency slot
+            await self.rate_limiter.acquire_async(url)
+            async with self.semaphore:
+                with self.proxies.track(url) as proxy:
+                    client = self.client_for(proxy)
+                    if method == "GET":
+                        resp = await client.get(url, headers=request_headers)
+                    elif data is not None:
+                        resp = await client.request(method, url, content=data, headers=request_headers)
+                    else:
+                        resp = await client.request(method, url, json=json_payload, headers=request_headers)
+
+                    if resp.status_code != 304:
+                        check_response(url, resp.status_code, resp.text)
+            if cache:
+                result = cache.complete(key, entry, resp.status_code, resp.headers, resp.text, url)
+                if result.unchanged:
+                    print(f"   [Cache] Unchanged ({result.source})")
+                return result
+            return resp.text
+        except Exception as e:
+            kind = self._record_failure(url, e)
+            print(f"   Error (HTTPX, {kind}): {e}")
+            return ""
+
+    async def replay_requests(self, templates) -> list:
+        """Async version of NetworkManager.replay_requests (calls run concurrently)."""
+        bodies = await asyncio.gather(*[
+            self.fetch_with_requests(t["url"], method=t["method"], headers=t["headers"], data=t.get("post_data"))
+            for t in templates
+        ])
+        replayed = []
+        for t, body in zip(templates, bodies):
+            try:
+                data = json.loads(body) if body else None
+            except ValueError:
+                data = None
+            if data is None:
+                print(f"   [Replay] Replay failed for {t['url']}")
+                return []
+            replayed.append({
+                "url": t["url"], "method": t["method"], "status": 200, "data": data, "request": t,
+                "unchanged": getattr(body, "unchanged", False),
+            })
+        return replayed
+
+    async def fetch_with_playwright(self, url: str, wait_selector=None, interactive_callback=None, fetch_profile=None, wait=None, persistent_profile=None) -> str:
+        """
+        Playwright fetch (async API).
+        interactive_callback: Coroutine function that takes (page).
+        wait: Overrides for WAIT_STRATEGY (used when there is no callback).
+        """
+        print(f"   [Playwright] Connecting to {url}... (async)")
+        profile = FetchProfile.from_name(fetch_profile)
+
+        async def attempt():
+            await self.rate_limiter.acquire_async(url)
+            async with self.semaphore:
+                context_args = self._context_args()
+                with self.proxies.track(url, pin=persistent_profile) as proxy:
+                    async with self.browser_pool.context(persistent_profile, proxy=playwright_proxy(proxy), **context_args) as context:
+                        page = await context.new_page()
+                        try:
+                            if profile:
+                                await profile.attach_page_async(page, persistent=bool(persistent_profile))
+
+                            response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                            check_response(url, response.status if response else None)
+
+                            if wait_selector:
+                                try:
+                                    await page.wait_for_selector(wait_selector, timeout=20000)
+                                except Exception:
+                                    print(f"   Warning: Timeout waiting for selector {wait_selector}")
+
+                            if interactive_callback:
+                                await interactive_callback(page)
+                            else:
+                                await wait_for_content_async(page, wait)
+
+                            html = await page.content()
+                            check_response(url, None, html)
+                            return html
+                        finally:
+                            # Only this call's page: the profile's context is shared
+                            await _close_quietly(page)
+
+        try:
+            return await self.retry.run_async(attempt, url)
+        except Exception as e:
+            kind = self._record_failure(url, e)
+            print(f"   Error (Playwright, {kind}): {e}")
+            return ""
+        finally:
+            if profile:
+                self.blocked_requests += profile.blocked_requests
+                self.blocked_bytes += profile.blocked_bytes
+
+    async def capture_json_responses(self, url: str, url_patterns, wait_selector=None, fetch_profile=None, persistent_profile=None) -> list:
+        """Async version of NetworkManager.capture_json_responses."""
+        print(f"   [Capture] Loading {url} (async)...")
+        profile = FetchProfile.from_name(fetch_profile)
+        capture = JsonCapture(url_patterns)
+        try:
+            await self.rate_limiter.acquire_async(url)
+            async with self.semaphore:
+                context_args = self._context_args()
+                with self.proxies.track(url, pin=persistent_profile) as proxy:
+                    async with self.browser_pool.context(persistent_profile, proxy=playwright_proxy(proxy), **context_args) as context:
+                        page = await context.new_page()
+                        try:
+                            if profile:
+                                await profile.attach_page_async(page, persistent=bool(persistent_profile))
+                            capture.attach(page)
+
+                            response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                            check_response(url, response.status if response else None)
+                            if wait_selector:
+                                try:
+                                    await page.wait_for_selector(wait_selector, timeout=20000)
+                                except Exception:
+                                    print(f"   Warning: Timeout waiting for selector {wait_selector}")
+
+                            await capture.wait_async(page)
+                            return await capture.collect_async()
+                        finally:
+                            # Only this call's page: the profile's context is shared
+                            await _close_quietly(page)
+        except Exception as e:
+            kind = self._record_failure(url, e)
+            print(f"   Error (Capture, {kind}): {e}")
+            return []
+        finally:
+            if profile:
+                self.blocked_requests += profile.blocked_requests
+                self.blocked_bytes += profile.blocked_bytes
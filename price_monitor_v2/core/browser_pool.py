@@ -0,0 +1,236 @@
+
+import os
+import time
+from contextlib import contextmanager
+from playwright.sync_api import sync_playwright
+
+from price_monitor_v2.config.settings import BROWSER_MAX_PAGES, BROWSER_MAX_MEMORY_MB, BROWSER_MEMORY_CHECK_S
+from price_monitor_v2.core.browser_profiles import ProfileStore
+
+LAUNCH_ARGS = ["--no-sandbox", "--disable-setuid-sandbox", "--disable-dev-shm-usage"]
+
+def _process_tree_rss_mb(root_pid: int) -> float:
+    """
+    Sums the resident memory (MB) of every Chromium process started below root_pid.
+    Linux only (reads /proc); returns 0.0 elsewhere.
+    """
+    if not os.path.isdir("/proc"):
+        return 0.0
+
+    children = {}
+    names = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+            # comm is wrapped in parentheses and may contain spaces
+            comm = stat[stat.index("(") + 1:stat.rindex(")")]
+            ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+        names[int(entry)] = comm
+
+    total_kb = 0
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        if "chrom" not in names.get(pid, "") and "headless" not in names.get(pid, ""):
+            continue
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024.0
+
+class _MemoryProbe:
+    """
+    _process_tree_rss_mb for this process, read at most every interval_s
+    seconds: walking /proc on every page would cost more than the page checks.
+    """
+
+    def __init__(self, interval_s: float = BROWSER_MEMORY_CHECK_S):
+        self.interval_s = interval_s
+        self._rss = 0.0
+        self._read_at = None
+
+    def rss_mb(self) -> float:
+        now = time.monotonic()
+        if self._read_at is None or now - self._read_at >= self.interval_s:
+            self._rss = _process_tree_rss_mb(os.getpid())
+            self._read_at = now
+        return self._rss
+
+    def invalidate(self):
+        """Forces a fresh read next time (after a recycle the last one is stale)."""
+        self._read_at = None
+
+class BrowserPool:
+    """
+    Long-lived Chromium instance shared by every Playwright fetch.
+    Each fetch gets a fresh BrowserContext; the browser itself is recycled after
+    `max_pages` pages or when its process tree goes above `max_memory_mb`.
+    Persistent profiles run their own Chromium and are recycled the same way.
+
+    Like the Playwright sync API it wraps, a pool must only be used from the
+    thread that created it.
+    """
+
+    def __init__(self, proxy_config=None, max_pages: int = BROWSER_MAX_PAGES, max_memory_mb: int = BROWSER_MAX_MEMORY_MB):
+        self.proxy_config = proxy_config
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self._memory = _MemoryProbe()
+        self._playwright = None
+        self._browser = None
+        self._persistent = {} # profile name -> (context, proxy)
+        self._persistent_pages = {} # profile name -> pages served since launch
+        self.profiles = ProfileStore()
+        self.pages_served = 0
+        self.launches = 0
+
+    def _start(self):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+
+    def _launch(self):
+        self._start()
+
+        launch_args = {
+            "headless": True,
+            "args": LAUNCH_ARGS,
+        }
+        if self.proxy_config:
+            launch_args["proxy"] = self.proxy_config
+
+        self._browser = self._playwright.chromium.launch(**launch_args)
+        self.pages_served = 0
+        self.launches += 1
+        print(f"   [BrowserPool] Chromium launched (#{self.launches})")
+
+    def _close_browser(self):
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception as e:
+                print(f"   [BrowserPool] Warning: error closing browser: {e}")
+            self._browser = None
+
+    def _needs_recycle(self, pages_served: int) -> bool:
+        if self.max_pages and pages_served >= self.max_pages:
+            print(f"   [BrowserPool] Recycling after {pages_served} pages")
+            return True
+        if self.max_memory_mb:
+            rss = self._memory.rss_mb()
+            if rss > self.max_memory_mb:
+                print(f"   [BrowserPool] Recycling at {rss:.0f} MB (limit {self.max_memory_mb} MB)")
+                self._memory.invalidate()
+                return True
+        return False
+
+    def get_browser(self):
+        """Returns a connected browser, launching or recycling it as needed."""
+        if self._browser is not None and (not self._browser.is_connected() or self._needs_recycle(self.pages_served)):
+            self._close_browser()
+        if self._browser is None:
+            self._launch()
+        return self._browser
+
+    @contextmanager
+    def new_context(self, **context_args):
+        """
+        Yields a fresh BrowserContext from the warm browser and closes it afterwards.
+        """
+        browser = self.get_browser()
+        context = browser.new_context(**context_args)
+        try:
+            yield context
+        finally:
+            self.pages_served += 1
+            try:
+                context.close()
+            except Exception:
+                pass
+
+    def _launch_persistent(self, name: str, proxy, context_args):
+        self._start()
+        restore = self.profiles.needs_restore(name)
+        launch_args = {
+            "headless": True,
+            "args": LAUNCH_ARGS + self.profiles.launch_args(),
+            **context_args,
+        }
+        if proxy:
+            launch_args["proxy"] = proxy
+        context = self._playwright.chromium.launch_persistent_context(self.profiles.user_data_dir(name), **launch_args)
+        if restore:
+            state = self.profiles.load_state(name)
+            if state and state.get("cookies"):
+                context.add_cookies(state["cookies"])
+        self._persistent[name] = (context, proxy)
+        self._persistent_pages[name] = 0
+        print(f"   [BrowserPool] Persistent profile '{name}' opened")
+        return context
+
+    def _close_persistent(self, name: str):
+        context, _ = self._persistent.pop(name)
+        try:
+            context.storage_state(path=self.profiles.state_path(name))
+        except Exception as e:
+            print(f"   [BrowserPool] Warning: could not save state for '{name}': {e}")
+        try:
+            context.close()
+        except Exception:
+            pass
+        self.profiles.prune(name)
+
+    @contextmanager
+    def persistent_context(self, name: str, proxy=None, **context_args):
+        """
+        Yields the competitor's persistent context (Chromium disk cache and
+        cookies kept on disk between runs). It stays open for the rest of the
+        cycle; pages opened inside the block are closed afterwards.
+        context_args only apply at launch; a change of proxy (see
+        ProxyPool.pinned) or a due recycle relaunches it.
+        """
+        entry = self._persistent.get(name)
+        if entry is not None and (entry[1] != proxy or self._needs_recycle(self._persistent_pages[name])):
+            self._close_persistent(name)
+            entry = None
+        context = entry[0] if entry is not None else self._launch_persistent(name, proxy, context_args)
+        before = set(context.pages)
+        try:
+            yield context
+        finally:
+            self._persistent_pages[name] += 1
+            for page in context.pages:
+                if page not in before:
+                    try:
+                        page.close()
+                    except Exception:
+                        pass
+
+    def context(self, persistent_profile=None, proxy=None, **context_args):
+        """persistent_context(persistent_profile) when set, else new_context()."""
+        if persistent_profile:
+            return self.persistent_context(persistent_profile, proxy=proxy, **context_args)
+        return self.new_context(proxy=proxy, **context_args)
+
+    def close(self):
+        """Closes the browser and stops the Playwright driver."""
+        for name in list(self._persistent):
+            self._close_persistent(name)
+        self._close_browser()
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception as e:
+                print(f"   [BrowserPool] Warning: error stopping Playwright: {e}")
+            self._playwright = None
@@ -0,0 +1,106 @@
+
+import os
+import re
+import json
+import time
+import shutil
+from typing import Optional, Dict, Any
+
+from price_monitor_v2.config.settings import (
+    BROWSER_PROFILES_DIR, BROWSER_PROFILE_MAX_MB, BROWSER_PROFILE_PRUNE_HOURS
+)
+
+# Chromium directories that only hold caches; safe to delete between runs
+CACHE_DIRS = (
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    os.path.join("Default", "GPUCache"),
+    os.path.join("Default", "Service Worker", "CacheStorage"),
+    os.path.join("Default", "Service Worker", "ScriptCache"),
+    "GrShaderCache",
+    "ShaderCache",
+    "GraphiteDawnCache",
+)
+
+def _dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total / 1048576
+
+class ProfileStore:
+    """
+    On-disk Chromium profiles, one per competitor:
+    <root>/<slug>/user-data       user-data dir for launch_persistent_context (disk cache, cookies)
+    <root>/<slug>/storage_state.json  cookies/localStorage saved when the context closes,
+                                  used to restore cookies after the profile is pruned
+    Profiles are capped at max_mb: cache directories are dropped first, then
+    the whole user-data dir. The size is checked at most every prune_hours.
+    """
+
+    def __init__(self, root: str = BROWSER_PROFILES_DIR, max_mb: int = BROWSER_PROFILE_MAX_MB, prune_hours: float = BROWSER_PROFILE_PRUNE_HOURS):
+        self.root = root
+        self.max_mb = max_mb
+        self.prune_hours = prune_hours
+
+    @staticmethod
+    def _slug(name: str) -> str:
+        return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "default"
+
+    def _dir(self, name: str) -> str:
+        return os.path.join(self.root, self._slug(name))
+
+    def user_data_dir(self, name: str) -> str:
+        path = os.path.join(self._dir(name), "user-data")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def state_path(self, name: str) -> str:
+        return os.path.join(self._dir(name), "storage_state.json")
+
+    def launch_args(self) -> list:
+        """Extra Chromium flags: keep the HTTP disk cache well below the cap."""
+        return [f"--disk-cache-size={int(self.max_mb * 0.6 * 1048576)}"]
+
+    def load_state(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.state_path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def needs_restore(self, name: str) -> bool:
+        """True when the user-data dir is new (e.g. pruned) but saved state exists."""
+        user_data = os.path.join(self._dir(name), "user-data")
+        return not os.path.isdir(os.path.join(user_data, "Default")) and os.path.exists(self.state_path(name))
+
+    def _prune_due(self, name: str) -> bool:
+        marker = os.path.join(self._dir(name), ".last_prune")
+        try:
+            return time.time() - os.path.getmtime(marker) >= self.prune_hours * 3600
+        except OSError:
+            return True
+
+    def prune(self, name: str, force: bool = False):
+        """Enforces the size cap. Call with the profile's context closed."""
+        if not force and not self._prune_due(name):
+            return
+        directory = self._dir(name)
+        user_data = os.path.join(directory, "user-data")
+        size = _dir_size_mb(user_data)
+        if self.max_mb and size > self.max_mb:
+            for sub in CACHE_DIRS:
+                shutil.rmtree(os.path.join(user_data, sub), ignore_errors=True)
+            pruned = _dir_size_mb(user_data)
+            if pruned > self.max_mb:
+                # Cookies come back from storage_state.json on the next launch
+                shutil.rmtree(user_data, ignore_errors=True)
+                pruned = 0.0
+            print(f"   [Profiles] {name}: pruned {size:.0f} MB -> {pruned:.0f} MB")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, ".last_prune"), "w") as f:
+            f.write(str(time.time()))
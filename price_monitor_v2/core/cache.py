@@ -0,0 +1,247 @@
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+from price_monitor_v2.config.settings import (
+    HTTP_CACHE_DIR, HTTP_CACHE_TTL, PARSE_CACHE_DIR, PARSE_CACHE_MAX_AGE_H,
+    CATEGORIAS_PRODUCTOS, KEYWORDS_PROMOCION
+)
+
+class FetchResult(str):
+    """
+    Response body returned by the fetch methods. Behaves like the plain str it
+    always was, plus `unchanged`: True when the body is identical to the
+    previous fetch (304, fresh TTL entry or same body hash).
+    """
+    unchanged = False
+    source = "network"
+
+    def __new__(cls, text: str, unchanged: bool = False, source: str = "network"):
+        obj = super().__new__(cls, text)
+        obj.unchanged = unchanged
+        obj.source = source
+        return obj
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+class ResponseCache:
+    """
+    On-disk HTTP response cache.
+    meta/<request key>.json holds validators (ETag / Last-Modified), fetch time and
+    the body hash; bodies/<body hash> holds the content (content-addressed, so a
+    body that never changes is stored once).
+    """
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR, ttl: int = HTTP_CACHE_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "meta"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+
+    @staticmethod
+    def request_key(method: str, url: str, body=None) -> str:
+        if body is not None and not isinstance(body, (str, bytes)):
+            body = json.dumps(body, sort_keys=True)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        return _sha256(method.upper().encode() + b" " + url.encode() + b"\n" + (body or b""))
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.directory, "meta", key + ".json")
+
+    def _body_path(self, body_sha: str) -> str:
+        return os.path.join(self.directory, "bodies", body_sha)
+
+    def _read_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._body_path(meta["body_sha"]), "r", encoding="utf-8") as f:
+                meta["body"] = f.read()
+            return meta
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def prepare(self, method: str, url: str, body=None, ttl: Optional[int] = None) -> Tuple[str, Optional[Dict[str, Any]], Dict[str, str], Optional[FetchResult]]:
+        """
+        Before a request: returns (key, cached entry, conditional headers, fresh result).
+        fresh result is set when the entry is within its TTL and no request is needed.
+        """
+        key = self.request_key(method, url, body)
+        entry = self._read_entry(key)
+        if entry is None:
+            return key, None, {}, None
+
+        ttl = self.ttl if ttl is None else ttl
+        if ttl and time.time() - entry["fetched_at"] < ttl:
+            return key, entry, {}, FetchResult(entry["body"], unchanged=True, source="cache")
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return key, entry, headers, None
+
+    def complete(self, key: str, entry: Optional[Dict[str, Any]], status: int, headers, text: str, url: str = "") -> FetchResult:
+        """
+        After a request: stores the response and returns it as a FetchResult.
+        A 304 returns the cached body.
+        """
+        if status == 304 and entry is not None:
+            with self._lock:
+                self._write_meta(key, dict(entry, fetched_at=time.time()))
+            return FetchResult(entry["body"], unchanged=True, source="revalidated")
+
+        body_sha = _sha256(text.encode("utf-8"))
+        unchanged = entry is not None and entry["body_sha"] == body_sha
+        with self._lock:
+            path = self._body_path(body_sha)
+            if not os.path.exists(path):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+            self._write_meta(key, {
+                "url": url,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+                "body_sha": body_sha,
+            })
+            if entry is not None and not unchanged:
+                self._drop_body(entry["body_sha"])
+        return FetchResult(text, unchanged=unchanged, source="hash" if unchanged else "network")
+
+    def _write_meta(self, key: str, meta: Dict[str, Any]):
+        meta.pop("body", None)
+        tmp = self._meta_path(key) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path(key))
+
+    def _drop_body(self, body_sha: str):
+        """Deletes a body no other entry points to."""
+        meta_dir = os.path.join(self.directory, "meta")
+        for name in os.listdir(meta_dir):
+            try:
+                with open(os.path.join(meta_dir, name), "r", encoding="utf-8") as f:
+                    if json.load(f).get("body_sha") == body_sha:
+                        return
+            except (OSError, ValueError):
+                continue
+        try:
+            os.remove(self._body_path(body_sha))
+        except OSError:
+            pass
+
+_cache = None
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+# --- Parse cache ---
+
+# Bump when extraction changes in a way that invalidates stored results
+PARSE_CACHE_VERSION = 4
+
+_SCRIPT_BODY = re.compile(r"(<(script|style)\b[^>]*>)(.*?)(</\2\s*>)", re.IGNORECASE | re.DOTALL)
+# Prices a script may hold (JSON state, "$5.99"): kept, so a price change still misses
+_SCRIPT_PRICE = re.compile(r"(?<![\d.])\d{1,4}[.,]\d{2}(?!\d)")
+_NOISE = [
+    # Per-response attributes: CSP nonces, CSRF tokens, Angular's per-build scoping
+    (re.compile(r"\s(?:nonce|integrity|data-csrf|csrf-token|_ngcontent-[\w-]+|_nghost-[\w-]+)(?:=(?:\"[^\"]*\"|'[^']*'|[^\s>]*))?", re.IGNORECASE), ""),
+    (re.compile(r"(<meta\b[^>]*name=[\"']?csrf[\w-]*[\"']?[^>]*>)", re.IGNORECASE), ""),
+    # Cache-busting and tracking query parameters
+    (re.compile(r"([?&](?:v|ver|t|ts|_|cb|utm_\w+|gclid|fbclid)=)[^&\"'\s>]*", re.IGNORECASE), r"\1"),
+    # ISO timestamps and epoch seconds/milliseconds
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"(?<![\d.])1\d{9}(?:\d{3})?(?![\d.])"), "<ts>"),
+    (re.compile(r"\s+"), " "),
+]
+
+def content_fingerprint(content: str) -> str:
+    """
+    Hash of a page with the noise that changes between identical menus
+    removed: script/style bodies (except the prices in them), nonces, CSRF
+    tokens, cache-busting params, timestamps and whitespace runs.
+    """
+    text = _SCRIPT_BODY.sub(lambda m: m.group(1) + " ".join(_SCRIPT_PRICE.findall(m.group(3))) + m.group(4), content)
+    for pattern, replacement in _NOISE:
+        text = pattern.sub(replacement, text)
+    return _sha256(text.encode("utf-8"))
+
+class ParseCache:
+    """
+    On-disk extraction results: <key>.json holds a page's products and
+    promotion hits. The key covers the content fingerprint plus everything
+    else the results depend on (parser, its config, categories, keywords), so a
+    config change never returns stale results. Entries are touched on every hit
+    and pruned once unused for max_age_h.
+    """
+
+    def __init__(self, directory: str = PARSE_CACHE_DIR, max_age_h: float = PARSE_CACHE_MAX_AGE_H):
+        self.directory = directory
+        self.max_age_h = max_age_h
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._settings = json.dumps([PARSE_CACHE_VERSION, CATEGORIAS_PRODUCTOS, KEYWORDS_PROMOCION], sort_keys=True)
+
+    def key(self, parser, content: str) -> str:
+        config = json.dumps(getattr(parser, "config", {}), sort_keys=True, default=str)
+        return _sha256(f"{type(parser).__name__}\n{config}\n{self._settings}\n{content_fingerprint(content)}".encode("utf-8"))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, str]]]]:
+        """(products, promotion hits) stored for key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["products"], entry["promotions"]
+
+    def put(self, key: str, products: List[Dict[str, Any]], promotions: List[Dict[str, str]]):
+        tmp = f"{self._path(key)}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"products": products, "promotions": promotions, "stored_at": time.time()}, f, ensure_ascii=False)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            print(f"   [ParseCache] Could not store entry ({e})")
+
+    def prune(self):
+        """Deletes entries not used for max_age_h."""
+        cutoff = time.time() - self.max_age_h * 3600
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                continue
+
+_parse_cache = None
+
+def get_parse_cache() -> ParseCache:
+    """Process-wide parse cache; stale entries are pruned when it is first opened."""
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = ParseCache()
+        _parse_cache.prune()
+    return _parse_cache
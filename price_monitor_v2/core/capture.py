@@ -0,0 +1,79 @@
+
+import time
+import asyncio
+from typing import List, Dict, Any
+from price_monitor_v2.config.settings import CAPTURE_QUIET_MS, CAPTURE_MAX_MS
+from price_monitor_v2.core.api_replay import request_template
+
+class JsonCapture:
+    """
+    Records XHR/fetch responses whose URL contains one of `url_patterns` and
+    whose body is JSON, while a Playwright page loads.
+    Bodies are read after the page settles, not inside the event handler.
+    """
+
+    def __init__(self, url_patterns: List[str]):
+        self.url_patterns = list(url_patterns)
+        self._responses = []
+        self._last_match = None
+
+    def matches(self, response) -> bool:
+        request = response.request
+        if request.resource_type not in ("xhr", "fetch"):
+            return False
+        if "json" not in (response.headers.get("content-type") or ""):
+            return False
+        return any(pattern in response.url for pattern in self.url_patterns)
+
+    def _on_response(self, response):
+        if self.matches(response):
+            self._responses.append(response)
+            self._last_match = time.monotonic()
+
+    def attach(self, page):
+        page.on("response", self._on_response)
+
+    def _settled(self, start: float, quiet_ms: int, max_ms: int) -> bool:
+        now = time.monotonic()
+        if (now - start) * 1000 >= max_ms:
+            return True
+        return self._last_match is not None and (now - self._last_match) * 1000 >= quiet_ms
+
+    def wait(self, page, quiet_ms: int = CAPTURE_QUIET_MS, max_ms: int = CAPTURE_MAX_MS):
+        """Returns once matches stop arriving for quiet_ms (or after max_ms)."""
+        start = time.monotonic()
+        while not self._settled(start, quiet_ms, max_ms):
+            page.wait_for_timeout(100)
+
+    async def wait_async(self, page, quiet_ms: int = CAPTURE_QUIET_MS, max_ms: int = CAPTURE_MAX_MS):
+        start = time.monotonic()
+        while not self._settled(start, quiet_ms, max_ms):
+            await asyncio.sleep(0.1)
+
+    def _entry(self, response, data, headers) -> Dict[str, Any]:
+        return {
+            "url": response.url,
+            "method": response.request.method,
+            "status": response.status,
+            "data": data,
+            # Kept so the call can be replayed without a browser (see api_replay)
+            "request": request_template(response.request, headers),
+        }
+
+    def collect(self) -> List[Dict[str, Any]]:
+        captured = []
+        for response in self._responses:
+            try:
+                captured.append(self._entry(response, response.json(), response.request.all_headers()))
+            except Exception as e:
+                print(f"   Warning: Could not read JSON from {response.url} ({e})")
+        return captured
+
+    async def collect_async(self) -> List[Dict[str, Any]]:
+        captured = []
+        for response in self._responses:
+            try:
+                captured.append(self._entry(response, await response.json(), await response.request.all_headers()))
+            except Exception as e:
+                print(f"   Warning: Could not read JSON from {response.url} ({e})")
+        return captured
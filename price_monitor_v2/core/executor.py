@@ -0,0 +1,178 @@
+
+import os
+import time
+import signal
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Tuple
+
+from price_monitor_v2.config.settings import MAX_WORKERS, COMPETITOR_DEADLINE_S, PARSE_WORKERS
+from price_monitor_v2.core.network import NetworkManager
+
+def process_competitor(comp: Dict[str, Any], skip_unchanged: bool = False, last_fingerprints: Optional[List[str]] = None,
+                       parse_workers: int = PARSE_WORKERS) -> Dict[str, Any]:
+    """
+    Fetch + parse stage for one competitor, run inside a worker thread or process.
+    Each worker gets its own NetworkManager: the Playwright sync API is bound to
+    the thread that started it.
+    last_fingerprints: the competitor's page fingerprints from the last cycle.
+    parse_workers: parse pool size for this competitor's pages (1 = in-process).
+    """
+    # Deferred import: main imports this module
+    from price_monitor_v2.main import PARSER_MAP, check_competitor
+
+    network = NetworkManager()
+    try:
+        parser = PARSER_MAP[comp["parser"]](network, comp)
+        result = check_competitor(parser, comp, skip_unchanged, last_fingerprints, parse_workers=parse_workers)
+        result["failures"] = network.failures
+        return result
+    finally:
+        network.close()
+
+def _register_worker(pids):
+    # Process pool initializer: reports the worker's PID so it can be terminated
+    pids.put(os.getpid())
+
+def run_concurrently(competitors: List[Dict[str, Any]], mode: str = "thread", max_workers: int = MAX_WORKERS, skip_unchanged: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs process_competitor for every competitor on a thread or process pool.
+    Each competitor has a deadline (its "deadline_s" or COMPETITOR_DEADLINE_S),
+    counted from the start of the cycle. Late or failed competitors are left out
+    of the returned {name: result} dict. Late process workers are terminated;
+    late threads cannot be killed and finish in the background. Process workers
+    extract their pages in-process: a parse pool per worker would start
+    max_workers * PARSE_WORKERS processes.
+    skip_unchanged: {name: last cycle's page fingerprints} of the competitors
+    whose stored results can be reused when their content is unchanged.
+    """
+    skip_unchanged = skip_unchanged or {}
+    if mode == "process":
+        pids = multiprocessing.SimpleQueue()
+        executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_register_worker, initargs=(pids,))
+        parse_workers = 1
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        parse_workers = PARSE_WORKERS
+    start = time.monotonic()
+
+    futures = {}
+    for comp in competitors:
+        future = executor.submit(process_competitor, comp, comp["name"] in skip_unchanged, skip_unchanged.get(comp["name"]), parse_workers)
+        futures[future] = (comp["name"], start + comp.get("deadline_s", COMPETITOR_DEADLINE_S))
+
+    results = {}
+    pending = set(futures)
+    try:
+        while pending:
+            next_deadline = min(futures[f][1] for f in pending)
+            done, pending = wait(pending, timeout=max(0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = futures[future][0]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    print(f"   Error processing {name}: {e}")
+
+            now = time.monotonic()
+            for future in list(pending):
+                name, deadline = futures[future]
+                if now >= deadline:
+                    print(f"   [Deadline] {name} exceeded {deadline - start:.0f}s, skipping this cycle")
+                    future.cancel()
+                    pending.discard(future)
+    finally:
+        hung = any(not f.done() for f in futures)
+        executor.shutdown(wait=not hung, cancel_futures=True)
+        if hung and mode == "process":
+            # A hung site would otherwise keep its worker (and Chromium) alive
+            while not pids.empty():
+                try:
+                    os.kill(pids.get(), signal.SIGTERM)
+                except OSError:
+                    pass  # Already exited
+    return results
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+def get_parse_pool(max_workers: int = PARSE_WORKERS) -> ProcessPoolExecutor:
+    """Process pool for page extraction, started on first use and kept across cycles."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=max_workers)
+        return _parse_pool
+
+def reset_parse_pool():
+    """Drops a broken parse pool; the next get_parse_pool() starts a new one."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+def extract_page(parser, doc) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]], bool, Optional[str]]:
+    """
+    (products, promotion hits, cached, fingerprint) for one ParsedDocument
+    (see BaseParser.extract_cached). Its tree is released afterwards.
+    """
+    try:
+        return parser.extract_cached(doc)
+    finally:
+        doc.release()
+
+def merge_outcomes(outcomes) -> Tuple[List[Dict[str, Any]], Dict[str, str], Optional[List[str]]]:
+    """
+    Merges per-page (products, promotion hits, cached, fingerprint) in page
+    order: products deduplicated by (category, price), promotions as
+    {keyword: first snippet}, plus the page fingerprints (None when a page
+    has none).
+    """
+    all_products = []
+    found_promos = {}
+    fingerprints = []
+    for page_count, (products, hits, cached, fingerprint) in enumerate(outcomes):
+        all_products.extend(products)
+        for hit in hits:
+            found_promos.setdefault(hit["keyword"], hit["snippet"])
+        fingerprints.append(fingerprint)
+        print(f"   Found {len(products)} products on page {page_count + 1}{' (parse cache)' if cached else ''}")
+
+    # Deduplicate globally
+    unique_products = []
+    seen = set()
+    for p in all_products:
+        k = (p["categoria"], p["precio"])
+        if k not in seen:
+            seen.add(k)
+            unique_products.append(p)
+
+    print(f"   Total Unique Products: {len(unique_products)}")
+    return unique_products, found_promos, fingerprints if fingerprints and None not in fingerprints else None
+
+def _extract_in_worker(parser_cls, config: Dict[str, Any], content: str):
+    # Runs in a parse worker: extraction needs no network
+    from price_monitor_v2.utils.document import ParsedDocument
+    return extract_page(parser_cls(None, config), ParsedDocument(content))
+
+def extract_in_pool(parser, docs, max_workers: int = PARSE_WORKERS) -> Optional[List[Tuple[List[Dict[str, Any]], List[Dict[str, str]], bool, Optional[str]]]]:
+    """
+    extract_page for every doc on the parse pool, results in page order.
+    Returns None when the pages should be extracted in-process instead: pool
+    disabled (max_workers <= 1), a single page, pages already parsed (their
+    tree is reused) or a broken pool (restarted on the next call).
+    """
+    if max_workers <= 1 or len(docs) < 2 or any(doc.parsed for doc in docs):
+        return None
+    try:
+        pool = get_parse_pool(max_workers)
+        futures = [pool.submit(_extract_in_worker, type(parser), parser.config, doc.content) for doc in docs]
+        return [future.result() for future in futures]
+    except Exception as e:
+        # BrokenProcessPool, pickling errors...: the caller parses in-process
+        print(f"   [Parse] Process pool failed ({type(e).__name__}: {e}), parsing in-process")
+        reset_parse_pool()
+        return None
@@ -0,0 +1,119 @@
+
+from typing import Optional, List
+from price_monitor_v2.config.settings import FETCH_PROFILES, BLOCKED_BYTES_ESTIMATE
+
+# URL globs for resource types, for blocking without request interception
+RESOURCE_TYPE_GLOBS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.m3u8"],
+    "stylesheet": ["*.css"],
+}
+
+class FetchProfile:
+    """
+    Request-routing rules for a Playwright page load.
+    Blocks resource types (images, fonts, ...) and URL patterns (trackers) we never
+    read, and keeps count of what was skipped.
+    """
+
+    def __init__(self, name: str, block_resource_types=None, block_url_patterns=None):
+        self.name = name
+        self.block_resource_types = set(block_resource_types or [])
+        self.block_url_patterns = list(block_url_patterns or [])
+        self.blocked_requests = 0
+        self.blocked_bytes = 0
+
+    @classmethod
+    def from_name(cls, name: Optional[str]) -> Optional["FetchProfile"]:
+        """Builds a profile from FETCH_PROFILES. Returns None when nothing is blocked."""
+        if not name:
+            return None
+        rules = FETCH_PROFILES.get(name)
+        if rules is None:
+            print(f"   Warning: Unknown fetch profile '{name}'")
+            return None
+        if not rules.get("block_resource_types") and not rules.get("block_url_patterns"):
+            return None
+        return cls(name, rules.get("block_resource_types"), rules.get("block_url_patterns"))
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.block_resource_types:
+            return True
+        return any(pattern in url for pattern in self.block_url_patterns)
+
+    def _check(self, request) -> bool:
+        if not self.should_block(request.resource_type, request.url):
+            return False
+        self.blocked_requests += 1
+        # Aborted requests never report a size, so we count a per-type estimate
+        self.blocked_bytes += BLOCKED_BYTES_ESTIMATE.get(request.resource_type, BLOCKED_BYTES_ESTIMATE["other"])
+        return True
+
+    def _handle_route(self, route):
+        if self._check(route.request):
+            route.abort()
+        else:
+            route.continue_()
+
+    async def _handle_route_async(self, route):
+        if self._check(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def attach(self, target):
+        """Installs the routing rules on a Playwright Page or BrowserContext."""
+        target.route("**/*", self._handle_route)
+
+    async def attach_async(self, target):
+        """Same as attach() for the Playwright async API."""
+        await target.route("**/*", self._handle_route_async)
+
+    def url_globs(self) -> List[str]:
+        globs = [f"*{pattern}*" for pattern in self.block_url_patterns]
+        for resource_type in self.block_resource_types:
+            globs += RESOURCE_TYPE_GLOBS.get(resource_type, [])
+        return globs
+
+    def _on_request_failed(self, request):
+        if "ERR_BLOCKED_BY_CLIENT" in (request.failure or ""):
+            self.blocked_requests += 1
+            self.blocked_bytes += BLOCKED_BYTES_ESTIMATE.get(request.resource_type, BLOCKED_BYTES_ESTIMATE["other"])
+
+    def attach_cached(self, page):
+        """
+        Blocks by URL through CDP (Network.setBlockedURLs) instead of routing.
+        Playwright turns the HTTP cache off for routed pages, so persistent
+        profiles use this to keep their disk cache. Resource types are matched
+        by file extension, which is less exact than routing.
+        """
+        cdp = page.context.new_cdp_session(page)
+        cdp.send("Network.enable")
+        cdp.send("Network.setBlockedURLs", {"urls": self.url_globs()})
+        page.on("requestfailed", self._on_request_failed)
+
+    async def attach_cached_async(self, page):
+        cdp = await page.context.new_cdp_session(page)
+        await cdp.send("Network.enable")
+        await cdp.send("Network.setBlockedURLs", {"urls": self.url_globs()})
+        page.on("requestfailed", self._on_request_failed)
+
+    def attach_page(self, page, persistent: bool = False):
+        """
+        attach_cached() for a page in a persistent profile (routing would
+        switch off the profile's HTTP cache), attach() otherwise.
+        """
+        if persistent:
+            self.attach_cached(page)
+        else:
+            self.attach(page)
+
+    async def attach_page_async(self, page, persistent: bool = False):
+        if persistent:
+            await self.attach_cached_async(page)
+        else:
+            await self.attach_async(page)
+
+    def summary(self) -> str:
+        return f"blocked {self.blocked_requests} requests (~{self.blocked_bytes / 1024:.0f} KB est.)"
@@ -0,0 +1,122 @@
+
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from price_monitor_v2.config.settings import (
+    HTTP_POOL_SIZE, HTTP_MAX_RETRIES, HTTP_RETRY_BACKOFF
+)
+
+def _accept_encoding() -> str:
+    """Only advertise brotli when urllib3 can actually decode it."""
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        pass
+    try:
+        import brotlicffi  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+class SessionPool:
+    """
+    Keep-alive requests.Session per host (scheme://netloc).
+    Each session mounts an HTTPAdapter with a bounded connection pool and a
+    urllib3 retry policy, so repeated calls reuse TCP/TLS connections and
+    proxy tunnels instead of reconnecting every time.
+    """
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, max_retries: int = HTTP_MAX_RETRIES, backoff: float = HTTP_RETRY_BACKOFF):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._sessions: Dict[str, requests.Session] = {}
+        self._requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _build_session(self) -> requests.Session:
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            # POST is only retried on connection errors (the request never left)
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Accept-Encoding"] = _accept_encoding()
+        session.headers["Connection"] = "keep-alive"
+        return session
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def session_for(self, url: str) -> requests.Session:
+        key = self.host_key(url)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._build_session()
+                self._sessions[key] = session
+                self._requests[key] = 0
+            self._requests[key] += 1
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return self.session_for(url).request(method, url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Per-host counters: requests issued and connections actually opened
+        (including those opened through a proxy).
+        """
+        result = {}
+        with self._lock:
+            items = list(self._sessions.items())
+        for key, session in items:
+            opened = 0
+            adapter = session.get_adapter(key + "/")
+            managers = [adapter.poolmanager] + list(getattr(adapter, "proxy_manager", {}).values())
+            for manager in managers:
+                if manager is None:
+                    continue
+                for pool_key in list(manager.pools.keys()):
+                    pool = manager.pools.get(pool_key)
+                    if pool is not None:
+                        opened += getattr(pool, "num_connections", 0)
+            result[key] = {"requests": self._requests.get(key, 0), "connections": opened}
+        return result
+
+    def log_stats(self):
+        for host, s in self.stats().items():
+            print(f"   [HTTP] {host}: {s['requests']} requests over {s['connections']} connections")
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._requests.clear()
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+def get_session_pool() -> SessionPool:
+    """Process-wide pool shared by NetworkManager and the notifier."""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = SessionPool()
+        return _shared_pool
@@ -1,91 +1,168 @@
 
-import requests
-import random
-import time
-from playwright.sync_api import sync_playwright
-try:
-    from fake_useragent import UserAgent
-    ua_rotator = UserAgent()
-except ImportError:
-    ua_rotator = None
-
-from price_monitor_v2.config.settings import PROXY_URL, DEFAULT_HEADERS
-
-class NetworkManager:
+import json
+from price_monitor_v2.config.settings import HTTP_CACHE, BREAKER_PROBE_TIMEOUT_S
+from price_monitor_v2.core.browser_pool import BrowserPool
+from price_monitor_v2.core.fetch_profile import FetchProfile
+from price_monitor_v2.core.http_session import get_session_pool
+from price_monitor_v2.core.waits import wait_for_content
+from price_monitor_v2.core.capture import JsonCapture
+from price_monitor_v2.core.cache import get_response_cache
+from price_monitor_v2.core.network_base import NetworkBase
+from price_monitor_v2.core.resilience import check_response, classify_exception
+from price_monitor_v2.core.proxy_pool import playwright_proxy
+
+class NetworkManager(NetworkBase):
     def __init__(self):
-        self.proxy = PROXY_URL if PROXY_URL else None
+        super().__init__()
+        self.sessions = get_session_pool()
 
-    def _get_headers(self):
-        headers = DEFAULT_HEADERS.copy()
-        if ua_rotator:
-            try:
-                headers["User-Agent"] = ua_rotator.random
-            except:
-                pass
-        return headers
-
-    def _get_proxy_config(self):
-        """Returns Playwright proxy config dictionary if proxy is set."""
-        if not self.proxy:
-            return None
-        return {"server": self.proxy}
+    @property
+    def browser_pool(self) -> BrowserPool:
+        """Lazily created so HTTP-only runs never start Playwright."""
+        if self._browser_pool is None:
+            self._browser_pool = BrowserPool(proxy_config=self._get_proxy_config())
+        return self._browser_pool
+
+    def close(self):
+        """Releases the pooled browser. Safe to call more than once."""
+        if self._browser_pool is not None:
+            self._browser_pool.close()
+            self._browser_pool = None
+
+    def probe(self, url: str) -> bool:
+        """
+        Cheap reachability check used by half-open circuit breakers: one GET
+        with a short timeout, body not downloaded. Any answer below 500 other
+        than a block counts, since bot protection often rejects plain HTTP
+        clients on pages Playwright loads fine.
+        """
+        print(f"   [Probe] {url}")
+        try:
+            self.rate_limiter.acquire(url)
+            with self.proxies.track(url) as proxy:
+                resp = self.sessions.request("GET", url, headers=self._get_headers(url), proxies=self._get_requests_proxies(proxy),
+                                             timeout=BREAKER_PROBE_TIMEOUT_S, stream=True)
+                resp.close()
+            return resp.status_code < 500 and resp.status_code != 429
+        except Exception as e:
+            print(f"   [Probe] Failed ({classify_exception(e)}): {e}")
+            return False
 
-    def _get_requests_proxies(self):
-        """Returns Requests proxies dictionary if proxy is set."""
-        if not self.proxy:
+    def preconnect(self, url: str) -> bool:
+        """
+        Opens a keep-alive connection (DNS, TCP, TLS, proxy tunnel) to url's
+        origin with a HEAD request, so the first real fetch reuses it.
+        """
+        origin = self.sessions.host_key(url) + "/"
+        try:
+            self.rate_limiter.acquire(origin)
+            with self.proxies.track(origin) as proxy:
+                resp = self.sessions.request("HEAD", origin, headers=self._get_headers(origin), proxies=self._get_requests_proxies(proxy),
+                                             timeout=BREAKER_PROBE_TIMEOUT_S, allow_redirects=False)
+            return resp.status_code < 500
+        except Exception as e:
+            print(f"   [Prewarm] Could not preconnect to {origin} ({classify_exception(e)})")
+            return False
+
+    def _get_requests_proxies(self, proxy):
+        """Returns Requests proxies dictionary for the chosen pool proxy."""
+        if not proxy:
             return None
-        return {"http": self.proxy, "https": self.proxy}
+        return {"http": proxy, "https": proxy}
 
-    def fetch_with_requests(self, url: str, method="GET", json_payload=None) -> str:
-        """Standard HTTP request."""
+    def fetch_with_requests(self, url: str, method="GET", json_payload=None, headers=None, data=None, use_cache=True, cache_ttl=None) -> str:
+        """
+        Standard HTTP request.
+        headers: Extra headers over the defaults (e.g. replayed API templates).
+        data: Raw request body, used instead of json_payload.
+        use_cache / cache_ttl: On-disk response cache (see core/cache.py). The
+        returned FetchResult has unchanged=True when the body didn't change.
+        """
         print(f"   [Requests] Connecting to {url}...")
         try:
-            proxies = self._get_requests_proxies()
-            headers = self._get_headers()
-            
-            if method == "POST":
-                resp = requests.post(url, json=json_payload, headers=headers, proxies=proxies, timeout=30)
-            else:
-                resp = requests.get(url, headers=headers, proxies=proxies, timeout=30)
-            
-            resp.raise_for_status()
+            request_headers = self._get_headers(url)
+            if headers:
+                request_headers.update(headers)
+
+            cache = get_response_cache() if (use_cache and HTTP_CACHE) else None
+            if cache:
+                key, entry, conditional, fresh = cache.prepare(method, url, json_payload if data is None else data, cache_ttl)
+                if fresh is not None:
+                    print("   [Cache] Fresh copy, request skipped")
+                    return fresh
+                request_headers.update(conditional)
+
+            self.rate_limiter.acquire(url)
+            with self.proxies.track(url) as proxy:
+                proxies = self._get_requests_proxies(proxy)
+                if method == "GET":
+                    resp = self.sessions.request("GET", url, headers=request_headers, proxies=proxies, timeout=30)
+                else:
+                    resp = self.sessions.request(method, url, json=json_payload, data=data, headers=request_headers, proxies=proxies, timeout=30)
+                
+                if resp.status_code != 304:
+                    # Bad statuses and block pages raise, so they never reach the cache
+                    check_response(url, resp.status_code, resp.text)
+            if cache:
+                result = cache.complete(key, entry, resp.status_code, resp.headers, resp.text, url)
+                if result.unchanged:
+                    print(f"   [Cache] Unchanged ({result.source})")
+                return result
             return resp.text
         except Exception as e:
-            print(f"   Error (Requests): {e}")
+            kind = self._record_failure(url, e)
+            print(f"   Error (Requests, {kind}): {e}")
             return ""
 
-    def fetch_with_playwright(self, url: str, wait_selector=None, interactive_callback=None) -> str:
+    def replay_requests(self, templates) -> list:
+        """
+        Replays recorded API templates over plain HTTP.
+        Returns capture-style entries, or [] as soon as one call fails or isn't JSON.
+        """
+        replayed = []
+        for t in templates:
+            body = self.fetch_with_requests(t["url"], method=t["method"], headers=t["headers"], data=t.get("post_data"))
+            if not body:
+                return []
+            try:
+                data = json.loads(body)
+            except ValueError:
+                print(f"   [Replay] Non-JSON response from {t['url']}")
+                return []
+            replayed.append({
+                "url": t["url"], "method": t["method"], "status": 200, "data": data, "request": t,
+                "unchanged": getattr(body, "unchanged", False),
+            })
+        return replayed
+
+    def fetch_with_playwright(self, url: str, wait_selector=None, interactive_callback=None, fetch_profile=None, wait=None, persistent_profile=None) -> str:
         """
         Playwright fetch.
         interactive_callback: Function that takes (page) and performs actions (clicking, scrolling).
+        fetch_profile: Name of a FETCH_PROFILES entry with resources to block.
+        wait: Overrides for WAIT_STRATEGY (used when there is no callback).
+        persistent_profile: Competitor name whose persistent browser profile
+        (disk cache, cookies) to load the page in, instead of a fresh context.
         """
         print(f"   [Playwright] Connecting to {url}...")
-        try:
-            with sync_playwright() as p:
-                proxy_cfg = self._get_proxy_config()
-                
-                # Launch options
-                launch_args = {
-                    "headless": True,
-                    "args": ["--no-sandbox", "--disable-setuid-sandbox"]
-                }
-                if proxy_cfg:
-                    launch_args["proxy"] = proxy_cfg
-                
-                browser = p.chromium.launch(**launch_args)
-                
-                # Context with User Agent
-                context = browser.new_context(
-                    user_agent=self._get_headers()["User-Agent"],
-                    viewport={"width": 1366, "height": 768}
-                )
-                
+        profile = FetchProfile.from_name(fetch_profile)
+        context_args = self._context_args()
+
+        def attempt():
+            self.rate_limiter.acquire(url)
+            # Each attempt picks a proxy again, so a retry can go through another one
+            # (persistent profiles keep theirs until it cools down)
+            with self.proxies.track(url, pin=persistent_profile) as proxy, \
+                    self.browser_pool.context(persistent_profile, proxy=playwright_proxy(proxy), **context_args) as context:
                 page = context.new_page()
+                if profile:
+                    profile.attach_page(page, persistent=bool(persistent_profile))
                 
                 # Navigation
                 # 'domcontentloaded' is faster; 'networkidle' is safer.
                 # If using callback, we rely on it to wait.
-                page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                response = page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                check_response(url, response.status if response else None)
                 
                 if wait_selector:
                     try:
@@ -97,12 +174,62 @@ class NetworkManager:
                 if interactive_callback:
                     interactive_callback(page)
                 else:
-                    # Default wait if no interaction
-                    time.sleep(3)
+                    # Return as soon as the price-bearing DOM settles
+                    wait_for_content(page, wait)
+
+                html = page.content()
+                check_response(url, None, html)
+                return html
 
-                content = page.content()
-                browser.close()
-                return content
+        try:
+            return self.retry.run(attempt, url)
         except Exception as e:
-            print(f"   Error (Playwright): {e}")
+            kind = self._record_failure(url, e)
+            print(f"   Error (Playwright, {kind}): {e}")
             return ""
+        finally:
+            if profile:
+                self.blocked_requests += profile.blocked_requests
+                self.blocked_bytes += profile.blocked_bytes
+                print(f"   [Profile] {profile.name}: {profile.summary()}")
+
+    def capture_json_responses(self, url: str, url_patterns, wait_selector=None, fetch_profile=None, persistent_profile=None) -> list:
+        """
+        Loads the page and records the JSON XHR/fetch responses whose URL contains
+        one of url_patterns. Returns [{"url", "method", "status", "data"}, ...].
+        Returns as soon as matching responses stop arriving, without waiting for
+        the page to finish rendering.
+        """
+        print(f"   [Capture] Loading {url} (JSON responses matching {url_patterns})...")
+        profile = FetchProfile.from_name(fetch_profile)
+        capture = JsonCapture(url_patterns)
+        try:
+            context_args = self._context_args()
+            self.rate_limiter.acquire(url)
+            with self.proxies.track(url, pin=persistent_profile) as proxy, \
+                    self.browser_pool.context(persistent_profile, proxy=playwright_proxy(proxy), **context_args) as context:
+                page = context.new_page()
+                if profile:
+                    profile.attach_page(page, persistent=bool(persistent_profile))
+                capture.attach(page)
+
+                response = page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                check_response(url, response.status if response else None)
+                if wait_selector:
+                    try:
+                        page.wait_for_selector(wait_selector, timeout=20000)
+                    except:
+                        print(f"   Warning: Timeout waiting for selector {wait_selector}")
+
+                capture.wait(page)
+                captured = capture.collect()
+                print(f"   [Capture] {len(captured)} JSON responses")
+                return captured
+        except Exception as e:
+            kind = self._record_failure(url, e)
+            print(f"   Error (Capture, {kind}): {e}")
+            return []
+        finally:
+            if profile:
+                self.blocked_requests += profile.blocked_requests
+                self.blocked_bytes += profile.blocked_bytes
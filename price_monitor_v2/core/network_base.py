@@ -0,0 +1,54 @@
+
+from price_monitor_v2.config.settings import DEFAULT_HEADERS
+from price_monitor_v2.core.rate_limit import get_rate_limiter
+from price_monitor_v2.core.resilience import RetryPolicy, classify_exception
+from price_monitor_v2.core.proxy_pool import get_proxy_pool
+from price_monitor_v2.core.user_agents import get_ua_provider
+
+class NetworkBase:
+    """
+    State and helpers shared by NetworkManager and AsyncNetworkManager:
+    process-wide proxy pool and rate limiter, per-host identities, the
+    failures fed to the circuit breakers and the blocked-resource counters.
+    """
+
+    def __init__(self):
+        self.proxies = get_proxy_pool()
+        self._browser_pool = None
+        self.rate_limiter = get_rate_limiter()
+        self.retry = RetryPolicy()
+        # host -> error class of the last failed fetch this cycle (feeds the circuit breakers)
+        self.failures = {}
+        self._identities = {}
+        self.blocked_requests = 0
+        self.blocked_bytes = 0
+
+    def _get_headers(self, url: str):
+        """Default headers with the host's User-Agent and matching client hints."""
+        host = self.rate_limiter.host_of(url)
+        if host not in self._identities:
+            # Sticky per host: a site sees one browser for the whole run
+            self._identities[host] = get_ua_provider().sample()
+        headers = DEFAULT_HEADERS.copy()
+        headers.update(self._identities[host].headers())
+        return headers
+
+    def _context_args(self):
+        """Options for a new BrowserContext, with a fresh Chromium identity."""
+        args = {"viewport": {"width": 1366, "height": 768}}
+        args.update(get_ua_provider().sample(chromium_only=True).context_args())
+        return args
+
+    def _record_failure(self, url: str, exc: Exception) -> str:
+        kind = classify_exception(exc)
+        self.failures[self.rate_limiter.host_of(url)] = kind
+        return kind
+
+    def _get_proxy_config(self):
+        """
+        Launch-level Playwright proxy. With a proxy pool every context sets its
+        own proxy; the placeholder is what Chromium needs to allow that.
+        """
+        if not self.proxies.proxies:
+            return None
+        return {"server": "http://per-context"}
@@ -1,6 +1,6 @@
 
-import requests
 from price_monitor_v2.config.settings import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from price_monitor_v2.core.http_session import get_session_pool
 
 def send_telegram_alert(message: str) -> bool:
     """
@@ -18,7 +18,7 @@ def send_telegram_alert(message: str) -> bool:
     }
     
     try:
-        resp = requests.post(url, json=payload, timeout=10)
+        resp = get_session_pool().request("POST", url, json=payload, timeout=10)
         return resp.status_code == 200
     except Exception as e:
         print(f"   [Telegram] Error: {e}")
@@ -0,0 +1,197 @@
+
+import time
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Tuple
+
+from price_monitor_v2.config.settings import PARSE_WORKERS, PIPELINE_QUEUE_SIZE
+from price_monitor_v2.core.executor import get_parse_pool, extract_page, merge_outcomes, reset_parse_pool
+from price_monitor_v2.utils.document import ParsedDocument
+
+MAX_PAGES = 5 # Pagination limit per competitor, as in fetch_pages
+
+def _parse_page(parser_cls, config: Dict[str, Any], content: str, extract: bool, paginate: bool):
+    """
+    Parse stage for one page (runs in a pool worker): (extract_page outcome,
+    next page URL, seconds spent). extract=False only looks for the next page
+    (unchanged content whose results may be reused).
+    """
+    start = time.monotonic()
+    parser = parser_cls(None, config)
+    doc = ParsedDocument(content)
+    next_link = parser.detect_pagination(doc) if paginate else None
+    outcome = extract_page(parser, doc) if extract else ([], [], False, None)
+    return outcome, next_link, time.monotonic() - start
+
+class FetchParsePipeline:
+    """
+    FETCH_MODE=pipeline: the calling thread fetches (Playwright's sync API is
+    bound to it) while a process pool parses, so CPU-bound extraction of one
+    page overlaps the next page load.
+    Between the stages at most queue_size pages are in flight (submitted and
+    not yet collected); a fetch waits for a free slot, so raw pages never pile
+    up when parsing falls behind. Workers also detect pagination: next-page
+    URLs go back to the fetch queue.
+    """
+
+    def __init__(self, queue_size: int = PIPELINE_QUEUE_SIZE, max_workers: int = PARSE_WORKERS):
+        self.queue_size = max(1, queue_size)
+        self.max_workers = max_workers
+        self.stats = {"fetched": 0, "parsed": 0, "fetch_s": 0.0, "parse_s": 0.0,
+                      "blocked_s": 0.0, "idle_s": 0.0, "depth_samples": 0, "depth_total": 0, "depth_max": 0}
+
+    def run(self, jobs: List[Tuple[Dict[str, Any], Any]], skip_unchanged: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        jobs: (competitor config, parser) pairs. Returns {name: result} like
+        run_concurrently. skip_unchanged: {name: last cycle's page fingerprints}
+        of the competitors whose stored results can be reused when their
+        content is unchanged.
+        """
+        start = time.monotonic()
+        self.parsers = {comp["name"]: parser for comp, parser in jobs}
+        skip_unchanged = skip_unchanged or {}
+        self.skip = {comp["name"]: skip_unchanged[comp["name"]] for comp, _ in jobs if comp["name"] in skip_unchanged}
+        self.fetch_queue = deque((comp["name"], comp["url"], (0,)) for comp, _ in jobs)
+        self.in_flight: Dict[Future, Tuple[str, str, Tuple[int, ...]]] = {}
+        self.outstanding = {name: 1 for name in self.parsers} # Queued fetches + pages in flight
+        self.outcomes = {name: {} for name in self.parsers} # page key -> extract_page outcome
+        self.deferred = {name: {} for name in self.parsers} # page key -> unchanged content not extracted
+        self.results = {}
+
+        while self.fetch_queue or self.in_flight:
+            if self.fetch_queue:
+                self._wait_for_slot()
+                self._fetch(*self.fetch_queue.popleft())
+            else:
+                # Nothing left to fetch until a parse finds the next page
+                self._collect_some("idle_s")
+
+        self.stats["wall_s"] = time.monotonic() - start
+        return self.results
+
+    def _wait_for_slot(self):
+        """Backpressure: blocks while queue_size pages are waiting to be parsed."""
+        while len(self.in_flight) >= self.queue_size:
+            self._collect_some("blocked_s")
+
+    def _collect_some(self, stat: str):
+        waited = time.monotonic()
+        done, _ = wait(list(self.in_flight), return_when=FIRST_COMPLETED)
+        self.stats[stat] += time.monotonic() - waited
+        for future in done:
+            self._collect(future)
+
+    def _fetch(self, name: str, url: str, key: Tuple[int, ...]):
+        parser = self.parsers[name]
+        if key == (0,):
+            print(f"\n[+] Checking {name}")
+        print(f"   Fetching: {url}")
+        began = time.monotonic()
+        try:
+            content = parser.fetch_data(url)
+        except Exception as e:
+            print(f"   Error fetching {name}: {e}")
+            content = None
+        self.stats["fetch_s"] += time.monotonic() - began
+
+        if not content:
+            print("   Failed to fetch content")
+        elif isinstance(content, list):
+            # Independent page documents: parsed in parallel, not paginated
+            for i, page in enumerate(p for p in content if p):
+                self.stats["fetched"] += 1
+                self._wait_for_slot()
+                self._submit(name, url, key + (i,), page, paginate=False)
+        else:
+            self.stats["fetched"] += 1
+            self._submit(name, url, key, content, paginate=key[0] < MAX_PAGES - 1)
+        self._finish_one(name)
+
+    def _submit(self, name: str, url: str, key: Tuple[int, ...], content: str, paginate: bool, extract: bool = None):
+        if extract is None:
+            extract = not (name in self.skip and getattr(content, "unchanged", False))
+        if not extract:
+            self.deferred[name][key] = content
+        self.outstanding[name] += 1
+
+        parser = self.parsers[name]
+        args = (type(parser), parser.config, content, extract, paginate)
+        try:
+            if self.max_workers <= 1:
+                raise RuntimeError("parse pool disabled")
+            future = get_parse_pool(self.max_workers).submit(_parse_page, *args)
+        except Exception as e:
+            if self.max_workers > 1:
+                print(f"   [Pipeline] Parse pool unavailable ({e}), parsing in-process")
+                reset_parse_pool()
+                self.max_workers = 1
+            future = Future()
+            try:
+                future.set_result(_parse_page(*args))
+            except Exception as err:
+                future.set_exception(err)
+        self.in_flight[future] = (name, url, key)
+
+        depth = len(self.in_flight)
+        self.stats["depth_samples"] += 1
+        self.stats["depth_total"] += depth
+        self.stats["depth_max"] = max(self.stats["depth_max"], depth)
+
+    def _collect(self, future: Future):
+        name, url, key = self.in_flight.pop(future)
+        try:
+            outcome, next_link, seconds = future.result()
+        except Exception as e:
+            print(f"   Error parsing {name} ({url}): {e}")
+            outcome, next_link, seconds = ([], [], False, None), None, 0.0
+        self.stats["parsed"] += 1
+        self.stats["parse_s"] += seconds
+
+        if key not in self.deferred[name]:
+            self.outcomes[name][key] = outcome
+        if next_link and next_link != url:
+            self.outstanding[name] += 1
+            self.fetch_queue.append((name, next_link, (key[0] + 1,)))
+        self._finish_one(name)
+
+    def _finish_one(self, name: str):
+        self.outstanding[name] -= 1
+        if self.outstanding[name]:
+            return
+        deferred = self.deferred[name]
+        if deferred and not self.outcomes[name]:
+            print(f"\n[Parsed] {name}")
+            print("   [Cache] Content unchanged since last cycle, skipping parse")
+            self.results[name] = {"name": name, "products": None, "promos": [], "promo_snippets": {},
+                                  "unchanged": True, "fingerprints": None}
+            return
+        if deferred:
+            # Some pages changed after all: the unchanged ones need extracting too
+            self.deferred[name] = {}
+            for key, content in deferred.items():
+                self._submit(name, "", key, content, paginate=False, extract=True)
+            return
+
+        print(f"\n[Parsed] {name}")
+        outcomes = self.outcomes[name]
+        products, promos, fingerprints = merge_outcomes(outcomes[key] for key in sorted(outcomes))
+        # Same fingerprints as last cycle: unchanged apart from noise
+        unchanged = name in self.skip and fingerprints is not None and fingerprints == self.skip[name]
+        self.results[name] = {"name": name, "products": products, "promos": sorted(promos),
+                              "promo_snippets": promos, "unchanged": unchanged, "fingerprints": fingerprints}
+
+    def log_stats(self):
+        s = self.stats
+        if not s["fetched"]:
+            return
+        fetch_rate = s["fetched"] / s["fetch_s"] if s["fetch_s"] else 0
+        parse_rate = s["parsed"] / s["parse_s"] if s["parse_s"] else 0
+        print(f"   [Pipeline] fetch: {s['fetched']} pages in {s['fetch_s']:.1f}s ({fetch_rate:.2f}/s), "
+              f"parse: {s['parsed']} pages in {s['parse_s']:.1f}s CPU ({parse_rate:.2f}/s per worker), "
+              f"wall {s.get('wall_s', 0):.1f}s")
+        print(f"   [Pipeline] queue depth avg {s['depth_total'] / s['depth_samples']:.1f} / max {s['depth_max']} "
+              f"(limit {self.queue_size}); fetcher blocked {s['blocked_s']:.1f}s, waiting on parse {s['idle_s']:.1f}s")
+        if s["blocked_s"] > s["fetch_s"] * 0.1:
+            print("   [Pipeline] Parse stage is the bottleneck (raise PARSE_WORKERS)")
+        else:
+            print("   [Pipeline] Fetch stage is the bottleneck")
@@ -0,0 +1,66 @@
+
+import time
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit
+
+from price_monitor_v2.config.settings import FETCH_MODE
+from price_monitor_v2.core.proxy_pool import playwright_proxy
+
+def _warm_host(network, url: str) -> Dict[str, Any]:
+    host = urlsplit(url).hostname
+    result = {"host": host, "dns": False, "connected": False}
+    try:
+        socket.getaddrinfo(host, 443, proto=socket.IPPROTO_TCP)
+        result["dns"] = True
+    except OSError as e:
+        print(f"   [Prewarm] DNS lookup failed for {host} ({e})")
+        return result
+    result["connected"] = network.preconnect(url)
+    return result
+
+def prewarm(network, competitors: List[Dict[str, Any]], state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Gets a NetworkManager ready for the first cycle: resolves and connects to
+    every competitor host (in parallel) and, in serial mode, launches what the
+    Playwright competitors will use: the shared Chromium for those without a
+    persistent profile, each persistent profile through its pinned proxy.
+    Must run on the thread that will use `network`, since Playwright's sync API
+    is bound to it. Thread/process workers build their own managers, so only
+    the shared HTTP connections help them; async mode only gets the DNS cache.
+    state: dict updated in place as stages finish (read by the /health endpoint);
+    "ready" ends True only if every host connected and the browser stage did
+    not fail.
+    """
+    state = state if state is not None else {}
+    start = time.monotonic()
+
+    urls = {}
+    for comp in competitors:
+        urls.setdefault(urlsplit(comp["url"]).hostname, comp["url"])
+    with ThreadPoolExecutor(max_workers=max(1, len(urls))) as pool:
+        hosts = list(pool.map(lambda url: _warm_host(network, url), urls.values()))
+    state["hosts"] = {h["host"]: h["connected"] for h in hosts}
+    print(f"   [Prewarm] {sum(state['hosts'].values())}/{len(hosts)} hosts connected")
+
+    browser_comps = [c for c in competitors if c.get("use_playwright")]
+    if FETCH_MODE == "serial" and browser_comps:
+        try:
+            if any(not c.get("persistent_profile") for c in browser_comps):
+                network.browser_pool.get_browser()
+            for comp in browser_comps:
+                if comp.get("persistent_profile"):
+                    # The proxy the profile's fetches will be pinned to
+                    proxy = network.proxies.pinned(comp["name"], comp["url"])
+                    with network.browser_pool.context(comp["name"], proxy=playwright_proxy(proxy), **network._context_args()):
+                        pass
+            state["browser"] = True
+        except Exception as e:
+            print(f"   [Prewarm] Browser launch failed ({e})")
+            state["browser"] = False
+
+    state["ready"] = state.get("browser", True) and all(state["hosts"].values())
+    state["prewarm_s"] = round(time.monotonic() - start, 1)
+    print(f"   [Prewarm] Done in {state['prewarm_s']}s")
+    return state
@@ -0,0 +1,99 @@
+
+import time
+import random
+import asyncio
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from price_monitor_v2.config.settings import (
+    RATE_LIMIT_RPM, RATE_LIMIT_BURST, RATE_LIMIT_JITTER_S, RATE_LIMIT_HOSTS
+)
+
+class _Bucket:
+    def __init__(self, rpm: float, burst: int, jitter: float):
+        self.rate = rpm / 60.0
+        self.burst = max(1, burst)
+        self.jitter = jitter
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+class HostRateLimiter:
+    """
+    Token bucket per host: up to `burst` requests back to back, then one every
+    60/rpm seconds, plus a random 0..jitter seconds so requests don't land on
+    an exact beat. Different hosts never wait on each other.
+    Waiters reserve their slot under the lock and sleep outside it, so
+    threads and asyncio tasks share the same buckets. The limiter is per
+    process: process mode workers each keep their own.
+    """
+
+    def __init__(self, rpm: float = RATE_LIMIT_RPM, burst: int = RATE_LIMIT_BURST, jitter: float = RATE_LIMIT_JITTER_S, hosts: Optional[Dict[str, Dict]] = None):
+        self.rpm = rpm
+        self.burst = burst
+        self.jitter = jitter
+        self.hosts = RATE_LIMIT_HOSTS if hosts is None else hosts
+        self._buckets: Dict[str, _Bucket] = {}
+        self._waited: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlsplit(url).hostname or url
+
+    def _bucket(self, host: str) -> _Bucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            limits = self.hosts.get(host, {})
+            bucket = _Bucket(limits.get("rpm", self.rpm), limits.get("burst", self.burst), limits.get("jitter", self.jitter))
+            self._buckets[host] = bucket
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        """Takes a token for url's host and returns how long to wait before using it."""
+        host = self.host_of(url)
+        with self._lock:
+            bucket = self._bucket(host)
+            if bucket.rate <= 0:
+                return 0.0
+            now = time.monotonic()
+            bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            # Going negative queues the caller behind the ones already waiting
+            bucket.tokens -= 1
+            delay = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+            if delay and bucket.jitter:
+                delay += random.uniform(0, bucket.jitter)
+            self._waited[host] = self._waited.get(host, 0.0) + delay
+        return delay
+
+    def acquire(self, url: str):
+        """Blocks until a request to url's host is allowed."""
+        delay = self.reserve(url)
+        if delay > 0:
+            print(f"   [RateLimit] {self.host_of(url)}: waiting {delay:.1f}s")
+            time.sleep(delay)
+
+    async def acquire_async(self, url: str):
+        delay = self.reserve(url)
+        if delay > 0:
+            print(f"   [RateLimit] {self.host_of(url)}: waiting {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def log_stats(self):
+        with self._lock:
+            waited = dict(self._waited)
+        for host, seconds in waited.items():
+            if seconds:
+                print(f"   [RateLimit] {host}: {seconds:.1f}s spent waiting")
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> HostRateLimiter:
+    """Process-wide limiter shared by every fetch path (sync and async)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = HostRateLimiter()
+        return _limiter
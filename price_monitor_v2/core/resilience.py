@@ -0,0 +1,162 @@
+
+import time
+import random
+import asyncio
+from datetime import datetime
+from typing import Optional, Dict, Any, Iterable
+
+from price_monitor_v2.config.settings import (
+    RETRY_ATTEMPTS, RETRY_BACKOFF_S, RETRY_ON,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN_S
+)
+
+# Error classes
+TIMEOUT = "timeout"
+CLIENT_ERROR = "client_error"   # 4xx other than the blocking ones
+SERVER_ERROR = "server_error"   # 5xx
+BLOCKED = "blocked"             # 403/429 or a bot-challenge page
+NETWORK = "network"             # DNS, refused/reset connection, TLS...
+
+BLOCKED_STATUSES = (403, 429)
+
+# Only strings that appear on challenge/deny pages, not on normal pages that
+# merely load a captcha or bot-detection script
+BLOCK_MARKERS = (
+    "<title>Just a moment...</title>",
+    "Attention Required! | Cloudflare",
+    "cf-browser-verification",
+    "px-captcha",
+    "Incapsula incident ID",
+    "<title>Access Denied</title>",
+)
+
+class FetchError(Exception):
+    """A fetch that returned something unusable (bad status or a block page)."""
+
+    def __init__(self, kind: str, url: str, status: Optional[int] = None):
+        self.kind = kind
+        self.url = url
+        self.status = status
+        super().__init__(f"{kind} ({status}) for {url}" if status else f"{kind} for {url}")
+
+def classify_status(status: Optional[int], body: str = "") -> Optional[str]:
+    """Returns the error class of an HTTP response, or None when it is usable."""
+    if body and any(marker in body for marker in BLOCK_MARKERS):
+        return BLOCKED
+    if status is None or status < 400:
+        return None
+    if status in BLOCKED_STATUSES:
+        return BLOCKED
+    if status < 500:
+        return CLIENT_ERROR
+    return SERVER_ERROR
+
+def check_response(url: str, status: Optional[int], body: str = ""):
+    """Raises FetchError when classify_status finds a problem."""
+    kind = classify_status(status, body)
+    if kind:
+        raise FetchError(kind, url, status)
+
+def classify_exception(exc: BaseException) -> str:
+    """Maps requests / httpx / Playwright exceptions onto the error classes."""
+    if isinstance(exc, FetchError):
+        return exc.kind
+    name = type(exc).__name__
+    message = str(exc)
+    if "Timeout" in name or "ERR_TIMED_OUT" in message or "timed out" in message:
+        return TIMEOUT
+    # urllib3 gave up after retrying 5xx responses
+    if name == "RetryError" or "too many 5" in message:
+        return SERVER_ERROR
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status:
+        return classify_status(status) or NETWORK
+    return NETWORK
+
+class RetryPolicy:
+    """
+    Retries a fetch attempt on the error classes in `retry_on`, with exponential
+    backoff (backoff, 2*backoff, ...) plus jitter. Blocks and 4xx are not
+    retried: asking again right away only makes them worse.
+    """
+
+    def __init__(self, attempts: int = RETRY_ATTEMPTS, backoff: float = RETRY_BACKOFF_S, retry_on: Iterable[str] = RETRY_ON):
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.retry_on = set(retry_on)
+
+    def _delay(self, attempt: int, exc: BaseException, url: str) -> Optional[float]:
+        kind = classify_exception(exc)
+        if attempt >= self.attempts or kind not in self.retry_on:
+            return None
+        delay = self.backoff * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+        print(f"   [Retry] {kind} on {url}, attempt {attempt + 1}/{self.attempts} in {delay:.1f}s")
+        return delay
+
+    def run(self, attempt_fn, url: str):
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return attempt_fn()
+            except Exception as e:
+                delay = self._delay(attempt, e, url)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    async def run_async(self, attempt_fn, url: str):
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return await attempt_fn()
+            except Exception as e:
+                delay = self._delay(attempt, e, url)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreakerBoard:
+    """
+    Circuit breakers keyed by "competitor:<name>" or "host:<hostname>".
+    A breaker opens after `threshold` consecutive failed cycles. While open the
+    competitor is skipped; once `cooldown` seconds have passed it goes
+    half-open: a cheap probe request decides whether the full fetch runs, and
+    the result of that fetch closes or re-opens it.
+    State is a plain dict so it can live in the history file.
+    """
+
+    def __init__(self, state: Optional[Dict[str, Dict[str, Any]]] = None, threshold: int = BREAKER_FAILURE_THRESHOLD, cooldown: float = BREAKER_COOLDOWN_S):
+        self.state = state if state is not None else {}
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+
+    def _get(self, key: str) -> Dict[str, Any]:
+        return self.state.setdefault(key, {"state": CLOSED, "failures": 0, "last_error": None, "opened_at": None})
+
+    def status(self, key: str) -> str:
+        """CLOSED, OPEN (skip) or HALF_OPEN (probe first)."""
+        b = self._get(key)
+        if b["state"] == OPEN and time.time() - b.get("opened_ts", 0) >= self.cooldown:
+            b["state"] = HALF_OPEN
+        return b["state"]
+
+    def record_success(self, key: str):
+        b = self._get(key)
+        if b["state"] != CLOSED:
+            print(f"   [Breaker] {key} closed")
+        b.update(state=CLOSED, failures=0, last_error=None, opened_at=None)
+        b.pop("opened_ts", None)
+
+    def record_failure(self, key: str, kind: str):
+        b = self._get(key)
+        b["failures"] += 1
+        b["last_error"] = kind
+        # A failed half-open trial re-opens immediately
+        if b["state"] == HALF_OPEN or b["failures"] >= self.threshold:
+            if b["state"] != OPEN:
+                print(f"   [Breaker] {key} open after {b['failures']} failures ({kind})")
+            b["state"] = OPEN
+            b["opened_ts"] = time.time()
+            b["opened_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -0,0 +1,106 @@
+
+import json
+import random
+import bisect
+import threading
+from itertools import accumulate
+from typing import Dict, List, Optional
+
+from price_monitor_v2.config.settings import USER_AGENTS_FILE, DEFAULT_HEADERS
+
+class UserAgentProfile:
+    """
+    One browser identity: the User-Agent plus the client hint headers a real
+    browser of that kind sends with it (Chromium only; Firefox and Safari send none).
+    """
+
+    def __init__(self, entry: Dict):
+        self.ua = entry["ua"]
+        self.engine = entry.get("engine", "chromium")
+        self.platform = entry.get("platform", "Windows")
+        self.mobile = entry.get("mobile", False)
+        self.sec_ch_ua = entry.get("sec_ch_ua")
+
+    def client_hints(self) -> Dict[str, str]:
+        if not self.sec_ch_ua:
+            return {}
+        return {
+            "Sec-Ch-Ua": self.sec_ch_ua,
+            "Sec-Ch-Ua-Mobile": "?1" if self.mobile else "?0",
+            "Sec-Ch-Ua-Platform": f'"{self.platform}"',
+        }
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"User-Agent": self.ua}
+        headers.update(self.client_hints())
+        return headers
+
+    def context_args(self) -> Dict:
+        """Playwright BrowserContext options for this identity."""
+        args = {"user_agent": self.ua}
+        hints = self.client_hints()
+        if hints:
+            args["extra_http_headers"] = hints
+        return args
+
+class UserAgentProvider:
+    """
+    Weighted sampling over the bundled UA list (data/user_agents.json).
+    Nothing is read until the first sample, and the parsed list and cumulative
+    weights are kept for the life of the process. When the file is missing or
+    broken, DEFAULT_HEADERS' User-Agent is the only identity.
+    """
+
+    def __init__(self, path: str = USER_AGENTS_FILE):
+        self.path = path
+        self.version = None
+        self._profiles: Optional[List[UserAgentProfile]] = None
+        self._cumulative: Dict[bool, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> List[UserAgentProfile]:
+        if self._profiles is None:
+            with self._lock:
+                if self._profiles is None:
+                    try:
+                        with open(self.path, "r", encoding="utf-8") as f:
+                            data = json.load(f)
+                        entries = [e for e in data["agents"] if e.get("weight", 1) > 0]
+                        self.version = data.get("version")
+                    except (OSError, ValueError, KeyError) as e:
+                        print(f"   Warning: Could not load user agents from {self.path} ({e})")
+                        entries = []
+                    if not entries:
+                        entries = [{"ua": DEFAULT_HEADERS["User-Agent"], "weight": 1}]
+                    self._weights = [e.get("weight", 1) for e in entries]
+                    self._profiles = [UserAgentProfile(e) for e in entries]
+        return self._profiles
+
+    def _pool(self, chromium_only: bool):
+        profiles = self._load()
+        if chromium_only:
+            indexed = [(i, p) for i, p in enumerate(profiles) if p.engine == "chromium"]
+            if indexed:
+                return indexed
+        return list(enumerate(profiles))
+
+    def sample(self, chromium_only: bool = False) -> UserAgentProfile:
+        """
+        Weighted random identity. chromium_only: for Playwright contexts, whose
+        real engine is Chromium and must not claim to be Firefox or Safari.
+        """
+        pool = self._pool(chromium_only)
+        cumulative = self._cumulative.get(chromium_only)
+        if cumulative is None:
+            cumulative = list(accumulate(self._weights[i] for i, _ in pool))
+            self._cumulative[chromium_only] = cumulative
+        pick = bisect.bisect_right(cumulative, random.random() * cumulative[-1])
+        return pool[min(pick, len(pool) - 1)][1]
+
+_provider = None
+
+def get_ua_provider() -> UserAgentProvider:
+    global _provider
+    if _provider is None:
+        _provider = UserAgentProvider()
+    return _provider
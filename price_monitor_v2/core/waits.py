@@ -0,0 +1,98 @@
+
+from typing import Optional, Dict, Any
+from price_monitor_v2.config.settings import WAIT_STRATEGY
+
+# Resolves once the DOM has had no mutations for `quietMs` AND the number of
+# price-looking text nodes has not changed for `quietMs` (with at least
+# `minPrices` of them), or when `maxMs` is reached.
+DOM_QUIET_JS = """
+({quietMs, maxMs, minPrices, pattern}) => new Promise((resolve) => {
+    const re = new RegExp(pattern);
+    const root = document.documentElement;
+    const start = performance.now();
+    let lastMutation = start;
+    let lastCount = -1;
+    let stableSince = start;
+
+    const countPrices = () => {
+        const walker = document.createTreeWalker(document.body || root, NodeFilter.SHOW_TEXT);
+        let n = 0;
+        while (walker.nextNode()) {
+            if (re.test(walker.currentNode.nodeValue)) n++;
+        }
+        return n;
+    };
+
+    const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+    observer.observe(root, {childList: true, subtree: true, characterData: true});
+
+    const tick = () => {
+        const now = performance.now();
+        const count = countPrices();
+        if (count !== lastCount) {
+            lastCount = count;
+            stableSince = now;
+        }
+        const quiet = now - lastMutation >= quietMs && now - stableSince >= quietMs;
+        if ((quiet && count >= minPrices) || now - start >= maxMs) {
+            observer.disconnect();
+            resolve({reason: quiet && count >= minPrices ? "quiet" : "max", elapsed: Math.round(now - start), prices: count});
+            return;
+        }
+        setTimeout(tick, 100);
+    };
+    tick();
+})
+"""
+
+PRICE_PATTERN_JS = r"\$\s*\d+\.\d{2}"
+
+def _resolve(overrides: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    strategy = dict(WAIT_STRATEGY)
+    if overrides:
+        strategy.update(overrides)
+    return strategy
+
+def _js_args(strategy: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "quietMs": strategy["quiet_ms"],
+        "maxMs": strategy["max_ms"],
+        "minPrices": strategy["min_prices"],
+        "pattern": PRICE_PATTERN_JS,
+    }
+
+def _log(result, strategy):
+    if result and strategy.get("verbose", True):
+        print(f"   [Wait] {result['reason']} after {result['elapsed']} ms ({result['prices']} prices)")
+
+def wait_for_content(page, overrides: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Waits until the price-bearing DOM settles instead of sleeping a fixed time.
+    overrides: keys of WAIT_STRATEGY (mode, quiet_ms, max_ms, min_prices).
+    Returns the JS result ({reason, elapsed, prices}) or None for network mode/errors.
+    """
+    strategy = _resolve(overrides)
+    try:
+        if strategy["mode"] == "networkidle":
+            page.wait_for_load_state("networkidle", timeout=strategy["max_ms"])
+            return None
+        result = page.evaluate(DOM_QUIET_JS, _js_args(strategy))
+        _log(result, strategy)
+        return result
+    except Exception as e:
+        print(f"   Warning: Wait strategy failed ({e})")
+        return None
+
+async def wait_for_content_async(page, overrides: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Same as wait_for_content for the Playwright async API."""
+    strategy = _resolve(overrides)
+    try:
+        if strategy["mode"] == "networkidle":
+            await page.wait_for_load_state("networkidle", timeout=strategy["max_ms"])
+            return None
+        result = await page.evaluate(DOM_QUIET_JS, _js_args(strategy))
+        _log(result, strategy)
+        return result
+    except Exception as e:
+        print(f"   Warning: Wait strategy failed ({e})")
+        return None
@@ -1,20 +1,27 @@
 
 import os
+import html
 import json
+import asyncio
 import time
 import schedule
 import copy
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 # Config & Core
 from price_monitor_v2.config.settings import (
     COMPETITORS, ARCHIVO_HISTORIAL, PRECIOS_REFERENCIA_CAMPERO,
-    INTERVALO_HORAS, HORA_INICIO, HORA_FIN
+    INTERVALO_HORAS, HORA_INICIO, HORA_FIN, FETCH_MODE, MAX_WORKERS, PARSE_WORKERS
 )
 from price_monitor_v2.core.network import NetworkManager
+from price_monitor_v2.core.async_network import AsyncNetworkManager
+from price_monitor_v2.core.executor import run_concurrently, extract_page, extract_in_pool, merge_outcomes
+from price_monitor_v2.core.pipeline import FetchParsePipeline
+from price_monitor_v2.core.rate_limit import HostRateLimiter
+from price_monitor_v2.core.resilience import CircuitBreakerBoard, OPEN, HALF_OPEN
 from price_monitor_v2.core.notifier import send_telegram_alert
-from price_monitor_v2.utils.helpers import detect_promotions
+from price_monitor_v2.utils.document import ParsedDocument
 from price_monitor_v2.utils.report_generator import generate_html_report
 
 # Parsers
@@ -70,9 +77,12 @@ def compare_prices(products: List[Dict], competitor_name: str, references: Dict)
                 print(f"   [Alert] {competitor_name} cheaper in {cat}")
                 send_telegram_alert(msg)
 
-def update_history(history, competitor_name, products, promos):
+def update_history(history, competitor_name, products, promos, promo_snippets=None, fingerprints=None):
     """
     Updates history with latest prices.
+    promo_snippets: {keyword: text around it}, kept for the report.
+    fingerprints: the pages' content fingerprints, compared next cycle (kept
+    as they were when None, e.g. when the parse was skipped).
     """
     if competitor_name not in history["competidores"]:
         history["competidores"][competitor_name] = {"historial_precios": []}
@@ -82,78 +92,272 @@ def update_history(history, competitor_name, products, promos):
     comp_hist["productos_detectados"] = len(products)
     comp_hist["productos_actuales"] = products # Persist for Dashboard
     comp_hist["promociones_activas"] = list(promos) # Store Promos
+    comp_hist["promociones_detalle"] = dict(promo_snippets or {})
+    if fingerprints is not None:
+        comp_hist["huellas_contenido"] = list(fingerprints)
     return history
 
-def run_monitor():
+def fetch_pages(parser, url: str) -> List[ParsedDocument]:
+    """
+    Fetches the first page and follows pagination (max 5 pages). A parser
+    returning a list of pages from fetch_data gets them all, unpaginated.
+    Pages come back as ParsedDocuments, so the tree built for pagination is
+    reused by extraction.
+    """
+    pages = []
+    current_url = url
+    while current_url and len(pages) < 5:
+        print(f"   Fetching: {current_url}")
+        content = parser.fetch_data(current_url)
+        if not content:
+            print("   Failed to fetch content")
+            break
+        if isinstance(content, list):
+            # Independent page documents (one per category...): nothing to paginate
+            pages.extend(ParsedDocument(page) for page in content if page)
+            break
+        doc = ParsedDocument(content)
+        pages.append(doc)
+
+        # Check for next page
+        next_link = parser.detect_pagination(doc)
+        if next_link and next_link != current_url:
+            # No fixed pause: the per-host rate limiter spaces the requests
+            current_url = next_link
+        else:
+            break
+    return pages
+
+async def fetch_pages_async(parser, url: str, network) -> List[ParsedDocument]:
+    """Same as fetch_pages, on the asyncio network stack."""
+    pages = []
+    current_url = url
+    while current_url and len(pages) < 5:
+        print(f"   Fetching: {current_url}")
+        content = await parser.fetch_data_async(current_url, network)
+        if not content:
+            print("   Failed to fetch content")
+            break
+        if isinstance(content, list):
+            pages.extend(ParsedDocument(page) for page in content if page)
+            break
+        doc = ParsedDocument(content)
+        pages.append(doc)
+
+        next_link = parser.detect_pagination(doc)
+        if next_link and next_link != current_url:
+            current_url = next_link
+        else:
+            break
+    return pages
+
+async def fetch_all_async(jobs, failures=None) -> Dict[str, List[ParsedDocument]]:
+    """
+    Fetches every competitor on one event loop.
+    jobs: list of (name, parser, url). Returns {name: pages}.
+    failures: optional dict filled with {host: error class} of failed fetches.
+    """
+    async with AsyncNetworkManager() as network:
+        async def run(name, parser, url):
+            try:
+                return await fetch_pages_async(parser, url, network)
+            except Exception as e:
+                print(f"   Error fetching {name}: {e}")
+                return []
+
+        results = await asyncio.gather(*[run(*job) for job in jobs])
+        if failures is not None:
+            failures.update(network.failures)
+        if network.blocked_requests:
+            print(f"\n[Profile] Skipped {network.blocked_requests} requests (~{network.blocked_bytes / 1048576:.1f} MB est.) this cycle")
+    return {job[0]: pages for job, pages in zip(jobs, results)}
+
+def extract_pages(parser, pages: List[ParsedDocument], skip_unchanged: bool = False, last_fingerprints: Optional[List[str]] = None,
+                  parse_workers: int = PARSE_WORKERS):
+    """
+    Runs product and promotion extraction over fetched pages (raw strings or
+    ParsedDocuments; each page is parsed at most once for both stages).
+    Unparsed multi-page content is spread over the parse process pool;
+    products are merged in page order and deduplicated by (category, price).
+    Returns (unique_products, found_promos, unchanged, fingerprints);
+    found_promos maps each promotion keyword to the text around it. With
+    skip_unchanged, when every page is byte-identical to the last cycle
+    nothing is parsed and (None, None, True, None) is returned; the caller
+    reuses the stored results. unchanged is also True when the pages'
+    fingerprints (same content apart from scripts, nonces, timestamps...)
+    equal last_fingerprints, the previous cycle's.
+    parse_workers: size of the parse pool (1 = extract in-process).
+    """
+    if skip_unchanged and pages and all(getattr(p, "unchanged", False) for p in pages):
+        print("   [Cache] Content unchanged since last cycle, skipping parse")
+        return None, None, True, None
+
+    docs = [ParsedDocument.of(page) for page in pages]
+    # Independent pages (e.g. one per category) are extracted on the parse pool
+    outcomes = extract_in_pool(parser, docs, parse_workers)
+    if outcomes is None:
+        outcomes = (extract_page(parser, doc) for doc in docs)
+
+    unique_products, found_promos, fingerprints = merge_outcomes(outcomes)
+    if skip_unchanged and fingerprints and fingerprints == last_fingerprints:
+        print("   [ParseCache] Content unchanged since last cycle apart from noise")
+        return unique_products, found_promos, True, fingerprints
+    return unique_products, found_promos, False, fingerprints
+
+def check_competitor(parser, comp, skip_unchanged: bool = False, last_fingerprints: Optional[List[str]] = None, pages=None,
+                     parse_workers: int = PARSE_WORKERS) -> Dict:
+    """
+    Fetch + parse stage for one competitor: pages (already fetched, e.g. in
+    async mode) or fetch_pages, then extract_pages. Returns its result:
+    {"name", "products", "promos", "promo_snippets", "unchanged", "fingerprints"}.
+    """
+    name = comp["name"]
+    print(f"\n[+] Checking {name}")
+    if pages is None:
+        pages = fetch_pages(parser, comp["url"])
+    products, promos, unchanged, fingerprints = extract_pages(parser, pages, skip_unchanged, last_fingerprints, parse_workers)
+    return {"name": name, "products": products, "promos": sorted(promos or []), "promo_snippets": promos or {},
+            "unchanged": unchanged, "fingerprints": fingerprints}
+
+def breaker_keys(comp) -> List[str]:
+    return [f"competitor:{comp['name']}", f"host:{HostRateLimiter.host_of(comp['url'])}"]
+
+def allowed_by_breakers(board: CircuitBreakerBoard, comp, network) -> bool:
+    """
+    False while one of the competitor's breakers is open. Half-open breakers
+    get a cheap probe first; a failed probe re-opens them without paying for
+    a full Playwright load.
+    """
+    keys = breaker_keys(comp)
+    states = [board.status(k) for k in keys]
+    if OPEN in states:
+        print(f"[Breaker] {comp['name']} skipped (circuit open)")
+        return False
+    if HALF_OPEN in states and not network.probe(comp.get("probe_url", comp["url"])):
+        for key, state in zip(keys, states):
+            if state == HALF_OPEN:
+                board.record_failure(key, "probe")
+        return False
+    return True
+
+def record_outcomes(board: CircuitBreakerBoard, competitors, results, failures):
+    """
+    Feeds the cycle's outcome to the breakers. A competitor fails when it
+    produced no products; its host breaker only counts network-level errors
+    (failures: {host: error class}), not parse problems.
+    """
+    for comp in competitors:
+        comp_key, host_key = breaker_keys(comp)
+        host = host_key.split(":", 1)[1]
+        result = results.get(comp["name"])
+        if result and (result.get("unchanged") or result.get("products")):
+            board.record_success(comp_key)
+            board.record_success(host_key)
+            continue
+        kind = failures.get(host) or ("no_products" if result else "no_result")
+        board.record_failure(comp_key, kind)
+        if host in failures:
+            board.record_failure(host_key, kind)
+
+def active_competitors() -> List[Dict]:
+    return [c for c in COMPETITORS if c.get("active") and c["parser"] in PARSER_MAP]
+
+def run_monitor(network: NetworkManager = None):
+    """
+    One monitoring cycle.
+    network: optional pre-warmed NetworkManager (see core/prewarm.py), created
+    on this same thread; it is closed at the end of the cycle either way.
+    """
     print(f"\n==============================================")
     print(f"Starting Price Monitor... Time: {datetime.now()}")
     print(f"==============================================")
     
-    network = NetworkManager()
+    network = network or NetworkManager()
     history = load_history()
     
     # Initialize references with fallback
     current_references = copy.deepcopy(PRECIOS_REFERENCIA_CAMPERO)
-    
+
+    # Circuit breaker state lives in the history file
+    breakers = CircuitBreakerBoard(history.setdefault("circuit_breakers", {}))
+
+    competitors = []
     for comp in COMPETITORS:
         if not comp.get("active"):
             continue
-            
+        if comp["parser"] not in PARSER_MAP:
+            print(f"Unknown parser for {comp['name']}")
+            continue
+        if not allowed_by_breakers(breakers, comp, network):
+            continue
+        competitors.append(comp)
+
+    # Competitors whose last results we can reuse when their content is unchanged
+    # ({name: last cycle's page fingerprints})
+    known = {name: h.get("huellas_contenido") for name, h in history["competidores"].items() if h.get("productos_actuales")}
+
+    # Stage 1: fetch + parse -> {name: {"products": [...], "promos": [...], "unchanged": bool}}
+    results = {}
+    failures = {}
+    pipeline = None
+    try:
+        if FETCH_MODE in ("thread", "process"):
+            print(f"\n[Executor] {len(competitors)} competitors on {MAX_WORKERS} {FETCH_MODE} workers...")
+            results = run_concurrently(competitors, mode=FETCH_MODE, skip_unchanged=known)
+        elif FETCH_MODE == "pipeline":
+            # Fetch on this thread, parse on the process pool
+            pipeline = FetchParsePipeline()
+            jobs = [(comp, PARSER_MAP[comp["parser"]](network, comp)) for comp in competitors]
+            results = pipeline.run(jobs, skip_unchanged=known)
+        else:
+            parsers = {comp["name"]: PARSER_MAP[comp["parser"]](network, comp) for comp in competitors}
+            prefetched = {}
+            if FETCH_MODE == "async":
+                print(f"\n[Async] Fetching {len(competitors)} competitors concurrently...")
+                prefetched = asyncio.run(fetch_all_async([(c["name"], parsers[c["name"]], c["url"]) for c in competitors], failures))
+
+            for comp in competitors:
+                name = comp["name"]
+                results[name] = check_competitor(parsers[name], comp, name in known, known.get(name), prefetched.get(name))
+    finally:
+        # Shut down the pooled browser once the cycle is done
+        if network.blocked_requests:
+            print(f"\n[Profile] Skipped {network.blocked_requests} requests (~{network.blocked_bytes / 1048576:.1f} MB est.) this cycle")
+        network.sessions.log_stats()
+        network.rate_limiter.log_stats()
+        network.proxies.log_stats()
+        if pipeline:
+            pipeline.log_stats()
+        network.close()
+
+    for result in results.values():
+        failures.update(result.get("failures", {}))
+    failures.update(network.failures)
+    record_outcomes(breakers, competitors, results, failures)
+
+    # Stage 2: references first, so compare_prices always sees live Campero prices
+    last_references = history.get("precios_referencia")
+    ordered = sorted(competitors, key=lambda c: not c.get("is_reference"))
+    for comp in ordered:
         name = comp["name"]
-        url = comp["url"]
-        parser_cls = PARSER_MAP.get(comp["parser"])
-        
-        if not parser_cls:
-            print(f"Unknown parser for {name}")
+        if name not in results:
+            print(f"\n[-] {name}: no result this cycle")
             continue
-            
-        print(f"\n[+] Checking {name}")
-        parser = parser_cls(network)
-        
-        all_products = []
-        current_url = url
-        page_count = 0
-        found_promos = set()
-        
-        # Pagination Loop
-        while current_url and page_count < 5: 
-            print(f"   Fetching: {current_url}")
-            content = parser.fetch_data(current_url)
-            if not content:
-                print("   Failed to fetch content")
-                break
-            
-            # Extract Products
-            products = parser.extract_products(content)
-            all_products.extend(products)
-            
-            # Extract Promotions
-            promos = detect_promotions(content)
-            for p in promos:
-                found_promos.add(p)
 
-            print(f"   Found {len(products)} products on page {page_count + 1}")
-            
-            # Check for next page
-            next_link = parser.detect_pagination(content)
-            if next_link and next_link != current_url:
-                current_url = next_link
-                page_count += 1
-                time.sleep(2)
-            else:
-                break
-        
-        # Deduplicate globally
-        unique_products = []
-        seen = set()
-        for p in all_products:
-            k = (p["categoria"], p["precio"])
-            if k not in seen:
-                seen.add(k)
-                unique_products.append(p)
-        
-        print(f"   Total Unique Products: {len(unique_products)}")
-        
+        unchanged = results[name].get("unchanged")
+        if unchanged:
+            # Same content as last cycle: reuse its results, no new alerts
+            comp_hist = history["competidores"][name]
+            unique_products = comp_hist["productos_actuales"]
+            found_promos = comp_hist.get("promociones_activas", [])
+            promo_snippets = comp_hist.get("promociones_detalle", {})
+            print(f"\n[=] {name} (unchanged, {len(unique_products)} products from last cycle)")
+        else:
+            unique_products = results[name]["products"]
+            found_promos = results[name]["promos"]
+            promo_snippets = results[name].get("promo_snippets", {})
+            print(f"\n[=] {name}")
+
         # Update References if this is the Reference Competitor
         if comp.get("is_reference") and unique_products:
             print("   [Ref] Updating Reference Prices from Live Data...")
@@ -167,16 +371,29 @@ def run_monitor():
                         print(f"      {cat}: ${old_price} -> ${new_price}")
                         current_references[cat]["precio"] = new_price
 
+        if unchanged:
+            if {cat: ref["precio"] for cat, ref in current_references.items()} != last_references:
+                # Same products, but the reference prices they are compared with moved
+                compare_prices(unique_products, name, current_references)
+            update_history(history, name, unique_products, found_promos, promo_snippets, results[name].get("fingerprints"))
+            history["competidores"][name]["sin_cambios"] = True
+            continue
+
         # Notify Promotions
         if found_promos:
             msg = f"🏷️ <b>Promociones en {name}</b>: {', '.join(found_promos)}"
+            for kw in found_promos:
+                if promo_snippets.get(kw):
+                    msg += f"\n• {kw}: {html.escape(promo_snippets[kw])}"
             print(f"   [Promos] {', '.join(found_promos)}")
             send_telegram_alert(msg)
-        
+
         if unique_products:
             compare_prices(unique_products, name, current_references)
-            update_history(history, name, unique_products, found_promos)
-            
+            update_history(history, name, unique_products, found_promos, promo_snippets, results[name].get("fingerprints"))
+            history["competidores"][name]["sin_cambios"] = False
+
+    history["precios_referencia"] = {cat: ref["precio"] for cat, ref in current_references.items()}
     save_history(history)
     generate_html_report(history)
     print("\nMonitor Cycle Completed.\n")
@@ -1,28 +1,250 @@
 
+import json
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from bs4 import BeautifulSoup
+from typing import List, Dict, Any, Optional, Tuple, Union
 from price_monitor_v2.core.network import NetworkManager
+from price_monitor_v2.utils.helpers import (
+    extract_products_from_json, extract_products_from_json_stream, extract_products_by_heuristics, find_promotions,
+    json_product_candidates
+)
+from price_monitor_v2.utils.structured_data import find_payloads, jsonld_items, visible_prices, JSONLD
+from price_monitor_v2.utils.promotions import get_promotion_scanner, json_texts
+from price_monitor_v2.utils.json_stream import iter_items
+from price_monitor_v2.utils.document import ParsedDocument
+from price_monitor_v2.core.api_replay import get_template_store
+from price_monitor_v2.core.cache import FetchResult, get_parse_cache
+from price_monitor_v2.config.settings import CATEGORIAS_PRODUCTOS, API_REPLAY, PARSE_CACHE
+
+# Top-level key of the content string produced by capture mode
+CAPTURE_KEY = "captured_responses"
+# Each captured response body, as a json_stream prefix
+CAPTURED_DATA = CAPTURE_KEY + ".item.data"
 
 class BaseParser(ABC):
-    def __init__(self, network_manager: NetworkManager):
+    def __init__(self, network_manager: NetworkManager, config: Optional[Dict[str, Any]] = None):
         self.network = network_manager
+        # Competitor entry from COMPETITORS (fetch profile, flags...)
+        self.config = config or {}
 
     @abstractmethod
-    def fetch_data(self, url: str) -> str:
+    def fetch_data(self, url: str) -> Union[str, List[str]]:
+        """
+        Page content for url. Parsers loading several independent documents
+        (one per category...) return them as a list: each is parsed on its own,
+        in parallel when PARSE_WORKERS allows, and pagination is not followed.
+        """
         pass
 
     @abstractmethod
-    def extract_products(self, content: str) -> List[Dict[str, Any]]:
+    async def fetch_data_async(self, url: str, network) -> Union[str, List[str]]:
+        """
+        asyncio counterpart of fetch_data (FETCH_MODE=async), using an
+        AsyncNetworkManager.
+        """
         pass
+
+    @abstractmethod
+    def extract_products(self, content: Union[str, ParsedDocument]) -> List[Dict[str, Any]]:
+        """content: raw page content or the ParsedDocument shared with the other stages."""
+        pass
+
+    def extract_cached(self, content: Union[str, ParsedDocument]) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]], bool, Optional[str]]:
+        """
+        (products, promotion hits, cached, fingerprint): extract_products +
+        detect_promotions behind the parse cache. A page whose normalised
+        fingerprint was seen before returns the stored results without being
+        parsed (cached=True). A hit only means the page matched one seen in
+        the last PARSE_CACHE_MAX_AGE_H, not the previous cycle: callers compare
+        fingerprint (None with the cache off) with the last cycle's to decide
+        whether the page is unchanged. Empty product lists are not stored, so
+        a failed extraction is retried next cycle.
+        """
+        doc = ParsedDocument.of(content)
+        if not PARSE_CACHE or not doc:
+            return self.extract_products(doc), self.detect_promotions(doc), False, None
+        cache = get_parse_cache()
+        key = cache.key(self, doc.content)
+        stored = cache.get(key)
+        if stored is not None:
+            return stored[0], stored[1], True, key
+        products, hits = self.extract_products(doc), self.detect_promotions(doc)
+        if products:
+            cache.put(key, products, hits)
+        return products, hits, False, key
+
+    def browser_options(self) -> Dict[str, Any]:
+        """Playwright options from the competitor config, for fetch/capture calls."""
+        return {
+            "fetch_profile": self.config.get("fetch_profile"),
+            "persistent_profile": self.config.get("name", type(self).__name__) if self.config.get("persistent_profile") else None,
+        }
+
+    def pack_captured(self, captured: List[Dict[str, Any]]) -> str:
+        """
+        Serialises captured JSON responses as the page content.
+        Returns "" when they hold no recognisable products, so callers fall back to HTML.
+        """
+        if not captured:
+            return ""
+        if not extract_products_from_json([c["data"] for c in captured], CATEGORIAS_PRODUCTOS):
+            print("   [Capture] No products in captured JSON, falling back to HTML")
+            return ""
+        return json.dumps({CAPTURE_KEY: captured}, ensure_ascii=False)
+
+    def _replay(self, replayed: List[Dict[str, Any]]) -> str:
+        packed = self.pack_captured(replayed)
+        if packed:
+            print(f"   [Replay] {len(replayed)} API calls replayed without a browser")
+            if all(r.get("unchanged") for r in replayed):
+                return FetchResult(packed, unchanged=True, source="replay")
+        else:
+            get_template_store().invalidate(self.config.get("name", type(self).__name__))
+        return packed
+
+    def _record(self, captured: List[Dict[str, Any]]) -> str:
+        packed = self.pack_captured(captured)
+        if packed and API_REPLAY:
+            get_template_store().record(self.config.get("name", type(self).__name__), [c["request"] for c in captured])
+        return packed
+
+    def fetch_captured(self, urls, wait_selector=None) -> str:
+        """
+        Capture mode: returns the menu API JSON for the page(s) in `urls`, or ""
+        when disabled or nothing usable came back.
+        Recorded API templates are replayed over HTTP first; Playwright only runs
+        (and re-records them) when there are none or the replay fails.
+        """
+        patterns = self.config.get("capture_json")
+        if not patterns:
+            return ""
+        if isinstance(urls, str):
+            urls = [urls]
+
+        templates = get_template_store().get(self.config.get("name", type(self).__name__)) if API_REPLAY else None
+        if templates:
+            packed = self._replay(self.network.replay_requests(templates))
+            if packed:
+                return packed
+
+        captured = []
+        for url in urls:
+            captured += self.network.capture_json_responses(
+                url, patterns, wait_selector=wait_selector, **self.browser_options()
+            )
+        return self._record(captured)
+
+    async def fetch_captured_async(self, urls, network, wait_selector=None) -> str:
+        patterns = self.config.get("capture_json")
+        if not patterns:
+            return ""
+        if isinstance(urls, str):
+            urls = [urls]
+
+        templates = get_template_store().get(self.config.get("name", type(self).__name__)) if API_REPLAY else None
+        if templates:
+            packed = self._replay(await network.replay_requests(templates))
+            if packed:
+                return packed
+
+        results = await asyncio.gather(*[
+            network.capture_json_responses(
+                url, patterns, wait_selector=wait_selector, **self.browser_options()
+            )
+            for url in urls
+        ])
+        return self._record([c for captured in results for c in captured])
+
+    @staticmethod
+    def is_captured(content: Union[str, ParsedDocument]) -> bool:
+        """True for content packed by capture mode (see pack_captured)."""
+        return ParsedDocument.of(content).content.lstrip().startswith('{"' + CAPTURE_KEY + '"')
+
+    def extract_captured(self, content: Union[str, ParsedDocument]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Products from capture-mode content, or None if content is regular HTML.
+        """
+        if not self.is_captured(content):
+            return None
+        content = ParsedDocument.of(content).content
+        try:
+            # Streamed: one response body decoded at a time
+            return extract_products_from_json_stream(content, CAPTURED_DATA, CATEGORIAS_PRODUCTOS)
+        except Exception as e:
+            print(f"   Error parsing captured JSON: {e}")
+            return []
     
-    def detect_pagination(self, content: str) -> Optional[str]:
+    def structured_payloads(self, content: Union[str, ParsedDocument]) -> List[Tuple[str, Any]]:
+        """
+        (kind, data) for the structured data an HTML page embeds (JSON-LD
+        Product/MenuItem offers, __NEXT_DATA__, Angular/Ionic transfer state,
+        window.__INITIAL_STATE__), read straight from the markup; JSON-LD is
+        reduced to its items. Disabled per competitor with "structured_data": False.
+        """
+        if not self.config.get("structured_data", True):
+            return []
+        return [(kind, jsonld_items(data) if kind == JSONLD else data)
+                for kind, data in find_payloads(ParsedDocument.of(content).content)]
+
+    def extract_structured(self, content: Union[str, ParsedDocument], payloads: Optional[List[Tuple[str, Any]]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Products from the page's structured payloads, mapped by
+        extract_products_from_json. None when no payload holds products.
+        """
+        if payloads is None:
+            payloads = self.structured_payloads(content)
+        if not payloads:
+            return None
+        products = extract_products_from_json([data for _, data in payloads], CATEGORIAS_PRODUCTOS)
+        if not products:
+            return None
+        print(f"   [Structured] {len(products)} products from {', '.join(dict.fromkeys(kind for kind, _ in payloads))}")
+        return products
+
+    def extract_html_products(self, content: Union[str, ParsedDocument]) -> List[Dict[str, Any]]:
+        """
+        Rendered pages: embedded structured data alone when it holds every
+        price shown on the page, else merged with the price heuristics (a
+        payload may only list a few featured items); the heuristics alone
+        without it.
+        """
+        doc = ParsedDocument.of(content)
+        payloads = self.structured_payloads(doc)
+        structured = self.extract_structured(doc, payloads)
+        if structured is None:
+            return extract_products_by_heuristics(doc, CATEGORIAS_PRODUCTOS, self.config.get("extraction_backend"))
+
+        covered = {round(price, 2) for _, data in payloads for _, price in json_product_candidates(data)}
+        missing = visible_prices(doc.content) - covered
+        if not missing:
+            return structured
+        print(f"   [Structured] {len(missing)} prices on the page are not in the payload, merging with the heuristics")
+        seen = {(p["categoria"], p["precio"]) for p in structured}
+        heuristic = extract_products_by_heuristics(doc, CATEGORIAS_PRODUCTOS, self.config.get("extraction_backend"))
+        return structured + [p for p in heuristic if (p["categoria"], p["precio"]) not in seen]
+
+    def detect_promotions(self, content: Union[str, ParsedDocument]) -> List[Dict[str, str]]:
+        """
+        Promotions on a fetched page: [{"keyword", "snippet"}].
+        HTML is scanned as visible text; capture-mode JSON by its text fields.
+        Parsers whose content is structured data override this.
+        """
+        if self.is_captured(content):
+            try:
+                bodies = iter_items(ParsedDocument.of(content).content, CAPTURED_DATA)
+                return get_promotion_scanner().scan_texts(text for body in bodies for text in json_texts(body))
+            except Exception as e:
+                print(f"   Error scanning captured JSON for promotions: {e}")
+                return []
+        return find_promotions(content)
+
+    def detect_pagination(self, content: Union[str, ParsedDocument]) -> Optional[str]:
         """
         Generic pagination detection.
         Returns URL of next page if found, else None.
         """
         try:
-            soup = BeautifulSoup(content, "lxml")
+            soup = ParsedDocument.of(content).soup
             # Look for rel="next"
             link = soup.find("link", rel="next")
             if link and link.get("href"):
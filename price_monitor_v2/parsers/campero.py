@@ -1,41 +1,65 @@
 
-import time
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Union
 from .base import BaseParser
-from price_monitor_v2.utils.helpers import extract_products_by_heuristics
-from price_monitor_v2.config.settings import CATEGORIAS_PRODUCTOS
+from price_monitor_v2.utils.document import ParsedDocument
 
 class CamperoParser(BaseParser):
-    def fetch_data(self, url: str) -> str:
+    BASE_URL = "https://sv.campero.com"
+    CATEGORY_PATHS = [
+        "/menu/pollo-tradicional",
+        "/menu/para-compartir",
+        "/menu/hamburguesas-y-sandwiches",
+        "/menu/postres",
+        "/menu/campero-y-mas"  # Often has extras/wings
+    ]
+
+    def fetch_data(self, url: str) -> Union[str, List[str]]:
         """
         Fetches multiple category pages to ensure coverage of all products.
         Ignores the base 'url' argument in favor of specific paths.
+        Returns one document per category (parsed independently), or the
+        captured JSON string.
         """
-        base_url = "https://sv.campero.com"
-        paths = [
-            "/menu/pollo-tradicional",
-            "/menu/para-compartir",
-            "/menu/hamburguesas-y-sandwiches",
-            "/menu/postres",
-            "/menu/campero-y-mas"  # Often has extras/wings
-        ]
-        
-        full_content = ""
-        for path in paths:
-            target_url = base_url + path
+        # Menu API JSON if capture mode is configured (replayed over HTTP when possible)
+        captured = self.fetch_captured([self.BASE_URL + path for path in self.CATEGORY_PATHS])
+        if captured:
+            return captured
+
+        pages = []
+        for path in self.CATEGORY_PATHS:
+            target_url = self.BASE_URL + path
             print(f"   [Campero] Fetching category: {path}...")
             # We treat each as a separate page load. 
             # We don't need the interactive callback anymore since we go directly to the view.
-            # Relaxed wait: We rely on page load + generous sleep for Angular hydration.
-            html = self.network.fetch_with_playwright(target_url)
-            full_content += html + "\n<!-- SPLIT -->\n"
-            time.sleep(7) # Generous wait for dynamic content
-            
-        return full_content
+            # Angular hydration is awaited by the wait strategy (DOM + price nodes settled).
+            html = self.network.fetch_with_playwright(
+                target_url, wait=self.config.get("wait"), **self.browser_options()
+            )
+            pages.append(html)
+
+        return pages
+
+    async def fetch_data_async(self, url: str, network) -> Union[str, List[str]]:
+        """Loads every category concurrently (bounded by the network semaphore)."""
+        options = self.browser_options()
+        wait = self.config.get("wait")
+        captured = await self.fetch_captured_async([self.BASE_URL + path for path in self.CATEGORY_PATHS], network)
+        if captured:
+            return captured
+
+        pages = await asyncio.gather(*[
+            network.fetch_with_playwright(self.BASE_URL + path, wait=wait, **options)
+            for path in self.CATEGORY_PATHS
+        ])
+        return list(pages)
 
     # _expand_categories is no longer needed but we can keep it deprecated or remove it.
     def _expand_categories(self, page):
         pass
 
-    def extract_products(self, content: str) -> List[Dict[str, Any]]:
-        return extract_products_by_heuristics(content, CATEGORIAS_PRODUCTOS)
+    def extract_products(self, content: Union[str, ParsedDocument]) -> List[Dict[str, Any]]:
+        captured = self.extract_captured(content)
+        if captured is not None:
+            return captured
+        return self.extract_html_products(content)
@@ -1,40 +1,53 @@
 
-import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 from .base import BaseParser
-from price_monitor_v2.utils.helpers import classify_product, clean_price
+from price_monitor_v2.utils.classifier import get_classifier
+from price_monitor_v2.utils.promotions import get_promotion_scanner
+from price_monitor_v2.utils.json_stream import iter_items, iter_prefixed
+from price_monitor_v2.utils.document import ParsedDocument
 from price_monitor_v2.config.settings import CATEGORIAS_PRODUCTOS
 
+# GetHomeConfiguration paths (json_stream prefixes): sections -> data[] -> dataProducts[]
+SECTION = "data.sections.item"
+ITEM = SECTION + ".data.item"
+PRODUCT = ITEM + ".dataProducts.item"
+# Customer-facing text scanned for promotions
+PROMO_FIELDS = [f"{level}.{field}" for level in (SECTION, ITEM, PRODUCT) for field in ("name", "description")]
+
 class CampestreParser(BaseParser):
     def fetch_data(self, url: str) -> str:
         # Campestre uses a POST API
         payload = {"country": "sv", "language": "es"}
         return self.network.fetch_with_requests(url, method="POST", json_payload=payload)
 
-    def extract_products(self, content: str) -> List[Dict[str, Any]]:
+    async def fetch_data_async(self, url: str, network) -> str:
+        payload = {"country": "sv", "language": "es"}
+        return await network.fetch_with_requests(url, method="POST", json_payload=payload)
+
+    def extract_products(self, content: Union[str, ParsedDocument]) -> List[Dict[str, Any]]:
         productos = []
         try:
-            data = json.loads(content)
-            sections = data.get("data", {}).get("sections", [])
-            
-            for section in sections:
-                for item in section.get("data", []):
-                    sub_products = item.get("dataProducts", [])
-                    for p in sub_products:
-                        name = p.get("name", "")
-                        try:
-                            price = float(p.get("salePrice", 0))
-                        except:
-                            price = 0.0
-                            
-                        cat = classify_product(name)
-                        if cat and price > 0:
-                            productos.append({
-                                "nombre": name,
-                                "precio": price,
-                                "categoria": cat,
-                                "categoria_nombre": CATEGORIAS_PRODUCTOS[cat]["nombre"]
-                            })
+            # Only the product objects are decoded; banners, images and config are skipped
+            candidates = []
+            for p in iter_items(ParsedDocument.of(content).content, PRODUCT):
+                if not isinstance(p, dict):
+                    continue
+                name = p.get("name", "")
+                try:
+                    price = float(p.get("salePrice", 0))
+                except:
+                    price = 0.0
+                candidates.append((name, price))
+
+            cats = get_classifier().classify_many(name for name, _ in candidates)
+            for (name, price), cat in zip(candidates, cats):
+                if cat and price > 0:
+                    productos.append({
+                        "nombre": name,
+                        "precio": price,
+                        "categoria": cat,
+                        "categoria_nombre": CATEGORIAS_PRODUCTOS[cat]["nombre"]
+                    })
                             
             # Deduplicate logic similar to KFC but key can include name for safety
             unique = []
@@ -49,3 +62,12 @@ class CampestreParser(BaseParser):
         except Exception as e:
             print(f"   Error parsing Campestre API: {e}")
             return []
+
+    def detect_promotions(self, content: Union[str, ParsedDocument]) -> List[Dict[str, str]]:
+        """Scans the menu's section, item and product names and descriptions, not the raw JSON."""
+        try:
+            texts = (text for _, text in iter_prefixed(ParsedDocument.of(content).content, PROMO_FIELDS))
+            return get_promotion_scanner().scan_texts(t for t in texts if isinstance(t, str))
+        except Exception as e:
+            print(f"   Error scanning Campestre API for promotions: {e}")
+            return []
@@ -1,13 +1,31 @@
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 from .base import BaseParser
-from price_monitor_v2.utils.helpers import extract_products_by_heuristics
-from price_monitor_v2.config.settings import CATEGORIAS_PRODUCTOS
+from price_monitor_v2.utils.document import ParsedDocument
 
 class KFCParser(BaseParser):
     def fetch_data(self, url: str) -> str:
+        # Menu API JSON if capture mode is configured
+        captured = self.fetch_captured(url, wait_selector="button")
+        if captured:
+            return captured
+
         # KFC requires JavaScript rendering
-        return self.network.fetch_with_playwright(url, wait_selector="button")
+        return self.network.fetch_with_playwright(
+            url, wait_selector="button", wait=self.config.get("wait"), **self.browser_options()
+        )
+
+    async def fetch_data_async(self, url: str, network) -> str:
+        captured = await self.fetch_captured_async(url, network, wait_selector="button")
+        if captured:
+            return captured
+
+        return await network.fetch_with_playwright(
+            url, wait_selector="button", wait=self.config.get("wait"), **self.browser_options()
+        )
 
-    def extract_products(self, content: str) -> List[Dict[str, Any]]:
-        return extract_products_by_heuristics(content, CATEGORIAS_PRODUCTOS)
+    def extract_products(self, content: Union[str, ParsedDocument]) -> List[Dict[str, Any]]:
+        captured = self.extract_captured(content)
+        if captured is not None:
+            return captured
+        return self.extract_html_products(content)
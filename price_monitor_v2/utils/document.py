@@ -0,0 +1,66 @@
+
+from typing import Union
+from bs4 import BeautifulSoup
+from lxml import etree
+
+class ParsedDocument:
+    """
+    One fetched page shared by every extraction stage (pagination, products,
+    promotions). The BeautifulSoup tree is built on first use and the page text
+    is computed once, instead of each stage parsing the raw content again.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        # FetchResult flags survive the wrapping (see core/cache.py)
+        self.unchanged = getattr(content, "unchanged", False)
+        self._soup = None
+        self._tree = None
+        self._text = None
+
+    @classmethod
+    def of(cls, content: Union[str, "ParsedDocument"]) -> "ParsedDocument":
+        """Wraps raw content; an existing ParsedDocument is returned as is."""
+        return content if isinstance(content, ParsedDocument) else cls(content)
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.content, "lxml")
+        return self._soup
+
+    @property
+    def tree(self):
+        """Root lxml element (same parser as the soup, without the BeautifulSoup layer); None for empty content."""
+        if self._tree is None:
+            try:
+                self._tree = etree.HTML(self.content)
+            except ValueError:
+                # str with an XML encoding declaration
+                self._tree = etree.HTML(self.content.encode("utf-8"), etree.HTMLParser(encoding="utf-8"))
+        return self._tree
+
+    @property
+    def parsed(self) -> bool:
+        """True once a tree has been built for this page."""
+        return self._soup is not None or self._tree is not None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.soup.get_text()
+        return self._text
+
+    def release(self):
+        """Drops the tree and cached text once every stage is done with them."""
+        if self._soup is not None:
+            self._soup.decompose()
+        self._soup = None
+        self._tree = None
+        self._text = None
+
+    def __bool__(self) -> bool:
+        return bool(self.content)
+
+    def __str__(self) -> str:
+        return self.content
@@ -0,0 +1,295 @@
+
+import re
+from abc import ABC, abstractmethod
+from typing import List, Dict, Optional, Iterator, Tuple, Callable, Hashable
+from bs4 import Tag
+from lxml import etree
+
+from price_monitor_v2.config.settings import EXTRACTION_BACKEND
+from price_monitor_v2.utils.document import ParsedDocument
+from price_monitor_v2.utils.helpers import clean_price, classify_product
+
+PRICE_PATTERN = re.compile(r"\$\s*\d+\.\d{2}")
+# How far up from a price node the heuristics look for a product name
+MAX_ANCESTORS = 6
+NAME_MAX_CHARS = 80
+
+class PriceTree(ABC):
+    """
+    One page as seen by the heuristics, built by an ExtractionEngine: the price
+    strings, each element's parent and get_text(" ", strip=True).
+    get_text is answered from an index built in one pass over the tree (the
+    stripped strings in document order plus each element's span in them), so
+    no subtree is walked again however many prices sit beneath it.
+    """
+
+    @abstractmethod
+    def price_nodes(self) -> Iterator[Tuple[str, object]]:
+        """(string, element holding it) for every string matching PRICE_PATTERN, in document order."""
+        pass
+
+    @abstractmethod
+    def parent(self, element):
+        pass
+
+    @abstractmethod
+    def key(self, element) -> Hashable:
+        """Identity of element, for memoising per element."""
+        pass
+
+    @abstractmethod
+    def get_text(self, element) -> str:
+        """Same as BeautifulSoup's element.get_text(" ", strip=True)."""
+        pass
+
+class ExtractionEngine(ABC):
+    """
+    Backend for extract_products_by_heuristics: builds the PriceTree the
+    shared ancestor walk runs on. Every backend must return exactly the same
+    products.
+    """
+    name = None
+
+    @abstractmethod
+    def tree(self, doc: ParsedDocument) -> Optional[PriceTree]:
+        """None when the page has no tree (empty content)."""
+        pass
+
+    def extract_products(self, doc: ParsedDocument, categories_config: Dict,
+                         classify: Callable[[str], Optional[str]] = classify_product,
+                         clean: Callable[[str], Optional[float]] = clean_price,
+                         name_max: int = NAME_MAX_CHARS) -> List[Dict]:
+        """
+        Names each price after the nearest ancestor (up to MAX_ANCESTORS) whose
+        text classifies as a product; the first product per (category, price)
+        wins. Each ancestor's text is built and classified at most once and
+        shared by every price beneath it.
+        classify/clean/name_max: the legacy monitor passes its own rules.
+        """
+        tree = self.tree(doc)
+        if tree is None:
+            return []
+        products = []
+        seen = set()
+        classified = {}
+        for string, container in tree.price_nodes():
+            try:
+                price_float = clean(string)
+                if not price_float or price_float <= 0: continue
+
+                pointer = container
+                for _ in range(MAX_ANCESTORS):
+                    if pointer is None: break
+                    key = tree.key(pointer)
+                    if key not in classified:
+                        text = tree.get_text(pointer)
+                        classified[key] = (text, classify(text))
+                    text, cat = classified[key]
+
+                    if cat:
+                        if (cat, price_float) not in seen:
+                            name = text.split("$")[0].strip()
+                            if len(name) > name_max: name = name[:name_max] + "..."
+                            products.append({
+                                "nombre": name,
+                                "precio": price_float,
+                                "categoria": cat,
+                                "categoria_nombre": categories_config[cat]["nombre"]
+                            })
+                            seen.add((cat, price_float))
+                        break
+                    pointer = tree.parent(pointer)
+            except:
+                continue
+        return products
+
+class _SoupTree(PriceTree):
+
+    def __init__(self, soup):
+        self.soup = soup
+        # Strings a plain element's get_text() returns (NavigableString, CData)
+        self.types = soup.interesting_string_types
+        self.strings, self.spans = self._index(soup, self.types)
+
+    @staticmethod
+    def _index(soup, types) -> Tuple[List[str], Dict[int, Tuple[int, int]]]:
+        strings, spans = [], {}
+        stack = [(soup, iter(soup.contents), 0)]
+        while stack:
+            node, children, start = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                spans[id(node)] = (start, len(strings))
+            elif isinstance(child, Tag):
+                stack.append((child, iter(child.contents), len(strings)))
+            elif type(child) in types:
+                string = child.strip()
+                if string:
+                    strings.append(string)
+        return strings, spans
+
+    def price_nodes(self):
+        for node in self.soup.find_all(string=PRICE_PATTERN):
+            yield node, node.parent
+
+    def parent(self, element):
+        return element.parent
+
+    def key(self, element):
+        # Tags compare (and hash) by content; the tree keeps them alive, so id() is stable
+        return id(element)
+
+    def get_text(self, element):
+        if element.interesting_string_types != self.types:
+            # <script>, <style>, <template>... return their own string class: rare
+            return element.get_text(" ", strip=True)
+        start, end = self.spans[id(element)]
+        return " ".join(self.strings[start:end])
+
+class SoupEngine(ExtractionEngine):
+    """BeautifulSoup tree; the reference for other backends."""
+    name = "soup"
+
+    def tree(self, doc):
+        return _SoupTree(doc.soup)
+
+# BeautifulSoup gives strings under these tags their own class (Script,
+# Stylesheet, TemplateString...), and an element's get_text() only returns
+# strings of its own class: a <div>'s text skips scripts, styles and
+# comments, while a <script>'s text is its code. _LxmlTree tags every string
+# with the same "kind" to reproduce that.
+STRING_CONTAINERS = ("script", "style", "template", "rt", "rp")
+TEXT = "text"
+COMMENT = "comment"
+
+_PRICE_NODES = etree.XPath(
+    "//text()[re:test(., $pattern)] | //comment()[re:test(., $pattern)]",
+    namespaces={"re": "http://exslt.org/regular-expressions"},
+)
+
+class _LxmlTree(PriceTree):
+
+    def __init__(self, root):
+        self.root = root
+        self.strings, self.spans = self._index(root)
+
+    @staticmethod
+    def _kind(element) -> str:
+        """Kind of the strings directly inside element (its .text, children's tails)."""
+        node = element
+        while node is not None:
+            if node.tag in STRING_CONTAINERS:
+                return node.tag
+            node = node.getparent()
+        return TEXT
+
+    @classmethod
+    def _strings(cls, element) -> Iterator[Tuple[str, str]]:
+        """(string, kind) for every string under element, in document order."""
+        kind = cls._kind(element)
+        if element.text is not None:
+            yield element.text, kind
+        stack = [(element, iter(element), kind)]
+        while stack:
+            node, children, kind = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if stack and node.tail is not None:
+                    yield node.tail, stack[-1][2]
+                continue
+            if not isinstance(child.tag, str):
+                if child.text is not None:
+                    yield child.text, COMMENT
+                if child.tail is not None:
+                    yield child.tail, kind
+                continue
+            child_kind = child.tag if child.tag in STRING_CONTAINERS else kind
+            if child.text is not None:
+                yield child.text, child_kind
+            stack.append((child, iter(child), child_kind))
+
+    @classmethod
+    def _index(cls, root) -> Tuple[List[str], Dict]:
+        """The stripped, non-empty "text" strings in document order and each element's span in them."""
+        strings, spans = [], {}
+
+        def add(string, kind):
+            if string is not None and kind == TEXT:
+                string = string.strip()
+                if string:
+                    strings.append(string)
+
+        kind = cls._kind(root)
+        add(root.text, kind)
+        stack = [(root, iter(root), kind, 0)]
+        while stack:
+            node, children, kind, start = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                spans[node] = (start, len(strings))
+                if stack:
+                    add(node.tail, stack[-1][2])
+                continue
+            if not isinstance(child.tag, str):
+                # A comment's own text is never "text"
+                add(child.tail, kind)
+                continue
+            child_kind = child.tag if child.tag in STRING_CONTAINERS else kind
+            start = len(strings)
+            add(child.text, child_kind)
+            stack.append((child, iter(child), child_kind, start))
+        return strings, spans
+
+    def price_nodes(self):
+        for node in _PRICE_NODES(self.root, pattern=PRICE_PATTERN.pattern):
+            if isinstance(node, str):
+                parent = node.getparent()
+                if node.is_tail:
+                    parent = parent.getparent()
+                yield str(node), parent
+            else:
+                # Comments outside <html> belong to the document in BeautifulSoup,
+                # whose get_text() is the root element's
+                parent = node.getparent()
+                yield node.text, parent if parent is not None else self.root
+
+    def parent(self, element):
+        return element.getparent()
+
+    def key(self, element):
+        # lxml elements hash by identity; self.spans keeps them alive
+        return element
+
+    def get_text(self, element):
+        if element.tag in STRING_CONTAINERS:
+            # <script>/<style>... return their own strings: rare, walked directly
+            strings = (string.strip() for string, kind in self._strings(element) if kind == element.tag)
+            return " ".join(string for string in strings if string)
+        start, end = self.spans[element]
+        return " ".join(self.strings[start:end])
+
+class LxmlEngine(ExtractionEngine):
+    """
+    Works on the lxml tree directly: no BeautifulSoup objects are built and
+    price nodes come from one compiled XPath query. Mirrors SoupEngine's tree
+    semantics (document order, string kinds, get_text(" ", strip=True)) so
+    both return the same products.
+    """
+    name = "lxml"
+
+    def tree(self, doc):
+        root = doc.tree
+        return _LxmlTree(root) if root is not None else None
+
+ENGINES = {engine.name: engine for engine in (SoupEngine(), LxmlEngine())}
+
+def get_engine(name: Optional[str] = None) -> ExtractionEngine:
+    """Engine by name (a competitor's "extraction_backend"), EXTRACTION_BACKEND by default."""
+    engine = ENGINES.get(name or EXTRACTION_BACKEND)
+    if engine is None:
+        print(f"   Warning: Unknown extraction backend '{name}', using '{EXTRACTION_BACKEND}'")
+        engine = ENGINES.get(EXTRACTION_BACKEND, ENGINES["soup"])
+    return engine
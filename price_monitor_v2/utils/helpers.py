@@ -1,8 +1,10 @@
 
 import re
-from typing import Optional, List, Dict
-from bs4 import BeautifulSoup
-from price_monitor_v2.config.settings import CATEGORIAS_PRODUCTOS, KEYWORDS_PROMOCION
+from typing import Optional, List, Dict, Union, Iterable, Iterator, Tuple
+from price_monitor_v2.utils.document import ParsedDocument
+from price_monitor_v2.utils.classifier import get_classifier
+from price_monitor_v2.utils.promotions import get_promotion_scanner
+from price_monitor_v2.utils.json_stream import iter_items
 
 def clean_price(price_text: str) -> Optional[float]:
     """
@@ -27,46 +29,37 @@ def clean_price(price_text: str) -> Optional[float]:
 def classify_product(product_name: str) -> Optional[str]:
     """
     Classifies a product into a category based on keywords.
+    Exclusions first, then keywords, per category in CATEGORIAS_PRODUCTOS order
+    (compiled once, see utils/classifier.py).
     """
-    name_lower = product_name.lower()
-    
-    for cat_key, rules in CATEGORIAS_PRODUCTOS.items():
-        # Check exclusions first
-        if any(excl in name_lower for excl in rules["excluir"]):
-            continue
-            
-        # Check keywords
-        if any(kw in name_lower for kw in rules["keywords"]):
-            return cat_key
-            
-    return None
+    return get_classifier().classify(product_name)
 
-def detect_promotions(html: str, keywords: List[str] = None) -> List[str]:
+def find_promotions(html: Union[str, ParsedDocument], keywords: List[str] = None) -> List[Dict[str, str]]:
     """
-    Detects promotion keywords in HTML content.
+    Promotion keywords in the visible text of HTML content (raw or a
+    ParsedDocument), as whole words, with the text around each:
+    [{"keyword": "2x1", "snippet": "...combos 2x1 los martes..."}].
+    Streams the markup (utils/promotions.py); no tree is built.
     """
-    if keywords is None:
-        keywords = KEYWORDS_PROMOCION
-    
-    found = []
     try:
-        soup = BeautifulSoup(html, "lxml")
-        text = soup.get_text().lower()
-        
-        for kw in keywords:
-            if kw.lower() in text:
-                found.append(kw)
+        return get_promotion_scanner(keywords).scan_html(ParsedDocument.of(html).content)
     except Exception as e:
         print(f"Warning: Promotion detection error: {e}")
-        
-    return found
+        return []
 
-def extract_price_generic(html: str, selector: str) -> Optional[float]:
+def detect_promotions(html: Union[str, ParsedDocument], keywords: List[str] = None) -> List[str]:
+    """
+    Detects promotion keywords in HTML content (raw or a ParsedDocument).
+    """
+    return [hit["keyword"] for hit in find_promotions(html, keywords)]
+
+def extract_price_generic(html: Union[str, ParsedDocument], selector: str) -> Optional[float]:
     """
     Generic extraction using CSS selector or Regex fallback.
     """
     try:
-        soup = BeautifulSoup(html, "lxml")
+        doc = ParsedDocument.of(html)
+        soup = doc.soup
         
         if selector:
             elements = soup.select(selector)
@@ -76,7 +69,7 @@ def extract_price_generic(html: str, selector: str) -> Optional[float]:
                     return p
         
         # Fallback Regex
-        text = soup.get_text()
+        text = doc.text
         pattern = r"\$\s*(\d+[.,]\d{2})"
         matches = re.findall(pattern, text)
 
@@ -84,48 +77,84 @@ def extract_price_generic(html: str, selector: str) -> Optional[float]:
         pass
     return None
 
-def extract_products_by_heuristics(html: str, categories_config: Dict) -> List[Dict]:
+def extract_products_by_heuristics(html: Union[str, ParsedDocument], categories_config: Dict, backend: Optional[str] = None) -> List[Dict]:
     """
     Extracts products by finding prices and looking at parent context.
+    backend: extraction engine name (see utils/extraction.py), EXTRACTION_BACKEND by default.
     """
-    products = []
+    from price_monitor_v2.utils.extraction import get_engine
     try:
-        soup = BeautifulSoup(html, "lxml")
-        pattern = re.compile(r"\$\s*\d+\.\d{2}")
-        precios_found = soup.find_all(string=pattern)
-        
-        seen = set()
-        
-        for node in precios_found:
-            try:
-                container = node.parent
-                price_float = clean_price(node)
-                if not price_float or price_float <= 0: continue
-                
-                pointer = container
-                for _ in range(6):
-                    if not pointer: break
-                    text = pointer.get_text(" ", strip=True)
-                    cat = classify_product(text)
-                    
-                    if cat:
-                        key = (cat, price_float)
-                        if key not in seen:
-                            name = text.split("$")[0].strip()
-                            if len(name) > 80: name = name[:80] + "..."
-                            
-                            products.append({
-                                "nombre": name,
-                                "precio": price_float,
-                                "categoria": cat,
-                                "categoria_nombre": categories_config[cat]["nombre"]
-                            })
-                            seen.add(key)
-                        break
-                    pointer = pointer.parent
-            except:
-                continue
+        return get_engine(backend).extract_products(ParsedDocument.of(html), categories_config)
     except Exception as e:
         print(f"   Heuristic extraction error: {e}")
+        return []
+
+JSON_NAME_KEYS = ("name", "nombre", "title", "productName", "displayName")
+JSON_PRICE_KEYS = ("salePrice", "price", "precio", "finalPrice", "basePrice", "amount")
+
+def _json_price(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        return clean_price(value)
+    if isinstance(value, dict):
+        # e.g. {"price": {"amount": 5.5, "currency": "USD"}}
+        for key in JSON_PRICE_KEYS + ("value",):
+            if key in value:
+                return _json_price(value[key])
+    return None
+
+def json_product_candidates(data) -> Iterator[Tuple[str, float]]:
+    """
+    (name, price) for every object in a JSON payload with a name-like and a
+    positive price-like key, in document order.
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        name = next((node[k] for k in JSON_NAME_KEYS if isinstance(node.get(k), str)), None)
+        price = next((p for p in (_json_price(node[k]) for k in JSON_PRICE_KEYS if k in node) if p), None)
+        if name and price and price > 0:
+            yield name, price
+
+        stack.extend(reversed([v for v in node.values() if isinstance(v, (dict, list))]))
+
+def _products_from_candidates(candidates: Iterable[Tuple[str, float]], categories_config: Dict) -> List[Dict]:
+    candidates = list(candidates)
+    products = []
+    seen = set()
+    cats = get_classifier().classify_many(name for name, _ in candidates)
+    for (name, price), cat in zip(candidates, cats):
+        if cat and (cat, price) not in seen:
+            seen.add((cat, price))
+            products.append({
+                "nombre": name.strip(),
+                "precio": price,
+                "categoria": cat,
+                "categoria_nombre": categories_config[cat]["nombre"]
+            })
     return products
 
+def extract_products_from_json(data, categories_config: Dict) -> List[Dict]:
+    """
+    Extracts products from an arbitrary JSON payload (captured API responses).
+    Any object with a name-like and a price-like key is a candidate.
+    """
+    return _products_from_candidates(json_product_candidates(data), categories_config)
+
+def extract_products_from_json_stream(source: Union[str, bytes], prefix: str, categories_config: Dict) -> List[Dict]:
+    """
+    Same as extract_products_from_json, over the values at `prefix` (ijson
+    syntax, see utils/json_stream.py) of a raw JSON document: they are decoded
+    one at a time and the rest of the payload is never built.
+    """
+    candidates = (c for value in iter_items(source, prefix) for c in json_product_candidates(value))
+    return _products_from_candidates(candidates, categories_config)
@@ -0,0 +1,141 @@
+
+import re
+import json
+from typing import Any, Iterable, Iterator, Tuple, Union
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Paths use ijson's prefix syntax: object keys joined by ".", "item" for any
+# array element. "data.sections.item.data.item.dataProducts.item" is every
+# Campestre product object.
+ITEM = "item"
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+def iter_prefixed(source: Union[str, bytes], prefixes: Iterable[str]) -> Iterator[Tuple[str, Any]]:
+    """
+    (prefix, value) for every value at one of `prefixes`, in document order,
+    without building the rest of the document: only the matched values are
+    materialised, one at a time.
+    Uses ijson (C backend when available) if installed; otherwise a
+    pure-Python walk that follows only the wanted paths and skips every other
+    subtree with json's C decoder.
+    Raises ValueError on malformed JSON.
+    """
+    prefixes = set(prefixes)
+    if ijson is not None:
+        try:
+            yield from _iter_ijson(source, prefixes)
+        except ijson.JSONError as e:
+            raise ValueError(str(e)) from e
+        return
+    text = source.decode("utf-8") if isinstance(source, (bytes, bytearray)) else str(source)
+    ancestors = {p.rsplit(".", 1)[0] if "." in p else "" for p in prefixes if p}
+    for p in list(ancestors):
+        while p:
+            p = p.rsplit(".", 1)[0] if "." in p else ""
+            ancestors.add(p)
+    end = yield from _walk(text, prefixes, ancestors)
+    if _WHITESPACE.match(text, end).end() != len(text):
+        raise ValueError(f"Extra data at char {end}")
+
+def iter_items(source: Union[str, bytes], prefix: str) -> Iterator[Any]:
+    """Values at one prefix (ijson.items semantics)."""
+    if ijson is not None:
+        # Objects are built by ijson's own (C) builder
+        try:
+            yield from ijson.items(source.encode("utf-8") if isinstance(source, str) else source, prefix, use_float=True)
+        except ijson.JSONError as e:
+            raise ValueError(str(e)) from e
+        return
+    for _, value in iter_prefixed(source, (prefix,)):
+        yield value
+
+def _iter_ijson(source, prefixes):
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    builders = [] # (prefix, ObjectBuilder) of the values being built, outermost first
+    for prefix, event, value in ijson.parse(source, use_float=True):
+        if prefix in prefixes and event not in ("end_map", "end_array", "map_key"):
+            builders.append((prefix, ijson.ObjectBuilder()))
+        for _, builder in builders:
+            builder.event(event, value)
+        while builders and builders[-1][0] == prefix and event not in ("start_map", "start_array", "map_key"):
+            # The innermost value at a wanted prefix is complete
+            done_prefix, builder = builders.pop()
+            yield done_prefix, builder.value
+
+def _walk(text: str, prefixes, ancestors):
+    """
+    Iterative walk (one generator, no recursion): containers on a wanted path
+    are entered, values at a wanted prefix decoded and yielded, everything
+    else skipped. Returns the position after the document's value.
+    """
+    pos = _WHITESPACE.match(text, 0).end()
+    stack = [] # (prefix, closing bracket) of the containers entered
+    child = ""
+    while True:
+        # A value at prefix `child` starts at pos
+        opening = text[pos:pos + 1]
+        if child in prefixes:
+            value, pos = _decoder.raw_decode(text, pos)
+            if child in ancestors:
+                # Wanted values nested in a wanted value come first, as with ijson
+                yield from _nested(value, child, prefixes)
+            yield child, value
+        elif child in ancestors and opening in ("{", "["):
+            closing = "}" if opening == "{" else "]"
+            pos = _WHITESPACE.match(text, pos + 1).end()
+            if text[pos:pos + 1] == closing:
+                pos += 1
+            else:
+                stack.append((child, closing))
+                child, pos = _child(text, pos, child, closing)
+                continue
+        else:
+            # Not on a wanted path: skipped by the C decoder
+            pos = _decoder.raw_decode(text, pos)[1]
+
+        # After a value: close finished containers, move on to the next member
+        while True:
+            if not stack:
+                return pos
+            prefix, closing = stack[-1]
+            pos = _WHITESPACE.match(text, pos).end()
+            separator = text[pos:pos + 1]
+            pos = _WHITESPACE.match(text, pos + 1).end()
+            if separator == closing:
+                stack.pop()
+                continue
+            if separator != ",":
+                raise ValueError(f"Expecting ',' or '{closing}' at char {pos}")
+            child, pos = _child(text, pos, prefix, closing)
+            break
+
+def _child(text: str, pos: int, prefix: str, closing: str) -> Tuple[str, int]:
+    """Prefix of the next member of a container and where its value starts."""
+    if closing == "]":
+        return (f"{prefix}.{ITEM}" if prefix else ITEM), pos
+    key, pos = _decoder.raw_decode(text, pos)
+    if not isinstance(key, str):
+        raise ValueError(f"Expecting property name at char {pos}")
+    pos = _WHITESPACE.match(text, pos).end()
+    if text[pos:pos + 1] != ":":
+        raise ValueError(f"Expecting ':' at char {pos}")
+    return (f"{prefix}.{key}" if prefix else key), _WHITESPACE.match(text, pos + 1).end()
+
+def _nested(value, prefix: str, prefixes):
+    """Wanted values inside an already decoded value, innermost first."""
+    if isinstance(value, dict):
+        children = [(f"{prefix}.{key}" if prefix else key, v) for key, v in value.items()]
+    elif isinstance(value, list):
+        children = [(f"{prefix}.{ITEM}" if prefix else ITEM, v) for v in value]
+    else:
+        return
+    for child, v in children:
+        yield from _nested(v, child, prefixes)
+        if child in prefixes:
+            yield child, v
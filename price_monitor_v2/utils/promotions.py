@@ -0,0 +1,197 @@
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from lxml import etree
+
+from price_monitor_v2.config.settings import KEYWORDS_PROMOCION
+
+# Endings a keyword may carry and still count: "ofertas", "promociones", "especiales"
+KEYWORD_SUFFIXES = ("ciones", "ción", "cion", "es", "s")
+SNIPPET_CHARS = 40 # Context kept on each side of a hit
+# Text under these tags is never shown to a visitor
+INVISIBLE_TAGS = {"script", "style", "template", "noscript"}
+# Inline formatting: text on both sides stays one word ("<b>2x</b>1" is "2x1").
+# Every other tag (blocks, br, img...) separates words.
+INLINE_TAGS = {
+    "a", "abbr", "b", "bdi", "bdo", "cite", "code", "data", "del", "dfn", "em", "font", "i", "ins",
+    "kbd", "label", "mark", "q", "s", "samp", "small", "span", "strong", "sub", "sup", "time", "u", "var",
+}
+# JSON keys whose string values are shown to customers (matched as substrings)
+JSON_TEXT_KEYS = ("name", "nombre", "title", "titulo", "description", "descripcion", "label", "tag", "badge", "promo", "text")
+FIELD_SEPARATOR = "\x1e" # Between structured fields; never part of a word
+FEED_CHARS = 65536 # Markup fed to the parser per step
+SCAN_CHARS = 8192 # Visible text buffered between scans
+
+class _Hits:
+    """Keyword -> first snippet, scanning text that arrives in pieces."""
+
+    def __init__(self, scanner: "PromotionScanner"):
+        self.scanner = scanner
+        self.found: Dict[str, str] = {}
+        self.window = ""
+        self.pending = []
+        self.pending_chars = 0
+        self.scanned = 0 # Matches starting before this offset of window are done
+        self.trimmed = False # Text before window was dropped
+        # Text a match (plus its context) may need past the point where it starts
+        self.keep = scanner.longest + SNIPPET_CHARS + 1
+
+    def feed(self, text: str):
+        self.pending.append(text)
+        self.pending_chars += len(text)
+        if self.pending_chars >= SCAN_CHARS:
+            self._scan(final=False)
+
+    def close(self) -> List[Dict[str, str]]:
+        self._scan(final=True)
+        return [{"keyword": kw, "snippet": self.found[kw]} for kw in self.scanner.keywords if kw in self.found]
+
+    def _scan(self, final: bool):
+        self.window += "".join(self.pending)
+        self.pending = []
+        self.pending_chars = 0
+        limit = len(self.window) if final else len(self.window) - self.keep
+        if len(self.found) < len(self.scanner.keywords):
+            lower = self.window.lower()
+            if len(lower) == len(self.window):
+                self._find(lower, limit)
+            else:
+                # Lower-casing moved offsets (e.g. "İ"): fall back to the combined regex
+                for match in self.scanner.pattern.finditer(self.window, self.scanned):
+                    if match.start() >= limit:
+                        break
+                    self._record(self.scanner.keywords[int(match.lastgroup[1:])], match)
+        # Keep what later matches may need as left context
+        cut = max(0, limit - SNIPPET_CHARS)
+        self.window = self.window[cut:]
+        self.scanned = limit - cut
+        self.trimmed = self.trimmed or cut > 0
+
+    def _find(self, lower: str, limit: int):
+        """
+        str.find per keyword (C speed), checking word boundaries only where the
+        keyword occurs; a keyword is not searched again once found.
+        """
+        for keyword, whole_word in zip(self.scanner.keywords, self.scanner.whole_words):
+            if keyword in self.found:
+                continue
+            at = lower.find(keyword, self.scanned, limit + len(keyword) - 1)
+            while at != -1:
+                match = whole_word.match(lower, at)
+                if match:
+                    self._record(keyword, match)
+                    break
+                at = lower.find(keyword, at + 1, limit + len(keyword) - 1)
+
+    def _record(self, keyword: str, match):
+        if keyword not in self.found:
+            self.found[keyword] = self._snippet(match)
+
+    def _snippet(self, match) -> str:
+        start = max(0, match.start() - SNIPPET_CHARS)
+        end = match.end() + SNIPPET_CHARS
+        # Snippets stay within one field (see scan_texts)
+        separator = self.window.rfind(FIELD_SEPARATOR, start, match.start())
+        if separator != -1:
+            start = separator + 1
+        separator = self.window.find(FIELD_SEPARATOR, match.end(), end)
+        if separator != -1:
+            end = separator
+        snippet = " ".join(self.window[start:end].split())
+        if (start > 0 or self.trimmed) and self.window[start - 1:start] != FIELD_SEPARATOR:
+            snippet = "..." + snippet
+        if end < len(self.window) and self.window[end:end + 1] != FIELD_SEPARATOR:
+            snippet += "..."
+        return snippet
+
+class _VisibleText:
+    """
+    lxml parser target: passes the page's visible text on as it is parsed
+    (SAX style, no tree is built). Boundaries of non-inline tags become spaces.
+    """
+
+    def __init__(self, hits: _Hits):
+        self.hits = hits
+        self.hidden = 0
+
+    def start(self, tag, attrib):
+        if tag in INVISIBLE_TAGS:
+            self.hidden += 1
+        if tag not in INLINE_TAGS:
+            self.hits.feed(" ")
+
+    def end(self, tag):
+        if tag in INVISIBLE_TAGS and self.hidden:
+            self.hidden -= 1
+        if tag not in INLINE_TAGS:
+            self.hits.feed(" ")
+
+    def data(self, data):
+        if not self.hidden:
+            self.hits.feed(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return self.hits.close()
+
+class PromotionScanner:
+    """
+    Finds promotion keywords as whole words (case-insensitive; "off" no longer
+    matches "coffee"), allowing plural/noun endings ("promociones"), and returns
+    one {"keyword", "snippet"} per keyword found (its first occurrence), in
+    keyword order. Text is scanned in windows as it streams in.
+    """
+
+    def __init__(self, keywords: Iterable[str] = KEYWORDS_PROMOCION):
+        self.keywords = list(dict.fromkeys(kw.lower() for kw in keywords))
+        # One named group per keyword, longest first so "2x1" beats a shorter prefix
+        order = sorted(range(len(self.keywords)), key=lambda i: len(self.keywords[i]), reverse=True)
+        alternation = "|".join(f"(?P<k{i}>{re.escape(self.keywords[i])})" for i in order) or "(?!)"
+        suffixes = "|".join(KEYWORD_SUFFIXES)
+        self.pattern = re.compile(rf"(?<!\w)(?:{alternation})(?:{suffixes})?(?!\w)", re.IGNORECASE)
+        # Same test anchored at a known occurrence, on lower-cased text
+        self.whole_words = [re.compile(rf"(?<!\w){re.escape(kw)}(?:{suffixes})?(?!\w)") for kw in self.keywords]
+        self.longest = max((len(kw) for kw in self.keywords), default=0) + max(map(len, KEYWORD_SUFFIXES))
+
+    def scan_html(self, content: str) -> List[Dict[str, str]]:
+        """Streams markup through lxml's parser; only the visible text is scanned."""
+        parser = etree.HTMLParser(target=_VisibleText(_Hits(self)))
+        for start in range(0, len(content), FEED_CHARS):
+            parser.feed(content[start:start + FEED_CHARS])
+        return parser.close() if content else []
+
+    def scan_texts(self, texts: Iterable[str]) -> List[Dict[str, str]]:
+        """Scans separate strings (e.g. structured fields); a hit never spans two."""
+        hits = _Hits(self)
+        for text in texts:
+            if text:
+                hits.feed(text)
+                hits.feed(FIELD_SEPARATOR)
+        return hits.close()
+
+    def scan_json(self, data) -> List[Dict[str, str]]:
+        """Scans the customer-facing string fields (JSON_TEXT_KEYS) of a JSON payload."""
+        return self.scan_texts(json_texts(data))
+
+def json_texts(data) -> Iterable[str]:
+    """String values under JSON_TEXT_KEYS, anywhere in data, in document order."""
+    stack = [(None, data)]
+    while stack:
+        key, node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(reversed(list(node.items())))
+        elif isinstance(node, list):
+            stack.extend(reversed([(key, v) for v in node]))
+        elif isinstance(node, str) and key and any(k in key.lower() for k in JSON_TEXT_KEYS):
+            yield node
+
+_scanners: Dict[Tuple[str, ...], PromotionScanner] = {}
+
+def get_promotion_scanner(keywords: Optional[Iterable[str]] = None) -> PromotionScanner:
+    """Compiled scanner per keyword list (KEYWORDS_PROMOCION by default)."""
+    key = tuple(KEYWORDS_PROMOCION if keywords is None else keywords)
+    if key not in _scanners:
+        _scanners[key] = PromotionScanner(key)
+    return _scanners[key]
@@ -0,0 +1,135 @@
+
+import re
+import json
+import html
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+from price_monitor_v2.utils.extraction import PRICE_PATTERN
+
+# Every inline <script>: (attributes, body)
+_SCRIPT = re.compile(r"<script\b([^>]*)>(.*?)</script\s*>", re.IGNORECASE | re.DOTALL)
+_TYPE = re.compile(r"""\btype\s*=\s*["']?([\w/+.-]+)""", re.IGNORECASE)
+_ID = re.compile(r"""\bid\s*=\s*["']?([\w-]+)""", re.IGNORECASE)
+# window.__INITIAL_STATE__ = {...} or = JSON.parse("...")
+_INITIAL_STATE = re.compile(r"__INITIAL_STATE__\s*=\s*(JSON\.parse\(\s*)?")
+# Older Angular Universal escapes its transfer state
+_NG_ESCAPES = {"&q;": '"', "&s;": "'", "&l;": "<", "&g;": ">", "&a;": "&"}
+_NG_ESCAPE = re.compile("|".join(_NG_ESCAPES))
+# Markup whose text is never shown
+_INVISIBLE = re.compile(r"<(script|style|template|noscript)\b.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+
+JSONLD = "json-ld"
+NEXT_DATA = "next-data"
+TRANSFER_STATE = "transfer-state"
+INITIAL_STATE = "initial-state"
+
+# schema.org types holding one sellable item, and where their price lives
+JSONLD_ITEM_TYPES = {"Product", "MenuItem"}
+JSONLD_PRICE_KEYS = ("price", "lowPrice")
+
+_decoder = json.JSONDecoder()
+
+def find_payloads(content: str) -> Iterator[Tuple[str, Any]]:
+    """
+    (kind, data) for every structured payload embedded in a page, in document
+    order: JSON-LD blocks, Next.js __NEXT_DATA__, Angular/Ionic transfer state
+    (<script id="...-state" type="application/json">) and inline
+    window.__INITIAL_STATE__. Read from the raw markup with one regex pass (no
+    tree); payloads that do not decode are skipped.
+    """
+    if "<script" not in content and "<SCRIPT" not in content:
+        return
+    for match in _SCRIPT.finditer(content):
+        attrs, body = match.group(1), match.group(2)
+        kind_match = _TYPE.search(attrs)
+        script_type = kind_match.group(1).lower() if kind_match else ""
+        id_match = _ID.search(attrs)
+        script_id = id_match.group(1) if id_match else ""
+
+        if script_type == "application/ld+json":
+            data = _loads(body)
+            if data is not None:
+                yield JSONLD, data
+        elif script_id == "__NEXT_DATA__":
+            data = _loads(body)
+            if data is not None:
+                yield NEXT_DATA, data
+        elif script_id.endswith("-state") and script_type == "application/json":
+            data = _loads(body)
+            if data is None:
+                data = _loads(_NG_ESCAPE.sub(lambda m: _NG_ESCAPES[m.group(0)], body))
+            if data is not None:
+                yield TRANSFER_STATE, data
+        elif "__INITIAL_STATE__" in body:
+            data = _initial_state(body)
+            if data is not None:
+                yield INITIAL_STATE, data
+
+def _loads(text: str):
+    try:
+        return json.loads(html.unescape(text) if text.lstrip().startswith("&") else text)
+    except ValueError:
+        return None
+
+def _initial_state(body: str):
+    match = _INITIAL_STATE.search(body)
+    if not match:
+        return None
+    try:
+        value, _ = _decoder.raw_decode(body, match.end())
+        if match.group(1):
+            # JSON.parse("...") : the literal holds the JSON text
+            value = json.loads(value) if isinstance(value, str) else None
+        return value
+    except ValueError:
+        # A JS object literal (unquoted keys, undefined...): not JSON
+        return None
+
+def _types(node: Dict) -> List[str]:
+    types = node.get("@type", [])
+    types = types if isinstance(types, list) else [types]
+    return [t.rsplit("/", 1)[-1] for t in types if isinstance(t, str)]
+
+def _offer_price(offers):
+    for offer in offers if isinstance(offers, list) else [offers]:
+        if not isinstance(offer, dict):
+            continue
+        for key in JSONLD_PRICE_KEYS:
+            if offer.get(key) not in (None, ""):
+                return offer[key]
+        spec = offer.get("priceSpecification")
+        if isinstance(spec, dict) and spec.get("price") not in (None, ""):
+            return spec["price"]
+    return None
+
+def jsonld_items(data) -> List[Dict[str, Any]]:
+    """
+    Product/MenuItem nodes of a JSON-LD payload (any nesting: @graph, Menu ->
+    hasMenuSection -> hasMenuItem, ItemList...) as {"name", "price"} records,
+    the shape extract_products_from_json reads.
+    """
+    records = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+        if JSONLD_ITEM_TYPES.intersection(_types(node)) and isinstance(node.get("name"), str):
+            price = _offer_price(node.get("offers"))
+            if price is not None:
+                records.append({"name": html.unescape(node["name"]), "price": price})
+        stack.extend(reversed([v for k, v in node.items() if k != "offers" and isinstance(v, (dict, list))]))
+    return records
+
+def visible_prices(content: str) -> Set[float]:
+    """
+    Every price the heuristics would look at (PRICE_PATTERN outside scripts,
+    styles and comments), read from the raw markup.
+    """
+    if "$" not in content:
+        return set()
+    text = _INVISIBLE.sub(" ", content)
+    return {round(float(match.group(0).lstrip("$ \t\r\n")), 2) for match in PRICE_PATTERN.finditer(text)}
@@ -1,4 +1,5 @@
 import os
+import json
 import threading
 import http.server
 import socketserver
@@ -7,13 +8,21 @@ import time
 # Port injected by Railway (or default 8080)
 PORT = int(os.environ.get("PORT", 8080))
 
+# Boot progress of the monitor thread, reported on /health
+BOOT_STATE = {"stage": "starting", "ready": False, "started_at": time.time()}
+
 class DashboardHandler(http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         # Health Check
+        # Always 200 so platform checks pass while the monitor warms up;
+        # "ready" tells whether the first cycle will start hot
         if self.path == "/health":
+            body = json.dumps({"status": "ok", **BOOT_STATE}).encode("utf-8")
             self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
             self.end_headers()
-            self.wfile.write(b"OK")
+            self.wfile.write(body)
             return
 
         # Redirect root to dashboard.html
@@ -28,14 +37,27 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
         return self.client_address[0]
 
 def start_monitor_loop():
-    """Deferred import and run monitor in background."""
+    """Deferred import, pre-warm and run monitor in background."""
     print("📦 Loading Monitor modules (Background)...")
     try:
         # Deferred Import to prevent slow startup
-        from price_monitor_v2.main import run_monitor
+        BOOT_STATE["stage"] = "importing"
+        from price_monitor_v2.main import run_monitor, active_competitors
+        from price_monitor_v2.core.network import NetworkManager
+        from price_monitor_v2.core.prewarm import prewarm
+
+        # Same thread as run_monitor: the sync Playwright browser is bound to it
+        BOOT_STATE["stage"] = "prewarming"
+        network = NetworkManager()
+        # Sets BOOT_STATE["ready"] from what actually warmed up
+        prewarm(network, active_competitors(), BOOT_STATE)
+        BOOT_STATE.update(stage="running", boot_s=round(time.time() - BOOT_STATE["started_at"], 1))
+
         print("✅ Monitor modules loaded. Starting Loop...")
-        run_monitor()
+        run_monitor(network)
+        BOOT_STATE["stage"] = "idle"
     except Exception as e:
+        BOOT_STATE.update(stage="error", error=str(e))
         print(f"❌ Critical Error in Monitor Loop: {e}")
 
 if __name__ == "__main__":
@@ -46,14 +68,15 @@ if __name__ == "__main__":
         with open("dashboard.html", "w", encoding="utf-8") as f:
             f.write("<h1>Benchmark Pro is starting...</h1><p>Please refresh in a few minutes.</p>")
 
-    # 1. Start Monitor in a background thread (So Web Server gets Main Thread)
-    monitor_thread = threading.Thread(target=start_monitor_loop, daemon=True)
-    monitor_thread.start()
-    
-    # 2. Start Web Server in Main Thread (Priority)
+    # 1. Bind the Web Server first (Priority), so /health answers from the start
     # Use ThreadingTCPServer to handle concurrent requests (Platform + User)
     with socketserver.ThreadingTCPServer(("0.0.0.0", PORT), DashboardHandler) as httpd:
         print(f"🌍 Web server listening on 0.0.0.0:{PORT}")
+
+        # 2. Then import + pre-warm + run the Monitor in a background thread
+        monitor_thread = threading.Thread(target=start_monitor_loop, daemon=True)
+        monitor_thread.start()
+
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
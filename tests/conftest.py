@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import price_monitor_v2 from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,28 @@
+import json
+
+from price_monitor_v2.core.api_replay import ApiTemplateStore, request_template
+
+class _Request:
+    method = "POST"
+    url = "https://api.example.com/menu"
+    post_data = '{"store": 1}'
+
+def test_request_template_drops_credentials_and_transport_headers():
+    headers = {"Cookie": "session=1", "authorization": "Bearer x", "accept": "application/json",
+               "content-length": "12", ":authority": "api.example.com"}
+    template = request_template(_Request, headers)
+    assert template["headers"] == {"accept": "application/json"}
+    assert template["post_data"] == '{"store": 1}'
+
+def test_store_never_writes_or_returns_credentials(tmp_path):
+    path = tmp_path / "api_templates.json"
+    store = ApiTemplateStore(str(path))
+    store.record("KFC", [{"method": "GET", "url": "https://a", "headers": {"cookie": "s=1", "accept": "*/*"}, "post_data": None}])
+    assert "s=1" not in path.read_text(encoding="utf-8")
+    assert store.get("KFC")[0]["headers"] == {"accept": "*/*"}
+
+    # A file written before credentials were stripped
+    path.write_text(json.dumps({"KFC": {"templates": [{"url": "https://a", "headers": {"Authorization": "x"}}]}}))
+    assert store.get("KFC")[0]["headers"] == {}
+    store.invalidate("KFC")
+    assert store.get("KFC") is None
@@ -0,0 +1,81 @@
+import os
+import time
+
+import pytest
+
+from price_monitor_v2.core.cache import ParseCache, content_fingerprint
+from price_monitor_v2.core.executor import merge_outcomes
+from price_monitor_v2.parsers import base
+from price_monitor_v2.parsers.kfc import KFCParser
+
+PAGE = """<html><head><script nonce="{nonce}">var built = {ts};</script></head>
+<body><div class="card"><h3>Combo Personal</h3><span>{price}</span></div></body></html>"""
+
+def page(price="$5.99", nonce="abc", ts=1700000000):
+    return PAGE.format(price=price, nonce=nonce, ts=ts)
+
+def test_fingerprint_ignores_noise():
+    assert content_fingerprint(page()) == content_fingerprint(page(nonce="xyz", ts=1700009999))
+    assert content_fingerprint("<p>a  b\n</p>") == content_fingerprint("<p>a b </p>")
+
+def test_fingerprint_sees_price_changes():
+    assert content_fingerprint(page()) != content_fingerprint(page(price="$6.49"))
+    # Prices inside scripts are kept
+    assert content_fingerprint('<script>{"price": "$5.99"}</script>') != content_fingerprint('<script>{"price": "$6.49"}</script>')
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(str(tmp_path), max_age_h=1)
+
+def test_key_covers_parser_and_config(cache):
+    kfc = KFCParser(None, {"name": "KFC"})
+    assert cache.key(kfc, page()) == cache.key(KFCParser(None, {"name": "KFC"}), page(nonce="other"))
+    assert cache.key(kfc, page()) != cache.key(KFCParser(None, {"name": "KFC", "structured_data": False}), page())
+    assert cache.key(kfc, page()) != cache.key(kfc, page(price="$6.49"))
+
+def test_get_put_and_prune(cache):
+    products = [{"nombre": "Combo Personal", "precio": 5.99, "categoria": "pollo_individual"}]
+    hits = [{"keyword": "promo", "snippet": "promo"}]
+    assert cache.get("k") is None
+    cache.put("k", products, hits)
+    assert cache.get("k") == (products, hits)
+
+    old = time.time() - 2 * 3600
+    os.utime(cache._path("k"), (old, old))
+    cache.prune()
+    assert cache.get("k") is None
+
+@pytest.fixture
+def parser(cache, monkeypatch):
+    monkeypatch.setattr(base, "PARSE_CACHE", True)
+    monkeypatch.setattr(base, "get_parse_cache", lambda: cache)
+    return KFCParser(None, {"name": "KFC"})
+
+def test_extract_cached_hit_returns_stored_results(parser):
+    products, _, cached, first = parser.extract_cached(page())
+    assert products and not cached
+    again, _, cached, second = parser.extract_cached(page(nonce="xyz"))
+    assert cached and again == products and second == first
+
+def test_cache_hit_is_not_unchanged_since_last_cycle(parser):
+    # A -> B -> A: the return to A hits the cache but differs from last cycle
+    _, _, _, a = parser.extract_cached(page())
+    _, _, _, b = parser.extract_cached(page(price="$6.49"))
+    _, _, cached, a_again = parser.extract_cached(page())
+    assert cached
+    assert a_again == a != b
+
+def test_extract_cached_without_cache(monkeypatch):
+    monkeypatch.setattr(base, "PARSE_CACHE", False)
+    products, _, cached, fingerprint = KFCParser(None, {"name": "KFC"}).extract_cached(page())
+    assert products and not cached and fingerprint is None
+
+def test_merge_outcomes_fingerprints():
+    product = {"nombre": "Combo", "precio": 5.99, "categoria": "pollo_individual"}
+    outcomes = [([product], [], True, "a"), ([dict(product)], [{"keyword": "promo", "snippet": "s"}], False, "b")]
+    products, promos, fingerprints = merge_outcomes(outcomes)
+    assert products == [product]
+    assert promos == {"promo": "s"}
+    assert fingerprints == ["a", "b"]
+    # One page without a fingerprint: the competitor has none
+    assert merge_outcomes([([], [], False, "a"), ([], [], False, None)])[2] is None
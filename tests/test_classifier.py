@@ -0,0 +1,58 @@
+from price_monitor_v2.utils.classifier import ProductClassifier
+
+CATEGORIES = {
+    "hamburguesas": {"keywords": ["burger", "sandwich"], "excluir": ["pie", "helado"]},
+    "pollo_individual": {"keywords": ["combo", "menú", "2 piezas"], "excluir": ["familiar", "sandwich", "pie"]},
+    "pollo_familiar": {"keywords": ["familiar", "8 piezas"], "excluir": ["pie"]},
+    "postres": {"keywords": ["pie", "helado"], "excluir": ["combo"]},
+}
+
+def test_first_category_in_config_order_wins():
+    classifier = ProductClassifier(CATEGORIES)
+    # "combo" and "burger" both match: hamburguesas comes first
+    assert classifier.classify("Combo Burger") == "hamburguesas"
+    assert classifier.classify("Combo Personal") == "pollo_individual"
+
+def test_exclusions_skip_to_the_next_category():
+    classifier = ProductClassifier(CATEGORIES)
+    # Excluded from pollo_individual by "familiar", a keyword of pollo_familiar
+    assert classifier.classify("Combo Familiar") == "pollo_familiar"
+    # Excluded from every category holding it
+    assert classifier.classify("Combo Helado") == "pollo_individual"
+    assert classifier.classify("Pie de manzana") == "postres"
+    assert classifier.classify("Agua") is None
+
+def test_substring_matching_by_default():
+    classifier = ProductClassifier(CATEGORIES)
+    # "pie" excludes "piezas", as the original classify_product did (and
+    # postres excludes "combo")
+    assert classifier.classify("Combo 2 piezas") is None
+    assert classifier.classify("MENÚ del día") == "pollo_individual"
+    assert classifier.classify("Menu del dia") is None
+
+def test_accent_folding():
+    classifier = ProductClassifier(CATEGORIES, accents=True)
+    assert classifier.classify("Menu del dia") == "pollo_individual"
+
+def test_word_boundaries():
+    classifier = ProductClassifier(CATEGORIES, word_boundaries=True)
+    assert classifier.classify("Combo 2 piezas") == "pollo_individual"
+    assert classifier.classify("Burgers") is None
+    assert classifier.classify("Pie de manzana") == "postres"
+
+def test_classify_many_matches_classify():
+    classifier = ProductClassifier(CATEGORIES)
+    names = ["Combo Burger", "combo burger", "Agua", "Combo Familiar", "Agua"]
+    assert classifier.classify_many(names) == [classifier.classify(n) for n in names]
+
+def test_uncached_long_texts():
+    classifier = ProductClassifier(CATEGORIES, cache_size=8)
+    text = "texto " * 200 + "combo"
+    assert classifier.classify(text) == "pollo_individual"
+    assert classifier.cache_info().currsize == 0
+
+def test_long_texts_stop_at_the_first_category():
+    classifier = ProductClassifier(CATEGORIES, cache_size=0)
+    filler = "pollo papas grande " * 10
+    for name in ["Combo Burger", "Combo Familiar", "Combo Helado", "Combo 2 piezas", "Pie de manzana", "Agua"]:
+        assert classifier.classify(filler + name) == classifier.classify(name)
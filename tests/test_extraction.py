@@ -0,0 +1,52 @@
+import pytest
+
+from price_monitor_v2.config.settings import CATEGORIAS_PRODUCTOS
+from price_monitor_v2.utils.document import ParsedDocument
+from price_monitor_v2.utils.extraction import ENGINES, get_engine
+
+# Pages the backends must read identically: each one exercises a place where
+# BeautifulSoup's and lxml's views of the text could differ. Prices inside
+# comments and scripts are picked up by the soup backend too; parity, not
+# that behaviour, is what is checked here.
+PAGES = {
+    "cards": """<html><body>
+        <div class="card"><h3>Combo Personal</h3><span class="price">$5.99</span></div>
+        <div class="card"><h3>Hamburguesa Clásica</h3><span class="price">$4.50</span></div>
+        <div class="card"><h3>Bucket Familiar</h3><p>Ahora <b>$18.00</b></p></div>
+        </body></html>""",
+    "comments": """<div><!-- Combo Personal $1.00 --><h3>Combo <!-- x -->Personal</h3><span>$5.99</span></div>
+        <div><h3>Alitas BBQ</h3><!-- $2.00 --><span>$6.25</span></div>""",
+    "hidden-text": """<div><script>var menu = "Combo Personal $1.00";</script><h3>Combo Personal</h3><span>$5.99</span></div>
+        <div><template><p>Sandwich $2.00</p></template><style>.x{content:"$3.00"}</style><h3>Kruncher Sandwich</h3><span>$4.75</span></div>
+        <div><ruby>Combo<rt>kombo $7.00</rt></ruby> Personal <span>$8.50</span></div>""",
+    "unclosed": """<div class=card><h3>Combo Personal<span>$5.99
+        <div class=card><p>Menú Familiar <p>$19.99
+        <li>Alitas 6 unidades <li>$7.25
+        <table><tr><td>Sundae de chocolate<td>$1.99</table>""",
+    "nbsp": """<div><h3>Combo&nbsp;Personal</h3><span>$&nbsp;5.99</span></div>
+        <div><h3>Alitas&#160;BBQ</h3><span>$ 6.25</span></div>
+        <div><h3>Bucket Familiar</h3><span>$&nbsp;&nbsp;18.00</span></div>""",
+    "nested": """<section><h2>Pollo</h2><ul>
+        <li><article><header><h4>Combo Personal Pollo</h4></header><footer><em>precio</em> <strong>$5.99</strong></footer></article></li>
+        <li><article><h4>Menú Individual Pollo</h4><div><div><div><div><div><div><span>$7.99</span></div></div></div></div></div></div></article></li>
+        </ul></section>""",
+    "long-names": "<div><p>" + "Combo personal con papas y bebida " * 5 + "</p><span>$9.99</span></div>",
+    "no-prices": "<div><h3>Combo Personal</h3><span>Agotado</span></div>",
+    "empty": "",
+}
+
+@pytest.mark.parametrize("name", sorted(PAGES))
+def test_engines_return_identical_products(name):
+    results = {engine: ENGINES[engine].extract_products(ParsedDocument(PAGES[name]), CATEGORIAS_PRODUCTOS)
+               for engine in ENGINES}
+    assert results["lxml"] == results["soup"]
+
+def test_fixture_pages_yield_products():
+    # Guards against the parity test passing on empty results
+    found = {name: len(ENGINES["soup"].extract_products(ParsedDocument(page), CATEGORIAS_PRODUCTOS))
+             for name, page in PAGES.items()}
+    assert all(found[name] for name in ("cards", "comments", "hidden-text", "unclosed", "nbsp", "nested"))
+    assert found["empty"] == found["no-prices"] == 0
+
+def test_unknown_backend_falls_back_to_the_default():
+    assert get_engine("nope") is get_engine(None)
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from price_monitor_v2.utils import json_stream
+from price_monitor_v2.utils.json_stream import iter_items, iter_prefixed
+
+DOC = json.dumps({
+    "data": {
+        "sections": [
+            {"name": "Pollo", "data": [{"dataProducts": [{"name": "Combo", "price": 5.5}, {"name": "Bucket", "price": 12}]}]},
+            {"name": "Postres", "data": [{"dataProducts": []}, {"other": 1}]},
+        ],
+        "total": 2,
+    },
+    "skip": {"sections": [{"name": "not this one"}]},
+})
+
+PRODUCTS = "data.sections.item.data.item.dataProducts.item"
+
+@pytest.fixture(params=["ijson", "fallback"])
+def backend(request, monkeypatch):
+    if request.param == "ijson":
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setattr(json_stream, "ijson", None)
+    return request.param
+
+def test_items_at_prefix(backend):
+    assert list(iter_items(DOC, PRODUCTS)) == [{"name": "Combo", "price": 5.5}, {"name": "Bucket", "price": 12}]
+    assert list(iter_items(DOC, "data.sections.item.name")) == ["Pollo", "Postres"]
+    assert list(iter_items(DOC, "data.total")) == [2]
+
+def test_prefix_must_match_the_whole_path(backend):
+    # "sections.item.name" under "skip" is not "data.sections.item.name"
+    assert list(iter_items(DOC, "sections.item.name")) == []
+    assert list(iter_items(DOC, "data.sections.name")) == []
+
+def test_several_prefixes_in_document_order(backend):
+    found = list(iter_prefixed(DOC, ["data.total", "data.sections.item.name"]))
+    assert found == [("data.sections.item.name", "Pollo"), ("data.sections.item.name", "Postres"), ("data.total", 2)]
+
+def test_nested_wanted_values_come_first(backend):
+    found = [prefix for prefix, _ in iter_prefixed(DOC, ["data.sections.item", "data.sections.item.name"])]
+    assert found == ["data.sections.item.name", "data.sections.item", "data.sections.item.name", "data.sections.item"]
+
+def test_top_level_array(backend):
+    assert list(iter_items('[{"a": 1}, {"a": 2}]', "item.a")) == [1, 2]
+    assert list(iter_items(b'[{"a": 1}]', "item")) == [{"a": 1}]
+
+@pytest.mark.parametrize("text", ['{"a": [1, 2}', '{"a" 1}', '{"a": 1} x'])
+def test_malformed_json_raises(backend, text):
+    with pytest.raises(ValueError):
+        list(iter_items(text, "a"))
@@ -0,0 +1,94 @@
+import pytest
+
+from price_monitor_v2.core.cache import FetchResult
+from price_monitor_v2.core.pipeline import FetchParsePipeline
+from price_monitor_v2.main import extract_pages, fetch_pages
+from price_monitor_v2.parsers import base
+from price_monitor_v2.parsers.kfc import KFCParser
+
+ITEMS = ["Combo Personal", "Hamburguesa Clasica", "Bucket Familiar", "Alitas BBQ", "Kruncher Sandwich"]
+
+def page(n, next_url=None):
+    head = f'<link rel="next" href="{next_url}">' if next_url else ""
+    cards = "".join(f'<div class="card"><h3>{name}</h3><span>${n + i}.{n}9</span></div>' for i, name in enumerate(ITEMS))
+    return f"<html><head>{head}</head><body>{cards}</body></html>"
+
+class FakeParser(KFCParser):
+    """Serves config["site"]: url -> page, list of pages or an exception."""
+
+    def fetch_data(self, url):
+        content = self.config["site"][url]
+        if isinstance(content, Exception):
+            raise content
+        if isinstance(content, list):
+            return content
+        return FetchResult(content, unchanged=url in self.config.get("unchanged", ()))
+
+def job(name, site, unchanged=()):
+    comp = {"name": name, "url": next(iter(site)), "site": site, "unchanged": set(unchanged)}
+    return comp, FakeParser(None, comp)
+
+def paginated(prefix, pages):
+    urls = [f"http://{prefix}/{i}" for i in range(pages)]
+    return {url: page(i, urls[i + 1] if i + 1 < pages else None) for i, url in enumerate(urls)}
+
+@pytest.fixture(autouse=True)
+def no_parse_cache(monkeypatch):
+    monkeypatch.setattr(base, "PARSE_CACHE", False)
+
+def serial(comp, parser):
+    """What FETCH_MODE=serial returns for the same competitor."""
+    return extract_pages(parser, fetch_pages(parser, comp["url"]))[0]
+
+def run(jobs, skip=None, queue_size=2):
+    pipeline = FetchParsePipeline(queue_size=queue_size, max_workers=1)
+    return pipeline, pipeline.run(jobs, skip_unchanged=skip)
+
+def test_pagination_matches_serial_fetch():
+    jobs = [job("A", paginated("a", 3)), job("B", paginated("b", 7))]
+    pipeline, results = run(jobs)
+    for comp, parser in jobs:
+        assert results[comp["name"]]["products"] == serial(comp, parser)
+        assert results[comp["name"]]["unchanged"] is False
+    # Pagination stops at MAX_PAGES, as fetch_pages does
+    assert pipeline.stats["fetched"] == 3 + 5
+
+def test_list_pages_are_parsed_unpaginated():
+    comp, parser = job("C", {"http://c": [page(1, "http://c/next"), "", page(2)]})
+    pipeline, results = run([(comp, parser)])
+    assert results["C"]["products"] == serial(comp, parser)
+    assert pipeline.stats["fetched"] == 2
+
+def test_failed_fetch_keeps_the_pages_already_fetched():
+    site = paginated("d", 3)
+    site["http://d/1"] = RuntimeError("connection reset")
+    _, results = run([job("D", site), job("E", {"http://e": RuntimeError("down")})])
+    assert results["D"]["products"] == extract_pages(FakeParser(None, {}), [page(0, "http://d/1")])[0]
+    assert results["E"]["products"] == []
+
+def test_all_pages_unchanged_reuses_the_stored_result():
+    site = paginated("f", 3)
+    _, results = run([job("F", site, unchanged=site)], skip={"F": None})
+    assert results["F"]["products"] is None
+    assert results["F"]["unchanged"] is True
+
+def test_unchanged_pages_are_not_skipped_without_a_stored_result():
+    site = paginated("g", 3)
+    comp, parser = job("G", site, unchanged=site)
+    _, results = run([(comp, parser)])
+    assert results["G"]["products"] == serial(comp, parser)
+
+def test_some_pages_unchanged_extracts_them_all():
+    site = paginated("h", 4)
+    comp, parser = job("H", site, unchanged=["http://h/0", "http://h/2"])
+    _, results = run([(comp, parser)], skip={"H": None})
+    assert results["H"]["unchanged"] is False
+    assert results["H"]["products"] == serial(comp, parser)
+
+@pytest.mark.parametrize("queue_size", [1, 2, 3])
+def test_queue_depth_never_exceeds_the_limit(queue_size):
+    jobs = [job("I", paginated("i", 5)), job("J", {"http://j": [page(i) for i in range(6)]}), job("K", paginated("k", 2))]
+    pipeline, results = run(jobs, queue_size=queue_size)
+    assert pipeline.stats["depth_max"] <= queue_size
+    assert pipeline.stats["parsed"] == pipeline.stats["fetched"] == 13
+    assert set(results) == {"I", "J", "K"}
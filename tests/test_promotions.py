@@ -0,0 +1,60 @@
+import pytest
+
+from price_monitor_v2.utils.promotions import FEED_CHARS, PromotionScanner, json_texts
+
+@pytest.fixture
+def scanner():
+    return PromotionScanner(["off", "promo", "oferta", "2x1", "descuento"])
+
+def keywords(hits):
+    return [hit["keyword"] for hit in hits]
+
+@pytest.mark.parametrize("html", ["<p>Coffee time</p>", "<p>promotional</p>", "<p>ofertante</p>", "<p>12x10</p>"])
+def test_keywords_only_match_whole_words(scanner, html):
+    assert scanner.scan_html(html) == []
+
+@pytest.mark.parametrize("html, keyword", [
+    ("<p>20% OFF hoy</p>", "off"),
+    ("<p>Promociones de la semana</p>", "promo"),
+    ("<p>Ofertas</p>", "oferta"),
+    ("<p>descuentos</p>", "descuento"),
+    ("<p>Combos 2x1 los martes</p>", "2x1"),
+])
+def test_plural_and_noun_endings(scanner, html, keyword):
+    assert keywords(scanner.scan_html(html)) == [keyword]
+
+def test_only_visible_text_is_scanned(scanner):
+    html = "<script>var promo = 1</script><style>.off{}</style><!-- oferta --><p>nada</p>"
+    assert scanner.scan_html(html) == []
+
+def test_tags_split_words(scanner):
+    assert scanner.scan_html("<p>pro</p><p>mo</p>") == []
+
+@pytest.mark.parametrize("html, found", [
+    ("<p>Promo <b>2x</b>1 hoy</p>", ["promo", "2x1"]),
+    ("<p><strong>2</strong>x1</p>", ["2x1"]),
+    ("<p><span>Des</span>cuento 20%</p>", ["descuento"]),
+    ("<p>Of<em>er</em><a href='#'>ta</a></p>", ["oferta"]),
+])
+def test_inline_tags_do_not_split_words(scanner, html, found):
+    assert keywords(scanner.scan_html(html)) == found
+
+def test_snippet_keeps_the_context(scanner):
+    hits = scanner.scan_html("<div><p>Combos 2x1 los martes</p></div>")
+    assert hits == [{"keyword": "2x1", "snippet": "Combos 2x1 los martes"}]
+
+def test_one_hit_per_keyword_in_keyword_order(scanner):
+    hits = scanner.scan_html("<p>2x1 hoy</p><p>oferta</p><p>2x1 otra vez</p>")
+    assert keywords(hits) == ["oferta", "2x1"]
+    assert hits[1]["snippet"].startswith("2x1 hoy")
+
+def test_hit_across_feed_chunks(scanner):
+    html = "<p>" + "x " * (FEED_CHARS // 2 - 3) + "gran oferta</p>"
+    assert keywords(scanner.scan_html(html)) == ["oferta"]
+
+def test_separate_texts_never_join(scanner):
+    assert keywords(scanner.scan_texts(["pro", "mo", "Gran oferta!"])) == ["oferta"]
+
+def test_json_texts_reads_customer_facing_fields():
+    data = {"name": "Combo", "id": "promo-1", "items": [{"description": "2x1"}, {"url": "/oferta"}]}
+    assert list(json_texts(data)) == ["Combo", "2x1"]
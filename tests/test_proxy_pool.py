@@ -0,0 +1,91 @@
+import pytest
+
+from price_monitor_v2.core import proxy_pool
+from price_monitor_v2.core.proxy_pool import ProxyPool, playwright_proxy
+from price_monitor_v2.core.resilience import BLOCKED, TIMEOUT
+
+URL = "https://menu.example.com/carta"
+OTHER = "https://api.example.org/menu"
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(proxy_pool.time, "time", lambda: now[0])
+    return now
+
+def test_block_cools_the_proxy_down_for_that_host_only(clock):
+    pool = ProxyPool(["http://a:1", "http://b:2"], cooldown_s=60, max_consecutive_failures=3)
+    pool.report("http://a:1", URL, False, error=BLOCKED)
+    assert all(pool.choose(URL) == "http://b:2" for _ in range(20))
+    # Still usable for other hosts
+    pool.report("http://b:2", OTHER, False, error=BLOCKED)
+    assert pool.choose(OTHER) == "http://a:1"
+    clock[0] += 61
+    pool.report("http://b:2", URL, False, error=BLOCKED)
+    assert pool.choose(URL) == "http://a:1"
+
+def test_consecutive_failures_cool_the_proxy_down(clock):
+    pool = ProxyPool(["http://a:1", "http://b:2"], cooldown_s=60, max_consecutive_failures=3)
+    for _ in range(2):
+        pool.report("http://a:1", URL, False, error=TIMEOUT)
+    assert pool._health("http://a:1", pool._host(URL)).cooldown_until == 0
+    # A success in between resets the streak
+    pool.report("http://a:1", URL, True, latency=0.5)
+    for _ in range(2):
+        pool.report("http://a:1", URL, False, error=TIMEOUT)
+    assert pool._health("http://a:1", pool._host(URL)).cooldown_until == 0
+    pool.report("http://a:1", URL, False, error=TIMEOUT)
+    assert pool._health("http://a:1", pool._host(URL)).cooldown_until == clock[0] + 60
+
+def test_lower_latency_wins(clock):
+    pool = ProxyPool(["http://a:1", "http://b:2"], latency_ref=1.0)
+    for _ in range(5):
+        pool.report("http://a:1", URL, True, latency=2.0)
+        pool.report("http://b:2", URL, True, latency=0.2)
+    assert all(pool.choose(URL) == "http://b:2" for _ in range(20))
+
+def test_higher_success_rate_wins(clock):
+    pool = ProxyPool(["http://a:1", "http://b:2"], max_consecutive_failures=10, latency_ref=1.0)
+    for ok in [True, False, True, False]:
+        pool.report("http://a:1", URL, ok, latency=0.5, error=None if ok else TIMEOUT)
+    for ok in [True, True, True, False]:
+        pool.report("http://b:2", URL, ok, latency=0.5, error=None if ok else TIMEOUT)
+    assert all(pool.choose(URL) == "http://b:2" for _ in range(20))
+
+def test_host_without_history_uses_overall_stats(clock):
+    pool = ProxyPool(["http://a:1", "http://b:2"], latency_ref=1.0)
+    pool.report("http://a:1", URL, True, latency=0.1)
+    pool.report("http://b:2", URL, True, latency=3.0)
+    assert pool.choose(OTHER) == "http://a:1"
+
+def test_all_cooling_down_returns_the_first_to_recover(clock):
+    pool = ProxyPool(["http://a:1", "http://b:2", "http://c:3"], cooldown_s=60)
+    for proxy in ["http://b:2", "http://c:3", "http://a:1"]:
+        pool.report(proxy, URL, False, error=BLOCKED)
+        clock[0] += 10
+    assert pool.choose(URL) == "http://b:2"
+    clock[0] += 35  # b is healthy again
+    assert pool.choose(URL) == "http://b:2"
+
+def test_pinned_proxy_is_sticky():
+    pool = ProxyPool(["http://a:1", "http://b:2", "http://c:3"])
+    first = pool.pinned("KFC", URL)
+    assert all(pool.pinned("KFC", URL) == first for _ in range(50))
+    with pool.track(URL, pin="KFC") as proxy:
+        assert proxy == first
+
+def test_pinned_proxy_is_replaced_once_it_cools_down():
+    pool = ProxyPool(["http://a:1", "http://b:2"], cooldown_s=60)
+    first = pool.pinned("KFC", URL)
+    pool.report(first, URL, False, error=BLOCKED)
+    second = pool.pinned("KFC", URL)
+    assert second != first
+    assert pool.pinned("KFC", URL) == second
+
+def test_empty_pool_is_direct():
+    assert ProxyPool([]).pinned("KFC", URL) is None
+
+def test_playwright_proxy_splits_credentials():
+    assert playwright_proxy("http://user:pw@proxy.local:8080") == {
+        "server": "http://proxy.local:8080", "username": "user", "password": "pw"}
+    assert playwright_proxy(None) is None
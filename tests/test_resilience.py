@@ -0,0 +1,92 @@
+import pytest
+
+from price_monitor_v2.core import resilience
+from price_monitor_v2.core.resilience import (
+    BLOCKED, CLIENT_ERROR, CLOSED, HALF_OPEN, OPEN, SERVER_ERROR, TIMEOUT,
+    CircuitBreakerBoard, FetchError, RetryPolicy, classify_exception, classify_status
+)
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "time", lambda: now[0])
+    return now
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    board = CircuitBreakerBoard(threshold=2, cooldown=60)
+    board.record_failure("host:a", TIMEOUT)
+    assert board.status("host:a") == CLOSED
+    board.record_failure("host:a", TIMEOUT)
+    assert board.status("host:a") == OPEN
+    assert board.state["host:a"]["last_error"] == TIMEOUT
+
+def test_success_resets_the_failure_count(clock):
+    board = CircuitBreakerBoard(threshold=2, cooldown=60)
+    board.record_failure("host:a", TIMEOUT)
+    board.record_success("host:a")
+    board.record_failure("host:a", TIMEOUT)
+    assert board.status("host:a") == CLOSED
+
+def test_half_open_after_cooldown(clock):
+    board = CircuitBreakerBoard(threshold=1, cooldown=60)
+    board.record_failure("host:a", BLOCKED)
+    clock[0] += 59
+    assert board.status("host:a") == OPEN
+    clock[0] += 1
+    assert board.status("host:a") == HALF_OPEN
+
+def test_half_open_trial_closes_or_reopens(clock):
+    board = CircuitBreakerBoard(threshold=3, cooldown=60)
+    for _ in range(3):
+        board.record_failure("host:a", SERVER_ERROR)
+    clock[0] += 60
+    assert board.status("host:a") == HALF_OPEN
+    # One failed trial is enough to re-open, whatever the threshold
+    board.record_failure("host:a", SERVER_ERROR)
+    assert board.status("host:a") == OPEN
+    clock[0] += 60
+    assert board.status("host:a") == HALF_OPEN
+    board.record_success("host:a")
+    assert board.status("host:a") == CLOSED
+    assert board.state["host:a"]["failures"] == 0
+
+def test_state_is_a_plain_dict_shared_with_the_caller(clock):
+    state = {}
+    CircuitBreakerBoard(state, threshold=1, cooldown=60).record_failure("competitor:KFC", TIMEOUT)
+    assert CircuitBreakerBoard(state, threshold=1, cooldown=60).status("competitor:KFC") == OPEN
+
+@pytest.mark.parametrize("status, body, kind", [
+    (200, "", None),
+    (None, "", None),
+    (404, "", CLIENT_ERROR),
+    (403, "", BLOCKED),
+    (429, "", BLOCKED),
+    (503, "", SERVER_ERROR),
+    (200, "<title>Just a moment...</title>", BLOCKED),
+])
+def test_classify_status(status, body, kind):
+    assert classify_status(status, body) == kind
+
+def test_classify_exception():
+    assert classify_exception(FetchError(BLOCKED, "http://a", 403)) == BLOCKED
+    assert classify_exception(type("ReadTimeout", (Exception,), {})()) == TIMEOUT
+
+def test_retry_policy_retries_only_retryable_errors(monkeypatch):
+    monkeypatch.setattr(resilience.time, "sleep", lambda s: None)
+    policy = RetryPolicy(attempts=3, backoff=0, retry_on=[TIMEOUT])
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise FetchError(TIMEOUT, "http://a")
+        return "ok"
+    assert policy.run(flaky, "http://a") == "ok"
+
+    calls.clear()
+    def blocked():
+        calls.append(1)
+        raise FetchError(BLOCKED, "http://a", 403)
+    with pytest.raises(FetchError):
+        policy.run(blocked, "http://a")
+    assert len(calls) == 1
@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from price_monitor_v2.core import network
+from price_monitor_v2.core.cache import ResponseCache
+from price_monitor_v2.core.network import NetworkManager
+
+URL = "https://menu.example/categorias"
+BODY = "<html><body>Combo Personal $5.99</body></html>"
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path), ttl=0)
+
+def fetch(cache, status, text="", headers=None, ttl=None):
+    key, entry, conditional, fresh = cache.prepare("GET", URL, ttl=ttl)
+    if fresh is not None:
+        return fresh
+    return cache.complete(key, entry, status, headers or {}, text, URL)
+
+def bodies(cache):
+    return os.listdir(os.path.join(cache.directory, "bodies"))
+
+def test_first_fetch_comes_from_the_network(cache):
+    result = fetch(cache, 200, BODY)
+    assert result == BODY
+    assert (result.unchanged, result.source) == (False, "network")
+
+def test_304_returns_the_cached_body(cache):
+    fetch(cache, 200, BODY, {"ETag": '"v1"'})
+    result = fetch(cache, 304)
+    assert result == BODY
+    assert (result.unchanged, result.source) == (True, "revalidated")
+
+def test_same_body_is_detected_by_hash(cache):
+    fetch(cache, 200, BODY)
+    result = fetch(cache, 200, BODY)
+    assert (result.unchanged, result.source) == (True, "hash")
+    assert len(bodies(cache)) == 1
+
+def test_changed_body_replaces_the_stored_one(cache):
+    fetch(cache, 200, BODY)
+    changed = BODY.replace("5.99", "6.49")
+    result = fetch(cache, 200, changed)
+    assert result == changed
+    assert (result.unchanged, result.source) == (False, "network")
+    assert len(bodies(cache)) == 1
+    assert cache.prepare("GET", URL)[1]["body"] == changed
+
+def test_conditional_headers_from_the_validators(cache):
+    assert cache.prepare("GET", URL)[2] == {}
+    fetch(cache, 200, BODY, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+    assert cache.prepare("GET", URL)[2] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+def test_ttl_hit_needs_no_request(cache):
+    fetch(cache, 200, BODY)
+    key, entry, conditional, fresh = cache.prepare("GET", URL, ttl=60)
+    assert conditional == {}
+    assert fresh == BODY
+    assert (fresh.unchanged, fresh.source) == (True, "cache")
+
+class Response:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+class Sessions:
+    """Stands in for the session pool: replays responses, records request headers."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def request(self, method, url, headers=None, **kwargs):
+        self.sent.append(headers)
+        return self.responses.pop(0)
+
+@pytest.fixture
+def manager(cache, monkeypatch):
+    monkeypatch.setattr(network, "get_response_cache", lambda: cache)
+    monkeypatch.setattr(network, "HTTP_CACHE", True)
+    manager = NetworkManager()
+    monkeypatch.setattr(manager.rate_limiter, "acquire", lambda url: None)
+    return manager
+
+def test_manager_sends_conditional_requests(manager):
+    manager.sessions = Sessions(Response(200, BODY, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}), Response(304))
+    assert manager.fetch_with_requests(URL).unchanged is False
+    result = manager.fetch_with_requests(URL)
+    assert (result, result.unchanged) == (BODY, True)
+    assert "If-None-Match" not in manager.sessions.sent[0]
+    assert manager.sessions.sent[1]["If-None-Match"] == '"v1"'
+    assert manager.sessions.sent[1]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+def test_manager_skips_the_request_within_the_ttl(manager):
+    manager.sessions = Sessions(Response(200, BODY))
+    manager.fetch_with_requests(URL)
+    result = manager.fetch_with_requests(URL, cache_ttl=60)
+    assert (result, result.source) == (BODY, "cache")
+    assert len(manager.sessions.sent) == 1
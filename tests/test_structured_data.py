@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from price_monitor_v2.parsers.kfc import KFCParser
+from price_monitor_v2.utils.structured_data import (
+    INITIAL_STATE, JSONLD, NEXT_DATA, TRANSFER_STATE, find_payloads, jsonld_items, visible_prices
+)
+
+MENU = {"@context": "https://schema.org", "@type": "Menu", "hasMenuSection": [{
+    "@type": "MenuSection",
+    "hasMenuItem": [
+        {"@type": "MenuItem", "name": "Combo Personal", "offers": {"@type": "Offer", "price": "5.99"}},
+        {"@type": "MenuItem", "name": "Sin precio"},
+    ],
+}]}
+
+def jsonld(data):
+    return f'<script type="application/ld+json">{json.dumps(data)}</script>'
+
+def card(name, price):
+    return f'<div class="card"><h3>{name}</h3><span>${price}</span></div>'
+
+def test_find_payloads_kinds():
+    html = (jsonld(MENU)
+            + '<script id="__NEXT_DATA__" type="application/json">{"props": {}}</script>'
+            + '<script id="serverApp-state" type="application/json">{&q;a&q;: 1}</script>'
+            + '<script>window.__INITIAL_STATE__ = {"b": 2};</script>'
+            + '<script type="application/ld+json">{broken</script>')
+    assert list(find_payloads(html)) == [(JSONLD, MENU), (NEXT_DATA, {"props": {}}), (TRANSFER_STATE, {"a": 1}), (INITIAL_STATE, {"b": 2})]
+    assert list(find_payloads("<p>no scripts</p>")) == []
+
+def test_jsonld_items():
+    assert jsonld_items(MENU) == [{"name": "Combo Personal", "price": "5.99"}]
+    graph = {"@graph": [{"@type": ["Product"], "name": "A &amp; B", "offers": [{"lowPrice": 3}]}]}
+    assert jsonld_items(graph) == [{"name": "A & B", "price": 3}]
+
+def test_visible_prices_skip_scripts_and_comments():
+    html = "<script>var p = '$1.00'</script><!-- $2.00 --><p>$ 3.50</p><style>/* $4.00 */</style><b>$5.99</b>"
+    assert visible_prices(html) == {3.5, 5.99}
+
+@pytest.fixture
+def parser():
+    return KFCParser(None, {"name": "KFC"})
+
+def products(parser, html):
+    return [(p["nombre"], p["precio"]) for p in parser.extract_html_products(html)]
+
+def test_structured_data_covering_the_page(parser, monkeypatch):
+    # The heuristics must not run when the payload holds every shown price
+    monkeypatch.setattr("price_monitor_v2.parsers.base.extract_products_by_heuristics", pytest.fail)
+    html = "<html><body>" + jsonld(MENU) + card("Combo Personal", "5.99") + "</body></html>"
+    assert products(parser, html) == [("Combo Personal", 5.99)]
+
+def test_partial_structured_data_is_merged_with_the_heuristics(parser):
+    html = "<html><body>" + jsonld(MENU) + card("Combo Personal", "5.99") + card("Hamburguesa clasica", "4.50") + "</body></html>"
+    assert products(parser, html) == [("Combo Personal", 5.99), ("Hamburguesa clasica", 4.5)]
+
+def test_heuristics_without_structured_data(parser):
+    assert products(parser, "<html><body>" + card("Hamburguesa clasica", "4.50") + "</body></html>") == [("Hamburguesa clasica", 4.5)]
+
+def test_structured_data_can_be_disabled():
+    parser = KFCParser(None, {"name": "KFC", "structured_data": False})
+    html = "<html><body>" + jsonld(MENU) + "</body></html>"
+    assert parser.extract_structured(html) is None
+    assert parser.extract_html_products(html) == []